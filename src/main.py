@@ -26,7 +26,10 @@ from src.routes.special_auth import special_auth_bp
 from src.routes.creator_contact import creator_contact_bp
 from src.routes.search_history_routes import search_history_bp
 from src.routes.shorts_planner import shorts_planner_bp
+from src.routes.jobs import jobs_bp
 from src.middleware.visitor_tracker import track_visitor
+from src.utils.scheduler import scheduler
+from src.utils.scheduled_jobs import register_scheduled_jobs
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
@@ -51,13 +54,20 @@ app.register_blueprint(special_auth_bp, url_prefix='/api/special-auth')
 app.register_blueprint(creator_contact_bp, url_prefix='/api/creator-contact')
 app.register_blueprint(search_history_bp)  # /api/search-history
 app.register_blueprint(shorts_planner_bp)  # /api/shorts-planner
+app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
 
 # 저장된 API 키 로드
 init_api_keys()
 
+# 주기 작업 등록 및 스케줄러 시작 (워커마다 스레드가 돌지만 리더 워커 하나만 작업 실행)
+register_scheduled_jobs(scheduler)
+scheduler.ensure_started()
+
 # 방문자 추적 미들웨어
 @app.before_request
 def before_request():
+    # --preload로 fork된 워커에서도 스케줄러 스레드가 돌도록 (워커당 한 번만 시작)
+    scheduler.ensure_started()
     track_visitor()
 
 # 데이터베이스 설정 (Render.com Persistent Disk 지원)
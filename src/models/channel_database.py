@@ -56,6 +56,15 @@ class ChannelDatabase:
                 ON channels(created_at DESC)
             ''')
             
+            # 핸들 → 채널 ID 매핑 테이블 (핸들 조회 결과 영구 저장)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS channel_handles (
+                    handle TEXT PRIMARY KEY,
+                    channel_id TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
             conn.commit()
             conn.close()
     
@@ -145,6 +154,96 @@ class ChannelDatabase:
             conn.commit()
             conn.close()
     
+    def get_channel_id_by_handle(self, handle):
+        """
+        저장된 핸들 매핑에서 채널 ID 조회
+        
+        Args:
+            handle: 정규화된 핸들 (@ 제외, 소문자)
+        
+        Returns:
+            str: 채널 ID 또는 None
+        """
+        with self._lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT channel_id FROM channel_handles WHERE handle = ?', (handle,))
+            row = cursor.fetchone()
+            
+            conn.close()
+            return row[0] if row else None
+    
+    def save_handle(self, handle, channel_id):
+        """
+        핸들 → 채널 ID 매핑 저장
+        
+        Args:
+            handle: 정규화된 핸들 (@ 제외, 소문자)
+            channel_id: 채널 ID
+        """
+        with self._lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO channel_handles (handle, channel_id) VALUES (?, ?)
+                ON CONFLICT(handle) DO UPDATE SET channel_id = excluded.channel_id
+            ''', (handle, channel_id))
+            
+            conn.commit()
+            conn.close()
+    
+    def get_stale_channel_ids(self, limit=500):
+        """
+        가장 오래전에 갱신된 채널 ID 목록 (재수집 작업용)
+        
+        Args:
+            limit: 조회할 채널 수
+        
+        Returns:
+            list: 채널 ID 리스트
+        """
+        with self._lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT channel_id FROM channels
+                ORDER BY updated_at ASC
+                LIMIT ?
+            ''', (limit,))
+            
+            rows = cursor.fetchall()
+            conn.close()
+            return [row[0] for row in rows]
+    
+    def update_channel_stats(self, channel_id, subscribers, video_count, view_count):
+        """
+        채널 통계만 갱신 (재수집 작업용, 검색 횟수는 그대로 유지)
+        
+        Args:
+            channel_id: 채널 ID
+            subscribers: 구독자 수
+            video_count: 영상 수
+            view_count: 총 조회수
+        """
+        with self._lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                UPDATE channels SET
+                    subscribers = ?,
+                    video_count = ?,
+                    view_count = ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE channel_id = ?
+            ''', (subscribers, video_count, view_count, channel_id))
+            
+            conn.commit()
+            conn.close()
+
     def get_all_channels(self, limit=100, offset=0):
         """
         모든 채널 정보 조회
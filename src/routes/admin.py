@@ -1,6 +1,8 @@
 from flask import Blueprint, jsonify, request
 import os
 import json
+from datetime import datetime
+from src.middleware.auth import require_admin
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -117,7 +119,7 @@ def test_api_keys():
         if api_type == 'gemini' or api_type == 'all':
             # Gemini API 테스트
             try:
-                import google.generativeai as genai
+                from src.utils.gemini_client import gemini_client
                 keys = load_api_keys()
                 api_key = keys.get('gemini_api_key') or os.getenv('GEMINI_API_KEY')
                 
@@ -127,11 +129,10 @@ def test_api_keys():
                         'message': 'Gemini API 키가 설정되지 않았습니다'
                     }
                 else:
-                    genai.configure(api_key=api_key)
-                    model = genai.GenerativeModel('gemini-2.0-flash-exp')
-                    
-                    # 간단한 테스트 요청
-                    response = model.generate_content("Hello")
+                    # 간단한 테스트 요청 (지정한 키로만, 재시도 없이)
+                    _, error = gemini_client.generate("Hello", api_key=api_key, max_retries=1, timeout=30)
+                    if error:
+                        raise RuntimeError(error)
                     
                     results['gemini'] = {
                         'status': 'success',
@@ -208,6 +209,104 @@ def get_system_status():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/api-keys/health', methods=['GET'])
+@require_admin
+def get_api_key_health():
+    """API 키 상태 조회 (YouTube 할당량/격리/서킷 브레이커, Gemini 키별 최근 사용량)"""
+    try:
+        from src.utils.api_key_manager import api_key_manager
+        from src.utils.youtube_client import youtube_client
+        from src.utils.youtube_quota import quota_scheduler, next_quota_reset
+        from src.utils.gemini_client import gemini_client
+
+        def to_iso(timestamp):
+            return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+        keys = quota_scheduler.get_key_health(api_key_manager.youtube_keys)
+        for key in keys:
+            key['quarantined_until'] = to_iso(key['quarantined_until'])
+            key['last_error_at'] = to_iso(key['last_error_at'])
+
+        breaker = youtube_client.breaker_state()
+        breaker['retry_at'] = to_iso(breaker['retry_at'])
+
+        gemini_keys = gemini_client.balancer.get_stats(api_key_manager.gemini_keys)
+        for key in gemini_keys:
+            key['cooldown_until'] = to_iso(key['cooldown_until'])
+
+        return jsonify({
+            'youtube': {
+                'keys': keys,
+                'available': sum(1 for k in keys if k['status'] == 'ok'),
+                'total': len(keys),
+                'quota_resets_at': to_iso(next_quota_reset()),
+                'circuit_breaker': breaker
+            },
+            'gemini': {
+                'keys': gemini_keys,
+                'total': len(gemini_keys)
+            }
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/cache/stats', methods=['GET'])
+@require_admin
+def get_cache_stats():
+    """캐시 통계 조회 (프리픽스별 적중/실패/축출, 병합된 요청 수, 작업 큐 상태, 엔티티 저장소, 트렌딩 스냅샷)"""
+    try:
+        from src.utils.cache import cache
+        from src.utils.single_flight import single_flight
+        from src.utils.gemini_client import gemini_client
+        from src.utils.job_queue import job_queue
+        from src.utils.entity_store import entity_store
+        from src.utils.trending_snapshot import get_snapshot_stats
+
+        stats = cache.get_stats()
+        stats['single_flight'] = single_flight.get_stats()
+        stats['gemini_cache'] = gemini_client.cache.get_stats()
+        stats['jobs'] = job_queue.get_stats()
+        stats['entities'] = entity_store.get_stats()
+        stats['trending_snapshots'] = get_snapshot_stats()
+        return jsonify(stats)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/ai/token-usage', methods=['GET'])
+@require_admin
+def get_token_usage():
+    """엔드포인트별 Gemini 토큰 사용량, 지연 시간, 토큰 예산 조회 (이 워커 기준)"""
+    try:
+        from src.utils.token_budget import token_metrics
+
+        return jsonify(token_metrics.get_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/scheduler', methods=['GET'])
+@require_admin
+def get_scheduler_status():
+    """주기 작업 스케줄러 상태 조회 (리더 워커, 작업별 실행 시각/소요 시간/실패 횟수)"""
+    try:
+        from src.utils.scheduler import scheduler
+
+        return jsonify(scheduler.get_status())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/scheduler/jobs/<name>/run', methods=['POST'])
+@require_admin
+def run_scheduled_job(name):
+    """주기 작업을 리더 워커에서 바로 실행하도록 예약"""
+    try:
+        from src.utils.scheduler import scheduler
+
+        if not scheduler.trigger(name):
+            return jsonify({'error': '등록되지 않은 작업입니다'}), 404
+        return jsonify({'success': True, 'message': f'{name} 작업이 실행 예약되었습니다'}), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # 앱 시작 시 저장된 API 키를 환경변수로 로드
 def init_api_keys():
     """앱 시작 시 저장된 API 키 로드"""
@@ -1,156 +1,126 @@
 import os
-import json
-import requests
+from typing import List
 
 from flask import Blueprint, jsonify, request
-from src.utils.api_key_manager import get_gemini_api_key, make_youtube_api_request
+from pydantic import BaseModel
+from src.utils.channel_snapshot import get_channel_snapshot
+from src.utils.gemini_client import gemini_client
+from src.utils.sse import sse_response
+from src.utils.job_queue import background_job
+from src.utils.token_budget import trim_field
 
 ai_bp = Blueprint('ai', __name__)
 
-def call_gemini_api(prompt, api_key=None, model='gemini-2.0-flash-exp', max_retries=3):
+# AI 컨설턴트 공통 generationConfig (maxOutputTokens는 엔드포인트별 토큰 예산으로 설정)
+AI_GENERATION_CONFIG = {
+    "temperature": 0.7,
+}
+
+# 엔드포인트별 Gemini 응답 캐시 유효 시간 (초)
+TITLE_OPTIMIZER_CACHE_TTL = 7 * 86400
+
+def call_gemini_api(prompt, api_key=None, model='gemini-2.0-flash-exp', max_retries=3, cache_ttl=None, endpoint=None):
     """
-    Gemini API 호출 (REST API 방식) - 재시도 로직 포함
+    Gemini API 호출 (공용 Gemini 클라이언트 사용) - 백오프 재시도 및 키 부하 분산 포함
     
     Args:
         prompt (str): 프롬프트
-        api_key (str): Gemini API 키 (None이면 자동으로 가져옴)
+        api_key (str): 특정 Gemini API 키로만 호출할 때 지정 (None이면 부하 분산)
         model (str): 모델명
-        max_retries (int): 최대 재시도 횟수
+        max_retries (int): 최대 시도 횟수
+        cache_ttl (int): 응답 캐시 유효 시간 (초), None이면 캐시하지 않음
+        endpoint (str): 토큰 예산/사용량 집계용 엔드포인트 이름
     
     Returns:
         str: 생성된 텍스트 또는 None
     """
-    for attempt in range(max_retries):
-        # API 키 가져오기 (로테이션 적용)
-        current_key = api_key if api_key else get_gemini_api_key()
-        
-        if not current_key:
-            print("No Gemini API key available")
-            return None
-        
-        url = f'https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={current_key}'
-        headers = {
-            'Content-Type': 'application/json'
-        }
-        data = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }],
-            "generationConfig": {
-                "temperature": 0.7,
-                "maxOutputTokens": 8192,
-            }
-        }
-        
-        try:
-            print(f"[Attempt {attempt+1}/{max_retries}] Calling Gemini API with model: {model}")
-            response = requests.post(url, headers=headers, json=data, timeout=120)
-            print(f"Response status: {response.status_code}")
-            
-            if response.status_code == 200:
-                result = response.json()
-                print(f"Response received: {len(str(result))} chars")
-                
-                # 응답에서 텍스트 추출
-                if 'candidates' in result and len(result['candidates']) > 0:
-                    candidate = result['candidates'][0]
-                    if 'content' in candidate and 'parts' in candidate['content']:
-                        parts = candidate['content']['parts']
-                        if len(parts) > 0 and 'text' in parts[0]:
-                            return parts[0]['text']
-            elif response.status_code == 429:
-                print(f"Rate limit exceeded, trying next key...")
-                continue
-            else:
-                print(f"API error: {response.status_code} - {response.text}")
-                continue
-                
-        except requests.exceptions.RequestException as e:
-            print(f"Gemini API error (attempt {attempt+1}): {e}")
-            if attempt < max_retries - 1:
-                print("Retrying with next key...")
-                continue
+    text, error = gemini_client.generate(
+        prompt,
+        model=model,
+        generation_config=AI_GENERATION_CONFIG,
+        max_retries=max_retries,
+        api_key=api_key,
+        cache_ttl=cache_ttl,
+        endpoint=endpoint
+    )
+    if error:
+        print(f"Gemini API error: {error}")
+        return None
+    return text
+
+def call_gemini_json(prompt, schema, model='gemini-2.0-flash-exp', max_retries=3, cache_ttl=None, endpoint=None):
+    """
+    Gemini JSON 모드 호출 - responseSchema로 형식을 강제하고 pydantic 모델로 검증
+    
+    Args:
+        prompt (str): 프롬프트
+        schema: 응답 형식을 선언한 pydantic 모델 클래스
+        model (str): 모델명
+        max_retries (int): 최대 시도 횟수
+        cache_ttl (int): 응답 캐시 유효 시간 (초), None이면 캐시하지 않음
+        endpoint (str): 토큰 예산/사용량 집계용 엔드포인트 이름
     
-    print(f"All {max_retries} attempts failed")
-    return None
+    Returns:
+        tuple: (검증된 dict, error)
+    """
+    data, error = gemini_client.generate_json(
+        prompt,
+        schema,
+        model=model,
+        generation_config=AI_GENERATION_CONFIG,
+        max_retries=max_retries,
+        cache_ttl=cache_ttl,
+        endpoint=endpoint
+    )
+    if error:
+        print(f"Gemini API error: {error}")
+    return data, error
+
+# ============================================================
+# JSON 응답 스키마
+# ============================================================
+
+class ScoreItem(BaseModel):
+    score: float
+    reason: str
+
+
+class ChannelScoreEvaluation(BaseModel):
+    content_quality: ScoreItem
+    viewer_interaction: ScoreItem
+    upload_consistency: ScoreItem
+    growth_potential: ScoreItem
+    title_optimization: ScoreItem
+    overall_summary: str
+
+
+class StyleAnalysis(BaseModel):
+    """비슷한 영상 추천용 채널 스타일 분석"""
+    keywords: List[str]
+    style_summary: str
+
+
+class GrowthInsights(BaseModel):
+    strength: str
+    improvement: str
+    action: str
 
-def get_channel_videos(channel_id, max_results=20):
-    """채널의 최신 영상 가져오기 (API 키 로테이션 적용)"""
-    print(f"[DEBUG] get_channel_videos for {channel_id}")
-    try:
-        # 1. 채널의 업로드 플레이리스트 ID 가져오기
-        channel_url = 'https://www.googleapis.com/youtube/v3/channels'
-        channel_params = {
-            'part': 'contentDetails',
-            'id': channel_id
-        }
-        
-        channel_data, error = make_youtube_api_request(channel_url, channel_params)
-        if error or not channel_data or 'items' not in channel_data or len(channel_data['items']) == 0:
-            print(f"[DEBUG] Channel not found or no contentDetails for {channel_id}")
-            return []
-        
-        uploads_playlist_id = channel_data['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-        
-        # 2. 플레이리스트에서 최신 동영상 가져오기
-        videos_url = 'https://www.googleapis.com/youtube/v3/playlistItems'
-        videos_params = {
-            'part': 'snippet',
-            'playlistId': uploads_playlist_id,
-            'maxResults': max_results
-        }
-        
-        videos_data, error = make_youtube_api_request(videos_url, videos_params)
-        if error or not videos_data:
-            print(f"[DEBUG] Failed to get playlist items: {error}")
-            return []
-        
-        # 3. 동영상 ID 수집
-        video_ids = []
-        for item in videos_data.get('items', []):
-            video_id = item['snippet']['resourceId']['videoId']
-            video_ids.append(video_id)
-        
-        if not video_ids:
-            print("[DEBUG] No video IDs found")
-            return []
-        
-        # 4. 동영상 상세 정보 가져오기
-        details_url = 'https://www.googleapis.com/youtube/v3/videos'
-        details_params = {
-            'part': 'statistics,snippet',
-            'id': ','.join(video_ids)
-        }
-        
-        details_data, error = make_youtube_api_request(details_url, details_params)
-        if error or not details_data:
-            print(f"[DEBUG] Failed to get video details: {error}")
-            return []
-        
-        videos = []
-        for item in details_data.get('items', []):
-            video = {
-                'title': item['snippet']['title'],
-                'views': int(item['statistics'].get('viewCount', 0)),
-                'likes': int(item['statistics'].get('likeCount', 0)),
-                'comments': int(item['statistics'].get('commentCount', 0))
-            }
-            videos.append(video)
-        
-        print(f"[DEBUG] Found {len(videos)} videos")
-        return videos
-        
-    except Exception as e:
-        print(f"[DEBUG] Error in get_channel_videos: {e}")
-        import traceback
-        traceback.print_exc()
-        return []
+
+class TrendingKeyword(BaseModel):
+    keyword: str
+    reason: str
+
+
+class ChannelInsights(BaseModel):
+    """채널 성장 인사이트 및 트렌드 키워드"""
+    insights: GrowthInsights
+    trending_keywords: List[TrendingKeyword]
 
 @ai_bp.route('/channel-score', methods=['POST'])
+@ai_bp.route('/channel-score/async', methods=['POST'], defaults={'run_async': True})
+@background_job('ai.channel_score')
 def get_channel_score():
-    """채널 AI 평가 점수 시스템 (0-10점 척도)"""
+    """채널 AI 평가 점수 시스템 (0-10점 척도, /async는 작업 ID 반환)"""
     
     try:
         channel_data = request.json
@@ -161,27 +131,20 @@ def get_channel_score():
         
         print(f"[CHANNEL_SCORE] Analyzing channel: {channel_id}")
         
-        # 1. 채널 정보 가져오기
-        channel_url = 'https://www.googleapis.com/youtube/v3/channels'
-        channel_params = {
-            'part': 'snippet,statistics',
-            'id': channel_id
-        }
-        
-        channel_info, error = make_youtube_api_request(channel_url, channel_params)
-        if error or not channel_info or 'items' not in channel_info or len(channel_info['items']) == 0:
+        # 1. 채널 스냅샷 (채널 정보 + 최근 영상, 다른 채널 엔드포인트와 공유)
+        snapshot, error = get_channel_snapshot(channel_id)
+        if error:
             return jsonify({'error': f'Failed to get channel info: {error}'}), 500
         
-        channel = channel_info['items'][0]
-        channel_name = channel['snippet']['title']
-        subscriber_count = int(channel['statistics'].get('subscriberCount', 0))
-        video_count = int(channel['statistics'].get('videoCount', 0))
-        total_views = int(channel['statistics'].get('viewCount', 0))
+        channel_name = snapshot['title']
+        subscriber_count = snapshot['subscriber_count']
+        video_count = snapshot['video_count']
+        total_views = snapshot['view_count']
         
         print(f"[CHANNEL_SCORE] Channel: {channel_name}, Subscribers: {subscriber_count}, Videos: {video_count}")
         
-        # 2. 최근 영상 가져오기
-        videos = get_channel_videos(channel_id, max_results=20)
+        # 2. 최근 영상 20개
+        videos = snapshot['videos'][:20]
         
         if not videos:
             return jsonify({'error': 'Failed to get channel videos'}), 500
@@ -233,50 +196,29 @@ def get_channel_score():
 JSON 형식으로만 응답해주세요. 각 항목에 대해 0-10점 사이의 점수와 구체적인 이유를 제시해주세요.
 """
         
-        # 5. AI 평가 실행
+        # 5. AI 평가 실행 (JSON 모드)
         print("[CHANNEL_SCORE] Calling Gemini API for evaluation...")
-        ai_response = call_gemini_api(prompt)
+        evaluation, error = call_gemini_json(prompt, ChannelScoreEvaluation, endpoint='ai.channel_score')
+        
+        if error:
+            return jsonify({'error': 'Failed to get AI evaluation', 'details': error}), 500
+        
+        # 6. 응답 구성
+        result = {
+            'channel_id': channel_id,
+            'channel_name': channel_name,
+            'statistics': {
+                'subscribers': subscriber_count,
+                'videos': video_count,
+                'total_views': total_views,
+                'avg_views': round(avg_views),
+                'avg_likes': round(avg_likes),
+                'avg_comments': round(avg_comments)
+            },
+            'evaluation': evaluation
+        }
         
-        if not ai_response:
-            return jsonify({'error': 'Failed to get AI evaluation'}), 500
-        
-        # 6. JSON 파싱
-        try:
-            # JSON 블록 추출
-            import re
-            json_match = re.search(r'```json\s*(.*?)\s*```', ai_response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                # JSON 블록이 없으면 전체 응답을 JSON으로 파싱 시도
-                json_str = ai_response
-            
-            evaluation = json.loads(json_str)
-            
-            # 7. 응답 구성
-            result = {
-                'channel_id': channel_id,
-                'channel_name': channel_name,
-                'statistics': {
-                    'subscribers': subscriber_count,
-                    'videos': video_count,
-                    'total_views': total_views,
-                    'avg_views': round(avg_views),
-                    'avg_likes': round(avg_likes),
-                    'avg_comments': round(avg_comments)
-                },
-                'evaluation': evaluation
-            }
-            
-            return jsonify(result), 200
-            
-        except json.JSONDecodeError as e:
-            print(f"[CHANNEL_SCORE] JSON parsing error: {e}")
-            print(f"[CHANNEL_SCORE] AI response: {ai_response}")
-            return jsonify({
-                'error': 'Failed to parse AI response',
-                'raw_response': ai_response
-            }), 500
+        return jsonify(result), 200
         
     except Exception as e:
         print(f"[CHANNEL_SCORE] Error: {e}")
@@ -287,8 +229,11 @@ JSON 형식으로만 응답해주세요. 각 항목에 대해 0-10점 사이의
 
 
 @ai_bp.route('/analyze', methods=['POST'])
-def analyze_channel():
-    """채널 AI 분석 및 성장 조언"""
+@ai_bp.route('/analyze/stream', methods=['POST'], defaults={'stream': True})
+@ai_bp.route('/analyze/async', methods=['POST'], defaults={'run_async': True})
+@background_job('ai.analyze')
+def analyze_channel(stream=False):
+    """채널 AI 분석 및 성장 조언 (/stream은 SSE로 생성 중인 텍스트를 바로 전달, /async는 작업 ID 반환)"""
     try:
         channel_data = request.json
         channel_id = channel_data.get('channel_id')
@@ -299,26 +244,19 @@ def analyze_channel():
         
         print(f"[AI_ANALYZE] Analyzing channel: {channel_id}")
         
-        # 채널 정보 가져오기
-        channel_url = 'https://www.googleapis.com/youtube/v3/channels'
-        channel_params = {
-            'part': 'snippet,statistics',
-            'id': channel_id
-        }
-        
-        channel_info, error = make_youtube_api_request(channel_url, channel_params)
-        if error or not channel_info or 'items' not in channel_info or len(channel_info['items']) == 0:
+        # 채널 스냅샷 (채널 정보 + 최근 영상)
+        snapshot, error = get_channel_snapshot(channel_id)
+        if error:
             return jsonify({'error': f'Failed to get channel info: {error}'}), 500
         
-        channel = channel_info['items'][0]
-        channel_name = channel['snippet']['title']
-        channel_description = channel['snippet'].get('description', '')
-        subscriber_count = int(channel['statistics'].get('subscriberCount', 0))
-        video_count = int(channel['statistics'].get('videoCount', 0))
-        total_views = int(channel['statistics'].get('viewCount', 0))
+        channel_name = snapshot['title']
+        channel_description = snapshot['description']
+        subscriber_count = snapshot['subscriber_count']
+        video_count = snapshot['video_count']
+        total_views = snapshot['view_count']
         
-        # 최근 영상 가져오기
-        videos = get_channel_videos(channel_id, max_results=10)
+        # 최근 영상 10개
+        videos = snapshot['videos'][:10]
         
         if not videos:
             return jsonify({'error': 'Failed to get channel videos'}), 500
@@ -328,15 +266,16 @@ def analyze_channel():
         avg_likes = sum(v['likes'] for v in videos) / len(videos) if videos else 0
         avg_comments = sum(v['comments'] for v in videos) / len(videos) if videos else 0
         
-        # 최근 영상 제목
-        recent_titles = [v['title'] for v in videos[:5]]
+        # 최근 영상 제목 (토큰 예산 안에서)
+        recent_titles = trim_field('ai.analyze', 'titles', [v['title'] for v in videos[:5]])
+        channel_description = trim_field('ai.analyze', 'description', channel_description)
         
         # AI 분석 프롬프트
         prompt = f"""당신은 YouTube 채널 성장 전문 컨설턴트입니다. 다음 채널을 분석하고 구체적인 성장 전략을 제시해주세요.
 
 채널 정보:
 - 채널명: {channel_name}
-- 채널 설명: {channel_description[:300]}
+- 채널 설명: {channel_description}
 - 구독자 수: {subscriber_count:,}명
 - 총 영상 수: {video_count}개
 - 총 조회수: {total_views:,}회
@@ -381,7 +320,9 @@ def analyze_channel():
 
         # AI 분석 실행
         print("[AI_ANALYZE] Calling Gemini API...")
-        ai_response = call_gemini_api(prompt)
+        if stream:
+            return sse_response(gemini_client.stream(prompt, generation_config=AI_GENERATION_CONFIG, endpoint='ai.analyze'))
+        ai_response = call_gemini_api(prompt, endpoint='ai.analyze')
         
         if not ai_response:
             return jsonify({'error': 'Failed to get AI analysis'}), 500
@@ -396,8 +337,11 @@ def analyze_channel():
 
 
 @ai_bp.route('/content-ideas', methods=['POST'])
-def get_content_ideas():
-    """채널 맞춤형 콘텐츠 아이디어 생성"""
+@ai_bp.route('/content-ideas/stream', methods=['POST'], defaults={'stream': True})
+@ai_bp.route('/content-ideas/async', methods=['POST'], defaults={'run_async': True})
+@background_job('ai.content_ideas')
+def get_content_ideas(stream=False):
+    """채널 맞춤형 콘텐츠 아이디어 생성 (/stream은 SSE로 생성 중인 텍스트를 바로 전달, /async는 작업 ID 반환)"""
     try:
         channel_data = request.json
         channel_id = channel_data.get('channel_id')
@@ -407,40 +351,34 @@ def get_content_ideas():
         
         print(f"[CONTENT_IDEAS] Generating ideas for channel: {channel_id}")
         
-        # 채널 정보 가져오기
-        channel_url = 'https://www.googleapis.com/youtube/v3/channels'
-        channel_params = {
-            'part': 'snippet,statistics',
-            'id': channel_id
-        }
-        
-        channel_info, error = make_youtube_api_request(channel_url, channel_params)
-        if error or not channel_info or 'items' not in channel_info or len(channel_info['items']) == 0:
+        # 채널 스냅샷 (채널 정보 + 최근 영상)
+        snapshot, error = get_channel_snapshot(channel_id)
+        if error:
             return jsonify({'error': f'Failed to get channel info: {error}'}), 500
         
-        channel = channel_info['items'][0]
-        channel_name = channel['snippet']['title']
-        channel_description = channel['snippet'].get('description', '')
+        channel_name = snapshot['title']
+        channel_description = snapshot['description']
         
-        # 최근 영상 가져오기
-        videos = get_channel_videos(channel_id, max_results=10)
+        # 최근 영상 10개
+        videos = snapshot['videos'][:10]
         
         if not videos:
             return jsonify({'error': 'Failed to get channel videos'}), 500
         
-        # 최근 영상 제목
-        recent_titles = [v['title'] for v in videos[:10]]
+        # 최근 영상 제목 (토큰 예산 안에서)
+        recent_titles = trim_field('ai.content_ideas', 'titles', [v['title'] for v in videos[:10]])
         
         # 인기 영상 (조회수 기준)
         popular_videos = sorted(videos, key=lambda x: x['views'], reverse=True)[:5]
-        popular_titles = [v['title'] for v in popular_videos]
+        popular_titles = trim_field('ai.content_ideas', 'titles', [v['title'] for v in popular_videos])
+        channel_description = trim_field('ai.content_ideas', 'description', channel_description)
         
         # AI 아이디어 생성 프롬프트
         prompt = f"""당신은 YouTube 콘텐츠 기획 전문가입니다. 다음 채널을 위한 창의적이고 실용적인 콘텐츠 아이디어 10개를 제안해주세요.
 
 채널 정보:
 - 채널명: {channel_name}
-- 채널 설명: {channel_description[:300]}
+- 채널 설명: {channel_description}
 
 최근 영상 제목:
 {chr(10).join(['- ' + title for title in recent_titles])}
@@ -476,7 +414,9 @@ def get_content_ideas():
 
         # AI 아이디어 생성 실행
         print("[CONTENT_IDEAS] Calling Gemini API...")
-        ai_response = call_gemini_api(prompt)
+        if stream:
+            return sse_response(gemini_client.stream(prompt, generation_config=AI_GENERATION_CONFIG, endpoint='ai.content_ideas'))
+        ai_response = call_gemini_api(prompt, endpoint='ai.content_ideas')
         
         if not ai_response:
             return jsonify({'error': 'Failed to generate content ideas'}), 500
@@ -502,6 +442,8 @@ def optimize_title():
         if not title:
             return jsonify({'error': '제목을 입력해주세요'}), 400
         
+        title = trim_field('ai.title_optimizer', 'title', title)
+        
         # AI 프롬프트 생성
         prompt = f"""
 당신은 YouTube 제목 최적화 전문가입니다. 다음 제목을 분석하고 클릭률을 높일 수 있는 5가지 대안 제목을 제안해주세요.
@@ -528,7 +470,7 @@ def optimize_title():
 """
         
         # Gemini API 호출
-        result = call_gemini_api(prompt)
+        result = call_gemini_api(prompt, cache_ttl=TITLE_OPTIMIZER_CACHE_TTL, endpoint='ai.title_optimizer')
         
         if not result:
             return jsonify({'error': 'AI 응답을 받지 못했습니다'}), 500
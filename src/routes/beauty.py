@@ -1,49 +1,27 @@
 from flask import Blueprint, jsonify, request
-import os
-import requests
 import json
+from src.utils.youtube_client import youtube_client
+from src.utils.trending_snapshot import get_dataset
+from src.utils.gemini_client import gemini_client
+from src.utils.token_budget import trim_field
 
 beauty_bp = Blueprint('beauty', __name__)
 
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-
-def call_gemini(prompt):
-    """Gemini API 호출"""
-    if not GEMINI_API_KEY:
-        return None
-    
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={GEMINI_API_KEY}"
-    
-    headers = {
-        "Content-Type": "application/json"
-    }
-    
-    data = {
-        "contents": [{
-            "parts": [{
-                "text": prompt
-            }]
-        }],
-        "generationConfig": {
-            "temperature": 0.9,
-            "topK": 40,
-            "topP": 0.95,
-            "maxOutputTokens": 8192,
-        }
-    }
-    
-    try:
-        response = requests.post(url, headers=headers, json=data, timeout=60)
-        response.raise_for_status()
-        result = response.json()
-        
-        if 'candidates' in result and len(result['candidates']) > 0:
-            text = result['candidates'][0]['content']['parts'][0]['text']
-            return text
-        return None
-    except Exception as e:
-        print(f"Gemini API Error: {str(e)}")
+# 엔드포인트별 Gemini 응답 캐시 유효 시간 (초)
+BEAUTY_TRENDS_CACHE_TTL = 6 * 3600
+HOOK_PHRASES_CACHE_TTL = 86400
+
+def call_gemini(prompt, cache_ttl=None, endpoint=None):
+    """Gemini API 호출 (cache_ttl을 지정하면 같은 프롬프트의 응답을 캐시, endpoint별 토큰 예산 적용)"""
+    text, error = gemini_client.generate(prompt, generation_config={
+        "temperature": 0.9,
+        "topK": 40,
+        "topP": 0.95,
+    }, cache_ttl=cache_ttl, endpoint=endpoint)
+    if error:
+        print(f"Gemini API Error: {error}")
         return None
+    return text
 
 
 @beauty_bp.route('/script-generator', methods=['POST'])
@@ -114,7 +92,7 @@ def generate_script():
 한국 뷰티 유튜버의 톤앤매너를 반영하여 친근하고 솔직한 대사를 작성해주세요.
 """
         
-        result = call_gemini(prompt)
+        result = call_gemini(prompt, endpoint='beauty.script')
         
         if not result:
             return jsonify({'error': 'Failed to generate script'}), 500
@@ -134,48 +112,19 @@ def generate_script():
 def get_korean_beauty_trends():
     """한국 뷰티 트렌드 분석 (조회수 높은 영상)"""
     try:
-        youtube_api_key = os.getenv('YOUTUBE_API_KEY')
-        
-        if not youtube_api_key:
+        if not youtube_client.has_keys():
             return jsonify({'error': 'YouTube API key not configured'}), 500
         
-        # 한국 뷰티 카테고리에서 인기 영상 검색
-        search_url = "https://www.googleapis.com/youtube/v3/search"
-        search_params = {
-            'key': youtube_api_key,
-            'part': 'snippet',
-            'q': '뷰티 화장품 리뷰 올리브영',
-            'type': 'video',
-            'regionCode': 'KR',
-            'relevanceLanguage': 'ko',
-            'order': 'viewCount',
-            'maxResults': 20,
-            'publishedAfter': '2024-01-01T00:00:00Z'  # 최근 1년
-        }
-        
-        search_response = requests.get(search_url, params=search_params, timeout=10)
-        search_response.raise_for_status()
-        search_data = search_response.json()
+        # 한국 뷰티 인기 영상 (검색 + 영상 상세를 백그라운드에서 갱신하는 공유 스냅샷)
+        items, error = get_dataset('beauty_trending_kr')
+        if error:
+            return jsonify({'error': error}), 500
         
-        video_ids = [item['id']['videoId'] for item in search_data.get('items', [])]
-        
-        if not video_ids:
+        if not items:
             return jsonify({'trends': [], 'analysis': 'No trending videos found'})
         
-        # 영상 상세 정보 가져오기
-        videos_url = "https://www.googleapis.com/youtube/v3/videos"
-        videos_params = {
-            'key': youtube_api_key,
-            'part': 'snippet,statistics',
-            'id': ','.join(video_ids)
-        }
-        
-        videos_response = requests.get(videos_url, params=videos_params, timeout=10)
-        videos_response.raise_for_status()
-        videos_data = videos_response.json()
-        
         trending_videos = []
-        for item in videos_data.get('items', []):
+        for item in items:
             video = {
                 'title': item['snippet']['title'],
                 'channel': item['snippet']['channelTitle'],
@@ -190,7 +139,7 @@ def get_korean_beauty_trends():
         
         # Gemini로 트렌드 분석
         if trending_videos:
-            titles = [v['title'] for v in trending_videos[:10]]
+            titles = trim_field('beauty.trends', 'titles', [v['title'] for v in trending_videos[:10]])
             prompt = f"""
 다음은 최근 한국에서 조회수가 높은 뷰티 영상들의 제목입니다:
 
@@ -217,7 +166,7 @@ def get_korean_beauty_trends():
 [구체적인 조언 3-5개]
 """
             
-            analysis = call_gemini(prompt)
+            analysis = call_gemini(prompt, cache_ttl=BEAUTY_TRENDS_CACHE_TTL, endpoint='beauty.trends')
         else:
             analysis = "트렌드 분석을 생성할 수 없습니다."
         
@@ -267,7 +216,7 @@ def generate_hook_phrases():
 - 클릭을 유도하는 강력한 후크
 """
         
-        result = call_gemini(prompt)
+        result = call_gemini(prompt, cache_ttl=HOOK_PHRASES_CACHE_TTL, endpoint='beauty.hook_phrases')
         
         if not result:
             return jsonify({'error': 'Failed to generate hook phrases'}), 500
@@ -7,7 +7,10 @@ import requests
 import re
 import os
 from bs4 import BeautifulSoup
-from src.utils.api_key_manager import make_youtube_api_request
+from src.utils.youtube_client import youtube_client
+from src.utils.entity_store import entity_store
+from src.utils.channel_resolver import resolve_channel_id
+from src.utils.cache import get_negative, set_negative
 
 creator_contact_bp = Blueprint('creator_contact', __name__)
 
@@ -39,86 +42,33 @@ def get_channel_info(channel_input):
     channel_input: 채널 ID, 핸들(@), 채널명, 또는 URL
     """
     try:
-        channel_id_to_fetch = None
-
-        # URL에서 채널 ID 또는 핸들 추출
-        if 'youtube.com' in channel_input:
-            if '/channel/' in channel_input:
-                channel_id_to_fetch = channel_input.split('/channel/')[1].split('/')[0].split('?')[0]
-            elif '/@' in channel_input:
-                handle = channel_input.split('/@')[1].split('/')[0].split('?')[0]
-                channel_input = '@' + handle
-        
-        # 채널 ID로 직접 조회 (UC로 시작하는 24자리)
-        if channel_input.startswith('UC') and len(channel_input) == 24:
-            channel_id_to_fetch = channel_input
-
-        if channel_id_to_fetch:
-            url = 'https://www.googleapis.com/youtube/v3/channels'
-            params = {
-                'part': 'snippet,statistics,brandingSettings',
-                'id': channel_id_to_fetch
-            }
-            data, error = make_youtube_api_request(url, params)
-            if data and 'items' in data and len(data['items']) > 0:
-                return data['items'][0], None
-            return None, error or "Channel not found with the given ID."
-
-        # 핸들(@) 또는 채널명으로 검색
-        search_url = 'https://www.googleapis.com/youtube/v3/search'
-        search_params = {
-            'part': 'snippet',
-            'q': channel_input,
-            'type': 'channel',
-            'maxResults': 1
-        }
-        
-        search_data, error = make_youtube_api_request(search_url, search_params)
-        
-        if error:
+        # 핸들(@)/URL/채널명을 채널 ID로 변환 (핸들은 forHandle로 조회)
+        channel_id, error = resolve_channel_id(channel_input)
+        if not channel_id:
             return None, error
 
-        if not search_data or 'items' not in search_data or len(search_data['items']) == 0:
-            return None, "Channel not found by search."
-        
-        channel_id = search_data["items"][0]["snippet"]["channelId"]
-        
-        # 채널 상세 정보 가져오기
-        url = 'https://www.googleapis.com/youtube/v3/channels'
-        params = {
-            'part': 'snippet,statistics,brandingSettings',
-            'id': channel_id
-        }
-        data, error = make_youtube_api_request(url, params)
-        if data and 'items' in data and len(data['items']) > 0:
-            return data['items'][0], None
-        return None, error or "Channel details not found after search."
-        
         # 채널 상세 정보 가져오기
-        url = 'https://www.googleapis.com/youtube/v3/channels'
-        params = {
-            'part': 'snippet,statistics,brandingSettings',
-            'id': channel_id,
-            'key': api_key
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
-        
-        if 'items' in data and len(data['items']) > 0:
-            return data['items'][0]
-        
-        return None
+        channels, error = entity_store.get_channels(
+            [channel_id],
+            parts=('snippet', 'statistics', 'brandingSettings')
+        )
+        if channels and channel_id in channels:
+            return channels[channel_id], None
+        return None, error or "Channel not found with the given ID."
         
     except Exception as e:
         print(f"Error getting channel info: {e}")
-        return None
+        return None, str(e)
 
 
 def scrape_channel_about_page(channel_id):
     """
     채널 정보 페이지에서 이메일 스크래핑 (개선된 버전)
+    이메일이 없던 채널은 부정 캐시에 기록하여 짧은 기간 동안 다시 스크래핑하지 않음
     """
+    if get_negative('email', channel_id):
+        return None
+
     try:
         # YouTube 채널 정보 페이지 URL
         url = f'https://www.youtube.com/channel/{channel_id}/about'
@@ -184,6 +134,7 @@ def scrape_channel_about_page(channel_id):
                 pass
         
         print("No email found in channel page")
+        set_negative('email', channel_id, 'no_email')
         return None
         
     except Exception as e:
@@ -313,21 +264,20 @@ def batch_search_contacts():
             return jsonify({'error': '한 번에 최대 10개까지 검색 가능합니다.'}), 400
         
         # YouTube API 키 확인
-        api_key = get_youtube_api_key()
-        if not api_key:
+        if not youtube_client.has_keys():
             return jsonify({'error': 'YouTube API 키가 설정되지 않았습니다.'}), 503
         
         results = []
         
         for channel_input in channels:
             try:
-                channel_info = get_channel_info(channel_input.strip(), api_key)
+                channel_info, error = get_channel_info(channel_input.strip())
                 
                 if not channel_info:
                     results.append({
                         'input': channel_input,
                         'success': False,
-                        'error': '채널을 찾을 수 없습니다.'
+                        'error': error or '채널을 찾을 수 없습니다.'
                     })
                     continue
                 
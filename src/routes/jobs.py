@@ -0,0 +1,83 @@
+"""
+백그라운드 작업 조회 API
+- 폴링: GET /api/jobs/<job_id>
+- 구독: GET /api/jobs/<job_id>/events (SSE, 상태가 바뀔 때마다 전달)
+"""
+
+import time
+
+from flask import Blueprint, Response, jsonify, stream_with_context
+from src.utils.job_queue import job_queue, FINISHED_STATUSES
+from src.utils.sse import format_sse
+
+jobs_bp = Blueprint('jobs', __name__)
+
+# SSE 구독 시 상태 확인 간격 (초)
+EVENTS_POLL_INTERVAL = 1.0
+# SSE 구독 최대 유지 시간 (초) - 구독마다 동기 워커 하나를 점유하므로 짧게 제한
+EVENTS_MAX_DURATION = 120
+
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """작업 상태 및 결과 조회"""
+    try:
+        job = job_queue.get(job_id)
+        if not job:
+            return jsonify({'error': '작업을 찾을 수 없습니다'}), 404
+        return jsonify(job), 200
+
+    except Exception as e:
+        print(f"Error in get_job: {e}")
+        return jsonify({'error': '작업 조회 실패', 'details': str(e)}), 500
+
+
+@jobs_bp.route('/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    작업 상태 구독 (SSE)
+
+    이벤트 순서:
+        status {'status': ...} (상태가 바뀔 때마다) → done {작업 정보} 또는 error {작업 정보}
+        EVENTS_MAX_DURATION 안에 끝나지 않으면 timeout {'status', 'status_url'} 후 종료 (다시 구독하거나 폴링)
+
+    구독하는 동안 워커 하나를 점유하므로, 부하가 큰 환경에서는 폴링을 권장.
+    """
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({'error': '작업을 찾을 수 없습니다'}), 404
+
+    def generate():
+        last_status = None
+        deadline = time.monotonic() + EVENTS_MAX_DURATION
+        current = job
+        while True:
+            if current is None:
+                # 구독 중 작업 기록이 정리됨
+                yield format_sse({'error': '작업을 찾을 수 없습니다'}, event='error')
+                return
+
+            if current['status'] != last_status:
+                last_status = current['status']
+                yield format_sse({'status': last_status}, event='status')
+
+            if current['status'] in FINISHED_STATUSES:
+                event = 'done' if current['status'] == 'done' else 'error'
+                yield format_sse(current, event=event)
+                return
+
+            if time.monotonic() > deadline:
+                yield format_sse({'status': last_status, 'status_url': f'/api/jobs/{job_id}'}, event='timeout')
+                return
+
+            time.sleep(EVENTS_POLL_INTERVAL)
+            current = job_queue.get(job_id)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
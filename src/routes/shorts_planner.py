@@ -6,89 +6,63 @@ YouTube Shorts, Instagram Reels, TikTok 등 숏폼 콘텐츠 전용
 from flask import Blueprint, request, jsonify, session
 import os
 import sys
-from src.utils.api_key_manager import get_gemini_api_key, make_youtube_api_request
+from src.utils.api_key_manager import get_gemini_api_key
+from src.utils.gemini_client import gemini_client
+from src.utils.channel_resolver import resolve_channel_id
+from src.utils.channel_snapshot import get_channel_snapshot
+from src.utils.trending_snapshot import get_dataset
+from src.utils.sse import sse_response
+from src.utils.job_queue import background_job
+from src.utils.token_budget import trim_field
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 shorts_planner_bp = Blueprint('shorts_planner', __name__, url_prefix='/api/shorts-planner')
 
 
+# ============================================================
+# 인증 데코레이터
+# ============================================================
+
+def special_user_required(f):
+    """특별 계정 로그인 필수"""
+    from functools import wraps
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'special_user_id' not in session:
+            return jsonify({'error': '로그인이 필요합니다'}), 401
+        return f(*args, **kwargs)
+    return decorated_function
+
+
 # ============================================================
 # Gemini API 호출
 # ============================================================
 
+# 숏폼 기획안 generationConfig (maxOutputTokens는 엔드포인트별 토큰 예산으로 설정)
+SHORTS_GENERATION_CONFIG = {
+    "temperature": 0.9,  # 쇼폼은 창의성이 더 중요
+}
+
 def call_gemini(prompt, max_retries=3):
     """
-    Gemini API 호출 (로테이션 적용)
+    Gemini API 호출 (공용 Gemini 클라이언트 사용)
     
     Args:
         prompt: 프롬프트
-        max_retries: 최대 재시도 횟수
+        max_retries: 최대 시도 횟수
     
     Returns:
         생성된 텍스트 또는 None
     """
-    import requests
-    
-    for attempt in range(max_retries):
-        # API 키 가져오기 (로테이션 적용)
-        api_key = get_gemini_api_key()
-        if not api_key:
-            print(f"[SHORTS_PLANNER] No Gemini API key available")
-            return None
-        
-        url = f'https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={api_key}'
-        
-        headers = {
-            'Content-Type': 'application/json'
-        }
-        
-        data = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }],
-            "generationConfig": {
-                "temperature": 0.9,  # 쇼폼은 창의성이 더 중요
-                "maxOutputTokens": 4096,
-            }
-        }
-        
-        try:
-            print(f"[SHORTS_PLANNER] Calling Gemini API (attempt {attempt+1}/{max_retries})...")
-            response = requests.post(url, headers=headers, json=data, timeout=60)
-            print(f"[SHORTS_PLANNER] Response status: {response.status_code}")
-            
-            if response.status_code == 200:
-                result = response.json()
-                
-                if 'candidates' in result and len(result['candidates']) > 0:
-                    candidate = result['candidates'][0]
-                    if 'content' in candidate and 'parts' in candidate['content']:
-                        parts = candidate['content']['parts']
-                        if len(parts) > 0 and 'text' in parts[0]:
-                            print(f"[SHORTS_PLANNER] Successfully generated plan")
-                            return parts[0]['text']
-                
-                print(f"[SHORTS_PLANNER] No valid response from Gemini")
-                continue
-            elif response.status_code == 429:
-                print(f"[SHORTS_PLANNER] Quota exceeded, trying next key...")
-                continue
-            else:
-                print(f"[SHORTS_PLANNER] API error: {response.text}")
-                continue
-            
-        except Exception as e:
-            print(f"[SHORTS_PLANNER] Gemini API error: {e}")
-            import traceback
-            traceback.print_exc()
-            if attempt < max_retries - 1:
-                continue
-    
-    print(f"[SHORTS_PLANNER] All {max_retries} attempts failed")
-    return None
+    text, error = gemini_client.generate(
+        prompt, generation_config=SHORTS_GENERATION_CONFIG, max_retries=max_retries, endpoint='shorts_planner.generate'
+    )
+    if error:
+        print(f"[SHORTS_PLANNER] Gemini API error: {error}")
+        return None
+    print(f"[SHORTS_PLANNER] Successfully generated plan")
+    return text
 
 
 # ============================================================
@@ -96,80 +70,32 @@ def call_gemini(prompt, max_retries=3):
 # ============================================================
 
 def analyze_channel_for_shorts(channel_id):
-    """숏폼에 적합한 채널 분석"""
+    """숏폼에 적합한 채널 분석 (채널 스냅샷의 최근 업로드 50개 중 60초 이하 영상)"""
     try:
-        # 채널 정보
-        channel_url = 'https://www.googleapis.com/youtube/v3/channels'
-        channel_params = {
-            'part': 'snippet,statistics,contentDetails',
-            'id': channel_id
-        }
-        channel_data, error = make_youtube_api_request(channel_url, channel_params)
-        if error or not channel_data or 'items' not in channel_data or len(channel_data['items']) == 0:
+        snapshot, error = get_channel_snapshot(channel_id)
+        if error:
             return None, error
         
-        channel_info = channel_data['items'][0]
-        
-        # 최근 Shorts 영상 가져오기 (60초 이하)
-        uploads_playlist_id = channel_info['contentDetails']['relatedPlaylists']['uploads']
-        
-        videos_url = 'https://www.googleapis.com/youtube/v3/playlistItems'
-        videos_params = {
-            'part': 'snippet',
-            'playlistId': uploads_playlist_id,
-            'maxResults': 50  # 더 많이 가져와서 Shorts 필터링
-        }
-        videos_data, error = make_youtube_api_request(videos_url, videos_params)
-        if error:
-            print(f"Playlist items error: {error}")
-            # 채널 정보만이라도 반환
-            return {
-                'channel_name': channel_info['snippet']['title'],
-                'description': channel_info['snippet']['description'],
-                'subscriber_count': int(channel_info['statistics'].get('subscriberCount', 0)),
-                'video_count': int(channel_info['statistics'].get('videoCount', 0)),
-                'shorts': []
-            }, None
-
-        video_ids = [item['snippet']['resourceId']['videoId'] for item in videos_data.get('items', [])]
+        if snapshot['videos_error']:
+            print(f"Playlist items error: {snapshot['videos_error']}")
         
-        # 영상 상세 정보
-        shorts = []
-        if video_ids:
-            details_url = 'https://www.googleapis.com/youtube/v3/videos'
-            details_params = {
-                'part': 'statistics,snippet,contentDetails',
-                'id': ','.join(video_ids)
+        shorts = [
+            {
+                'title': video['title'],
+                'views': video['views'],
+                'likes': video['likes'],
+                'comments': video['comments'],
+                'duration': video['duration']
             }
-            details_data, error = make_youtube_api_request(details_url, details_params)
-            if error:
-                print(f"Video details error: {error}")
-            else:
-                for item in details_data.get('items', []):
-                    # 60초 이하인 영상만 (Shorts)
-                    duration = item['contentDetails']['duration']
-                    # PT1M = 1분, PT30S = 30초
-                    import re
-                    match = re.match(r'PT(?:(\d+)M)?(?:(\d+)S)?', duration)
-                    if match:
-                        minutes = int(match.group(1) or 0)
-                        seconds = int(match.group(2) or 0)
-                        total_seconds = minutes * 60 + seconds
-                        
-                        if total_seconds <= 60:  # 60초 이하만
-                            shorts.append({
-                                'title': item['snippet']['title'],
-                                'views': int(item['statistics'].get('viewCount', 0)),
-                                'likes': int(item['statistics'].get('likeCount', 0)),
-                                'comments': int(item['statistics'].get('commentCount', 0)),
-                                'duration': total_seconds
-                            })
+            for video in snapshot['videos']
+            if 0 < video['duration'] <= 60
+        ]
         
         return {
-            'channel_name': channel_info['snippet']['title'],
-            'description': channel_info['snippet']['description'],
-            'subscriber_count': int(channel_info['statistics'].get('subscriberCount', 0)),
-            'video_count': int(channel_info['statistics'].get('videoCount', 0)),
+            'channel_name': snapshot['title'],
+            'description': snapshot['description'],
+            'subscriber_count': snapshot['subscriber_count'],
+            'video_count': snapshot['video_count'],
             'shorts': shorts[:10]  # 최근 10개 Shorts만
         }, None
         
@@ -183,21 +109,14 @@ def analyze_channel_for_shorts(channel_id):
 def get_trending_shorts():
     """현재 트렌딩 Shorts 분석"""
     try:
-        url = 'https://www.googleapis.com/youtube/v3/videos'
-        params = {
-            'part': 'snippet',
-            'chart': 'mostPopular',
-            'regionCode': 'KR',
-            'videoCategoryId': '0',  # All categories
-            'maxResults': 50
-        }
-        data, error = make_youtube_api_request(url, params)
+        # 백그라운드에서 갱신되는 인기 급상승 공유 스냅샷 (전체 카테고리)
+        items, error = get_dataset('most_popular_kr')
         if error:
             print(f"Trending topics error: {error}")
             return []
         
         topics = []
-        for item in data.get('items', [])[:20]:  # 상위 20개만
+        for item in items[:20]:  # 상위 20개만
             topics.append(item['snippet']['title'])
         
         return topics
@@ -206,74 +125,17 @@ def get_trending_shorts():
         return []
 
 
-# ============================================================
-# 채널 ID 추출
-# ============================================================
-
-def convert_handle_to_channel_id(handle):
-    """핸들명(@username)을 채널 ID로 변환 (API 키 로테이션 적용)"""
-    try:
-        handle = handle.lstrip('@')
-        
-        url = 'https://www.googleapis.com/youtube/v3/search'
-        params = {
-            'part': 'snippet',
-            'q': handle,
-            'type': 'channel',
-            'maxResults': 5
-        }
-        
-        data, error = make_youtube_api_request(url, params)
-        if error:
-            return None, error
-
-        if data and 'items' in data and len(data['items']) > 0:
-            for item in data['items']:
-                channel_title = item['snippet']['title'].lower()
-                if handle.lower() in channel_title or channel_title in handle.lower():
-                    return item['snippet']['channelId'], None
-            return data['items'][0]['snippet']['channelId'], None
-        
-        return None, "Channel not found by handle."
-    except Exception as e:
-        return None, str(e)
-
-
-def extract_channel_id(url):
-    """URL에서 채널 ID 추출 (API 키 로테이션 적용)"""
-    import re
-    
-    # @핸들 URL 형식
-    handle_match = re.search(r'youtube\.com/@([^/\?]+)', url)
-    if handle_match:
-        handle = handle_match.group(1)
-        return convert_handle_to_channel_id(handle)
-    
-    # 채널 ID URL 형식
-    id_match = re.search(r'youtube\.com/channel/([^/\?]+)', url)
-    if id_match:
-        return id_match.group(1), None
-    
-    # URL이 아닌 직접 입력 형식
-    if url.startswith('UC') and len(url) == 24:
-        return url, None
-    elif url.startswith('@'):
-        return convert_handle_to_channel_id(url)
-    
-    return None, "Invalid channel URL or handle format."
-
-
 # ============================================================
 # 숏폼 기획안 생성 API
 # ============================================================
 
 @shorts_planner_bp.route('/generate', methods=['POST'])
-def generate_shorts_plan():
-    """숏폼 영상 기획안 생성"""
-    
-    # 로그인 확인
-    if 'special_user_id' not in session:
-        return jsonify({'error': '로그인이 필요합니다'}), 401
+@shorts_planner_bp.route('/generate/stream', methods=['POST'], defaults={'stream': True})
+@shorts_planner_bp.route('/generate/async', methods=['POST'], defaults={'run_async': True})
+@special_user_required
+@background_job('shorts_planner.generate', session_keys=('special_user_id',))
+def generate_shorts_plan(stream=False):
+    """숏폼 영상 기획안 생성 (/stream은 SSE로 생성 중인 텍스트를 바로 전달, /async는 작업 ID 반환)"""
     
     try:
         data = request.json
@@ -291,7 +153,7 @@ def generate_shorts_plan():
             return jsonify({'error': 'Gemini API 키가 설정되지 않았습니다'}), 503
         
         # 채널 ID 추출
-        channel_id, error = extract_channel_id(channel_url)
+        channel_id, error = resolve_channel_id(channel_url)
         if error:
             return jsonify({'error': '채널 ID를 확인하는 중 오류가 발생했습니다.', 'details': error}), 500
         if not channel_id:
@@ -312,6 +174,7 @@ def generate_shorts_plan():
         if channel_analysis['shorts']:
             avg_views = sum(s['views'] for s in channel_analysis['shorts']) / len(channel_analysis['shorts'])
             popular_shorts = sorted(channel_analysis['shorts'], key=lambda x: x['views'], reverse=True)[:3]
+            popular_shorts = trim_field('shorts_planner.generate', 'titles', popular_shorts, key=lambda x: x['title'])
             
             shorts_info = f"""
 **채널의 기존 Shorts 분석:**
@@ -323,7 +186,7 @@ def generate_shorts_plan():
         
         trending_info = ""
         if trending:
-            trending_info = f"\n**현재 트렌드:**\n" + "\n".join(f"- {t}" for t in trending[:5])
+            trending_info = f"\n**현재 트렌드:**\n" + "\n".join(f"- {t}" for t in trim_field('shorts_planner.generate', 'trending', trending[:5]))
         
         prompt = f"""
 당신은 YouTube Shorts 전문 기획자입니다. 다음 채널을 위한 숏폼 영상 기획안을 작성해주세요.
@@ -331,7 +194,7 @@ def generate_shorts_plan():
 **채널 정보:**
 - 채널명: {channel_analysis['channel_name']}
 - 구독자: {channel_analysis['subscriber_count']:,}명
-- 채널 설명: {channel_analysis['description'][:200]}
+- 채널 설명: {trim_field('shorts_planner.generate', 'description', channel_analysis['description'])}
 {shorts_info}
 {trending_info}
 
@@ -399,7 +262,18 @@ def generate_shorts_plan():
 - 챌린지/트렌드 활용 방안
 """
         
+        channel_info = {
+            'name': channel_analysis['channel_name'],
+            'subscribers': channel_analysis['subscriber_count'],
+            'shorts_count': len(channel_analysis['shorts'])
+        }
+        
         # 4. AI 기획안 생성
+        if stream:
+            return sse_response(
+                gemini_client.stream(prompt, generation_config=SHORTS_GENERATION_CONFIG, endpoint='shorts_planner.generate'),
+                meta={'channel_info': channel_info}
+            )
         plan = call_gemini(prompt)
         
         if not plan:
@@ -407,11 +281,7 @@ def generate_shorts_plan():
         
         # 5. 응답
         return jsonify({
-            'channel_info': {
-                'name': channel_analysis['channel_name'],
-                'subscribers': channel_analysis['subscriber_count'],
-                'shorts_count': len(channel_analysis['shorts'])
-            },
+            'channel_info': channel_info,
             'plan': plan
         }), 200
         
@@ -1,94 +1,29 @@
 from flask import Blueprint, jsonify, request
-import requests
-import json
-import os
 from datetime import datetime, timedelta
+from src.utils.youtube_client import youtube_client
+from src.utils.channel_resolver import resolve_channel_id
+from src.utils.channel_snapshot import get_channel_snapshot, CHANNEL_NOT_FOUND
+from src.utils.trending_snapshot import get_dataset
+from src.utils.api_key_manager import get_gemini_api_key
+from src.utils.gemini_client import gemini_client
+from src.utils.token_budget import trim_field
 
 trends_bp = Blueprint('trends', __name__)
 
-def get_youtube_api_key():
-    """YouTube API 키 가져오기"""
-    api_key = None
-    
-    config_file = os.path.join(os.path.dirname(__file__), '..', 'config', 'api_keys.json')
-    if os.path.exists(config_file):
-        try:
-            with open(config_file, 'r') as f:
-                keys = json.load(f)
-                api_key = keys.get('youtube_api_key')
-        except:
-            pass
-    
-    if not api_key:
-        api_key = os.getenv('YOUTUBE_API_KEY')
-    
-    return api_key
-def get_gemini_api_key():
-    """Gemini API 키 가져오기"""
-    api_key = None
-    
-    config_file = os.path.join(os.path.dirname(__file__), '..', 'config', 'api_keys.json')
-    if os.path.exists(config_file):
-        try:
-            with open(config_file, 'r') as f:
-                keys = json.load(f)
-                api_key = keys.get('gemini_api_key')
-        except:
-            pass
-    
-    if not api_key:
-        api_key = os.getenv('GEMINI_API_KEY')
-    
-    return api_key
-
-def resolve_channel_id(input_str, api_key):
-    """핸들(@) 또는 채널명을 채널 ID로 변환"""
-    if input_str.startswith('UC') and len(input_str) == 24:
-        return input_str
-    
-    if input_str.startswith('@'):
-        input_str = input_str[1:]
-    
-    url = 'https://www.googleapis.com/youtube/v3/search'
-    params = {
-        'part': 'snippet',
-        'q': input_str,
-        'type': 'channel',
-        'maxResults': 1,
-        'key': api_key
-    }
-    
-    response = requests.get(url, params=params)
-    
-    if response.status_code == 200:
-        data = response.json()
-        if data.get('items'):
-            return data['items'][0]['snippet']['channelId']
-    
-    return None
 @trends_bp.route('/youtube-trending', methods=['GET'])
 def get_youtube_trending():
     """YouTube 트렌딩 영상 가져오기 (한국)"""
-    api_key = get_youtube_api_key()
-    
-    if not api_key:
+    if not youtube_client.has_keys():
         return jsonify({'error': 'YouTube API key not configured'}), 503
     
     try:
-        url = 'https://www.googleapis.com/youtube/v3/videos'
-        params = {
-            'part': 'snippet,statistics',
-            'chart': 'mostPopular',
-            'regionCode': 'KR',
-            'maxResults': 50,
-            'key': api_key
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
+        # 백그라운드에서 갱신되는 공유 스냅샷 (요청 경로에서 업스트림 호출 없음)
+        items, error = get_dataset('most_popular_kr')
+        if error:
+            return jsonify({'error': 'Failed to fetch trending videos', 'details': error}), 500
         
         videos = []
-        for video in data.get('items', []):
+        for video in items:
             videos.append({
                 'id': video['id'],
                 'title': video['snippet']['title'],
@@ -108,69 +43,37 @@ def get_youtube_trending():
 @trends_bp.route('/analyze-for-creator/<channel_id>', methods=['GET'])
 def analyze_trends_for_creator(channel_id):
     """크리에이터 맞춤형 트렌드 분석 및 추천"""
-    youtube_api_key = get_youtube_api_key()
     gemini_api_key = get_gemini_api_key()
     
-    if not youtube_api_key or not gemini_api_key:
+    if not youtube_client.has_keys() or not gemini_api_key:
         return jsonify({'error': 'API keys not configured'}), 503
     
     # 핸들(@) 또는 채널명을 채널 ID로 변환
-    resolved_id = resolve_channel_id(channel_id, youtube_api_key)
+    resolved_id, error = resolve_channel_id(channel_id)
     if not resolved_id:
-        return jsonify({'error': 'Channel not found'}), 404
+        return jsonify({'error': 'Channel not found', 'details': error}), 404
     
     channel_id = resolved_id
     
     try:
-        # 1. 크리에이터 채널 정보 가져오기
-        channel_url = 'https://www.googleapis.com/youtube/v3/channels'
-        channel_params = {
-            'part': 'snippet,statistics,contentDetails',
-            'id': channel_id,
-            'key': youtube_api_key
-        }
-        
-        channel_response = requests.get(channel_url, params=channel_params, timeout=10)
-        channel_data = channel_response.json()
-        
-        if 'items' not in channel_data or len(channel_data['items']) == 0:
+        # 1. 크리에이터 채널 정보 (채널 스냅샷: 채널 정보 + 최근 영상)
+        snapshot, error = get_channel_snapshot(channel_id)
+        if error == CHANNEL_NOT_FOUND:
             return jsonify({'error': 'Channel not found'}), 404
+        if error:
+            return jsonify({'error': 'Failed to fetch channel info', 'details': error}), 500
         
-        channel = channel_data['items'][0]
-        channel_title = channel['snippet']['title']
-        channel_description = channel['snippet']['description']
-        
-        # 2. 크리에이터의 최근 영상 10개 가져오기
-        uploads_playlist_id = channel['contentDetails']['relatedPlaylists']['uploads']
-        
-        videos_url = 'https://www.googleapis.com/youtube/v3/playlistItems'
-        videos_params = {
-            'part': 'snippet',
-            'playlistId': uploads_playlist_id,
-            'maxResults': 10,
-            'key': youtube_api_key
-        }
+        channel_title = snapshot['title']
+        channel_description = snapshot['description']
         
-        videos_response = requests.get(videos_url, params=videos_params, timeout=10)
-        videos_data = videos_response.json()
+        # 2. 크리에이터의 최근 영상 10개
+        creator_video_titles = [video['title'] for video in snapshot['videos'][:10]]
         
-        creator_video_titles = [item['snippet']['title'] for item in videos_data.get('items', [])]
-        
-        # 3. YouTube 트렌딩 영상 가져오기 (한국)
-        trending_url = 'https://www.googleapis.com/youtube/v3/videos'
-        trending_params = {
-            'part': 'snippet,statistics',
-            'chart': 'mostPopular',
-            'regionCode': 'KR',
-            'maxResults': 20,
-            'key': youtube_api_key
-        }
-        
-        trending_response = requests.get(trending_url, params=trending_params, timeout=10)
-        trending_data = trending_response.json()
+        # 3. YouTube 트렌딩 영상 (한국, 공유 스냅샷 상위 20개)
+        trending_items, error = get_dataset('most_popular_kr')
         
         trending_videos = []
-        for video in trending_data.get('items', []):
+        for video in (trending_items or [])[:20]:
             trending_videos.append({
                 'title': video['snippet']['title'],
                 'channelTitle': video['snippet']['channelTitle'],
@@ -183,12 +86,12 @@ def analyze_trends_for_creator(channel_id):
 
 **크리에이터 정보:**
 - 채널명: {channel_title}
-- 채널 설명: {channel_description}
+- 채널 설명: {trim_field('trends.analyze_for_creator', 'description', channel_description)}
 - 최근 영상 제목들:
-{chr(10).join([f"  - {title}" for title in creator_video_titles[:10]])}
+{chr(10).join([f"  - {title}" for title in trim_field('trends.analyze_for_creator', 'titles', creator_video_titles[:10])])}
 
 **현재 한국 YouTube 트렌딩 영상 Top 20:**
-{chr(10).join([f"  - {v['title']} (조회수: {v['views']:,})" for v in trending_videos[:20]])}
+{chr(10).join([f"  - {v['title']} (조회수: {v['views']:,})" for v in trim_field('trends.analyze_for_creator', 'trending', trending_videos[:20], key=lambda v: v['title'])])}
 
 **분석 요청:**
 1. 이 크리에이터의 콘텐츠 스타일과 주제를 분석하세요.
@@ -213,25 +116,11 @@ def analyze_trends_for_creator(channel_id):
 한국어로 작성하고, 실용적이고 구체적으로 답변해주세요."""
 
         # Gemini API 호출
-        gemini_url = f'https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={gemini_api_key}'
-        gemini_payload = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }],
-            "generationConfig": {
-                "temperature": 0.7,
-                "maxOutputTokens": 4096
-            }
-        }
+        analysis, error = gemini_client.generate(prompt, generation_config={
+            "temperature": 0.7
+        }, endpoint='trends.analyze_for_creator')
         
-        gemini_response = requests.post(gemini_url, json=gemini_payload, timeout=60)
-        gemini_data = gemini_response.json()
-        
-        if 'candidates' in gemini_data and len(gemini_data['candidates']) > 0:
-            analysis = gemini_data['candidates'][0]['content']['parts'][0]['text']
-            
+        if analysis:
             result = {
                 'channel_info': {
                     'title': channel_title,
@@ -243,7 +132,7 @@ def analyze_trends_for_creator(channel_id):
             
             return jsonify(result)
         else:
-            return jsonify({'error': 'Failed to generate AI analysis'}), 500
+            return jsonify({'error': 'Failed to generate AI analysis', 'details': error}), 500
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
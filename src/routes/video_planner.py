@@ -5,10 +5,14 @@
 
 from flask import Blueprint, request, jsonify, session
 from functools import wraps
-import google.generativeai as genai
 import os
 import json
 from datetime import datetime
+from typing import List
+from pydantic import BaseModel
+from src.utils.gemini_client import gemini_client
+from src.utils.job_queue import background_job
+from src.utils.token_budget import trim_field
 
 video_planner_bp = Blueprint('video_planner', __name__)
 
@@ -38,25 +42,102 @@ def require_special_account(f):
     return decorated_function
 
 
-def get_gemini_api_key():
+# 기획안 생성 모델
+PLANNER_MODEL = 'gemini-1.5-pro'
+
+
+def generate_json(prompt, schema, endpoint):
     """
-    API 키 로드 밸런싱
+    공용 Gemini 클라이언트로 JSON 모드 생성 (responseSchema 강제 + 검증, 실패 시 예외 발생)
     """
-    try:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'api_keys.json')
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                data = json.load(f)
-                keys = data.get('gemini_keys', [])
-                if keys:
-                    # 간단한 라운드 로빈 방식
-                    import random
-                    return random.choice(keys)
-    except Exception as e:
-        print(f"API 키 로드 중 오류: {e}")
-    
-    # 환경 변수에서 가져오기
-    return os.getenv('GEMINI_API_KEY')
+    data, error = gemini_client.generate_json(prompt, schema, model=PLANNER_MODEL, endpoint=endpoint)
+    if error:
+        raise RuntimeError(error)
+    return data
+
+
+# ============================================================
+# JSON 응답 스키마
+# ============================================================
+
+class ScriptSection(BaseModel):
+    timestamp: str
+    script: str
+
+
+class MainContentSection(BaseModel):
+    timestamp: str
+    section_title: str
+    script: str
+
+
+class VideoScript(BaseModel):
+    title: str
+    hook: str
+    intro: ScriptSection
+    main_content: List[MainContentSection]
+    outro: ScriptSection
+    cta: str
+
+
+class Scene(BaseModel):
+    scene_number: int
+    timestamp: str
+    scene_title: str
+    shot_type: str
+    camera_angle: str
+    description: str
+    props: List[str]
+    lighting: str
+    notes: str
+
+
+class SceneComposition(BaseModel):
+    scenes: List[Scene]
+    b_roll_suggestions: List[str]
+    editing_tips: List[str]
+
+
+class VideoInfo(BaseModel):
+    title: str
+    thumbnail_ideas: List[str]
+    estimated_duration: str
+
+
+class ShotDetail(BaseModel):
+    shot_type: str
+    camera_angle: str
+    props: List[str]
+    lighting: str
+    notes: str
+
+
+class ScriptAndScene(BaseModel):
+    timestamp: str
+    section: str
+    script: str
+    scene: ShotDetail
+
+
+class EditingGuide(BaseModel):
+    transitions: List[str]
+    music_style: str
+    color_grading: str
+    pacing: str
+
+
+class SeoOptimization(BaseModel):
+    tags: List[str]
+    description: str
+    keywords: List[str]
+
+
+class FullVideoPlan(BaseModel):
+    video_info: VideoInfo
+    script_and_scenes: List[ScriptAndScene]
+    editing_guide: EditingGuide
+    seo_optimization: SeoOptimization
+    checklist: List[str]
 
 
 @video_planner_bp.route('/check-access', methods=['GET'])
@@ -82,7 +163,9 @@ def check_access():
 
 
 @video_planner_bp.route('/generate-script', methods=['POST'])
+@video_planner_bp.route('/generate-script/async', methods=['POST'], defaults={'run_async': True})
 @require_special_account
+@background_job('video_planner_old.script', session_keys=('user_email',))
 def generate_script():
     """
     영상 대사 자동 생성
@@ -98,14 +181,10 @@ def generate_script():
         if not topic:
             return jsonify({'error': '주제를 입력해주세요.'}), 400
         
-        # Gemini API 설정
-        api_key = get_gemini_api_key()
-        if not api_key:
+        # Gemini API 설정 확인
+        if not gemini_client.has_keys():
             return jsonify({'error': 'API 키가 설정되지 않았습니다.'}), 500
         
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-pro')
-        
         # 프롬프트 구성
         prompt = f"""
 당신은 한국의 전문 유튜브 크리에이터 컨설턴트입니다.
@@ -149,17 +228,8 @@ JSON 형식으로 다음과 같이 작성해주세요:
 }}
 """
         
-        # AI 생성
-        response = model.generate_content(prompt)
-        result_text = response.text
-        
-        # JSON 추출 (마크다운 코드 블록 제거)
-        if '```json' in result_text:
-            result_text = result_text.split('```json')[1].split('```')[0].strip()
-        elif '```' in result_text:
-            result_text = result_text.split('```')[1].split('```')[0].strip()
-        
-        script_data = json.loads(result_text)
+        # AI 생성 (JSON 모드)
+        script_data = generate_json(prompt, VideoScript, 'video_planner_old.script')
         
         return jsonify({
             'success': True,
@@ -167,12 +237,6 @@ JSON 형식으로 다음과 같이 작성해주세요:
             'generated_at': datetime.now().isoformat()
         })
         
-    except json.JSONDecodeError as e:
-        return jsonify({
-            'error': 'AI 응답 파싱 실패',
-            'message': str(e),
-            'raw_response': result_text if 'result_text' in locals() else None
-        }), 500
     except Exception as e:
         return jsonify({
             'error': '대사 생성 중 오류 발생',
@@ -181,7 +245,9 @@ JSON 형식으로 다음과 같이 작성해주세요:
 
 
 @video_planner_bp.route('/generate-scenes', methods=['POST'])
+@video_planner_bp.route('/generate-scenes/async', methods=['POST'], defaults={'run_async': True})
 @require_special_account
+@background_job('video_planner_old.scenes', session_keys=('user_email',))
 def generate_scenes():
     """
     촬영 장면 구성 자동 생성
@@ -195,18 +261,15 @@ def generate_scenes():
         if not topic:
             return jsonify({'error': '주제를 입력해주세요.'}), 400
         
-        # Gemini API 설정
-        api_key = get_gemini_api_key()
-        if not api_key:
+        # Gemini API 설정 확인
+        if not gemini_client.has_keys():
             return jsonify({'error': 'API 키가 설정되지 않았습니다.'}), 500
         
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-pro')
-        
         # 프롬프트 구성
         script_context = ""
         if script:
-            script_context = f"\n\n**참고할 대사:**\n{json.dumps(script, ensure_ascii=False, indent=2)}"
+            script_json = trim_field('video_planner_old.scenes', 'script', json.dumps(script, ensure_ascii=False, indent=2))
+            script_context = f"\n\n**참고할 대사:**\n{script_json}"
         
         prompt = f"""
 당신은 한국의 전문 유튜브 영상 감독입니다.
@@ -251,17 +314,8 @@ JSON 형식으로 다음과 같이 작성해주세요:
 }}
 """
         
-        # AI 생성
-        response = model.generate_content(prompt)
-        result_text = response.text
-        
-        # JSON 추출
-        if '```json' in result_text:
-            result_text = result_text.split('```json')[1].split('```')[0].strip()
-        elif '```' in result_text:
-            result_text = result_text.split('```')[1].split('```')[0].strip()
-        
-        scenes_data = json.loads(result_text)
+        # AI 생성 (JSON 모드)
+        scenes_data = generate_json(prompt, SceneComposition, 'video_planner_old.scenes')
         
         return jsonify({
             'success': True,
@@ -269,12 +323,6 @@ JSON 형식으로 다음과 같이 작성해주세요:
             'generated_at': datetime.now().isoformat()
         })
         
-    except json.JSONDecodeError as e:
-        return jsonify({
-            'error': 'AI 응답 파싱 실패',
-            'message': str(e),
-            'raw_response': result_text if 'result_text' in locals() else None
-        }), 500
     except Exception as e:
         return jsonify({
             'error': '장면 구성 생성 중 오류 발생',
@@ -283,7 +331,9 @@ JSON 형식으로 다음과 같이 작성해주세요:
 
 
 @video_planner_bp.route('/generate-full-plan', methods=['POST'])
+@video_planner_bp.route('/generate-full-plan/async', methods=['POST'], defaults={'run_async': True})
 @require_special_account
+@background_job('video_planner_old.full_plan', session_keys=('user_email',))
 def generate_full_plan():
     """
     완전한 영상 기획안 생성 (대사 + 장면 통합)
@@ -299,14 +349,10 @@ def generate_full_plan():
         if not topic:
             return jsonify({'error': '주제를 입력해주세요.'}), 400
         
-        # Gemini API 설정
-        api_key = get_gemini_api_key()
-        if not api_key:
+        # Gemini API 설정 확인
+        if not gemini_client.has_keys():
             return jsonify({'error': 'API 키가 설정되지 않았습니다.'}), 500
         
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-pro')
-        
         # 통합 프롬프트
         prompt = f"""
 당신은 한국의 전문 유튜브 크리에이터 컨설턴트이자 영상 감독입니다.
@@ -365,17 +411,8 @@ JSON 형식으로 다음과 같이 작성해주세요:
 }}
 """
         
-        # AI 생성
-        response = model.generate_content(prompt)
-        result_text = response.text
-        
-        # JSON 추출
-        if '```json' in result_text:
-            result_text = result_text.split('```json')[1].split('```')[0].strip()
-        elif '```' in result_text:
-            result_text = result_text.split('```')[1].split('```')[0].strip()
-        
-        plan_data = json.loads(result_text)
+        # AI 생성 (JSON 모드)
+        plan_data = generate_json(prompt, FullVideoPlan, 'video_planner_old.full_plan')
         
         return jsonify({
             'success': True,
@@ -384,12 +421,6 @@ JSON 형식으로 다음과 같이 작성해주세요:
             'user_email': session.get('user_email')
         })
         
-    except json.JSONDecodeError as e:
-        return jsonify({
-            'error': 'AI 응답 파싱 실패',
-            'message': str(e),
-            'raw_response': result_text if 'result_text' in locals() else None
-        }), 500
     except Exception as e:
         return jsonify({
             'error': '기획안 생성 중 오류 발생',
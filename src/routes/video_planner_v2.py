@@ -8,7 +8,15 @@
 from flask import Blueprint, request, jsonify, session
 import os
 import sys
-from src.utils.api_key_manager import get_gemini_api_key, make_youtube_api_request
+from src.utils.api_key_manager import get_gemini_api_key
+from src.utils.gemini_client import gemini_client
+from src.utils.channel_resolver import resolve_channel_id
+from src.utils.channel_snapshot import get_channel_snapshot
+from src.utils.trending_snapshot import get_dataset
+from src.utils.concurrency import run_parallel
+from src.utils.sse import sse_response
+from src.utils.job_queue import background_job
+from src.utils.token_budget import trim_field
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -39,78 +47,37 @@ def special_user_required(f):
 # ============================================================
 
 def analyze_channel(channel_id):
-    """채널 스타일 분석 (API 키 로테이션 적용)"""
+    """채널 스타일 분석 (채널 스냅샷의 최근 영상 20개 중 조회수 상위 10개)"""
     try:
-        # 채널 정보
-        channel_url = 'https://www.googleapis.com/youtube/v3/channels'
-        channel_params = {
-            'part': 'snippet,statistics,contentDetails',
-            'id': channel_id
-        }
-        channel_data, error = make_youtube_api_request(channel_url, channel_params)
+        snapshot, error = get_channel_snapshot(channel_id)
         if error:
             print(f"Channel info error: {error}")
             return None, error
-
-        if not channel_data or 'items' not in channel_data or len(channel_data['items']) == 0:
-            return None, "Channel not found."
-        
-        channel_info = channel_data['items'][0]
         
-        # 최근 영상 가져오기
-        uploads_playlist_id = channel_info['contentDetails']['relatedPlaylists']['uploads']
-        
-        videos_url = 'https://www.googleapis.com/youtube/v3/playlistItems'
-        videos_params = {
-            'part': 'snippet',
-            'playlistId': uploads_playlist_id,
-            'maxResults': 20
-        }
-        videos_data, error = make_youtube_api_request(videos_url, videos_params)
-        if error:
-            print(f"Playlist items error: {error}")
-            # 채널 정보만이라도 반환
-            return {
-                'channel_name': channel_info['snippet']['title'],
-                'description': channel_info['snippet']['description'],
-                'subscriber_count': int(channel_info['statistics'].get('subscriberCount', 0)),
-                'video_count': int(channel_info['statistics'].get('videoCount', 0)),
-                'videos': []
-            }, None
-
-        video_ids = [item['snippet']['resourceId']['videoId'] for item in videos_data.get('items', [])]
+        if snapshot['videos_error']:
+            print(f"Playlist items error: {snapshot['videos_error']}")
         
-        # 영상 상세 정보
-        videos = []
-        if video_ids:
-            details_url = 'https://www.googleapis.com/youtube/v3/videos'
-            details_params = {
-                'part': 'statistics,snippet',
-                'id': ','.join(video_ids)
+        videos = [
+            {
+                'title': video['title'],
+                'views': video['views'],
+                'likes': video['likes'],
+                'comments': video['comments']
             }
-            details_data, error = make_youtube_api_request(details_url, details_params)
-            if error:
-                print(f"Video details error: {error}")
-            
-            for item in details_data.get('items', []):
-                videos.append({
-                    'title': item['snippet']['title'],
-                    'views': int(item['statistics'].get('viewCount', 0)),
-                    'likes': int(item['statistics'].get('likeCount', 0)),
-                    'comments': int(item['statistics'].get('commentCount', 0))
-                })
+            for video in snapshot['videos'][:20]
+        ]
         
         return {
-            'channel_name': channel_info['snippet']['title'],
-            'description': channel_info['snippet']['description'],
-            'subscriber_count': int(channel_info['statistics'].get('subscriberCount', 0)),
-            'video_count': int(channel_info['statistics'].get('videoCount', 0)),
+            'channel_name': snapshot['title'],
+            'description': snapshot['description'],
+            'subscriber_count': snapshot['subscriber_count'],
+            'video_count': snapshot['video_count'],
             'videos': sorted(videos, key=lambda x: x['views'], reverse=True)[:10]
-        }
+        }, None
     
     except Exception as e:
         print(f"Channel analysis error: {e}")
-        return None
+        return None, str(e)
 
 # ============================================================
 # 트렌드 분석
@@ -119,20 +86,14 @@ def analyze_channel(channel_id):
 def get_trending_topics():
     """현재 트렌딩 주제 분석 (API 키 로테이션 적용)"""
     try:
-        url = 'https://www.googleapis.com/youtube/v3/videos'
-        params = {
-            'part': 'snippet',
-            'chart': 'mostPopular',
-            'regionCode': 'KR',
-            'maxResults': 10
-        }
-        data, error = make_youtube_api_request(url, params)
+        # 백그라운드에서 갱신되는 인기 급상승 공유 스냅샷
+        items, error = get_dataset('most_popular_kr')
         if error:
             print(f"Trending topics error: {error}")
             return []
         
         topics = []
-        for item in data.get('items', []):
+        for item in items[:10]:
             topics.append({
                 'title': item['snippet']['title'],
                 'category': item['snippet'].get('categoryId', '')
@@ -148,43 +109,32 @@ def get_trending_topics():
 # Gemini API 호출
 # ============================================================
 
-def call_gemini(prompt, api_key):
-    """Gemini API 호출"""
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={api_key}"
-    
-    data = {
-        "contents": [{
-            "parts": [{
-                "text": prompt
-            }]
-        }],
-        "generationConfig": {
-            "temperature": 0.8,
-            "maxOutputTokens": 8192,
-        }
-    }
-    
-    try:
-        response = requests.post(url, json=data, timeout=120)
-        response.raise_for_status()
-        result = response.json()
-        
-        if 'candidates' in result and len(result['candidates']) > 0:
-            return result['candidates'][0]['content']['parts'][0]['text']
-        
-        return None
-    except Exception as e:
-        print(f"Gemini API error: {e}")
+# 기획안 생성 generationConfig (maxOutputTokens는 엔드포인트별 토큰 예산으로 설정)
+PLAN_GENERATION_CONFIG = {
+    "temperature": 0.8,
+}
+
+def call_gemini(prompt, api_key=None):
+    """Gemini API 호출 (api_key를 지정하지 않으면 키 부하 분산)"""
+    text, error = gemini_client.generate(
+        prompt, generation_config=PLAN_GENERATION_CONFIG, api_key=api_key, endpoint='video_planner.generate'
+    )
+    if error:
+        print(f"Gemini API error: {error}")
         return None
+    return text
 
 # ============================================================
 # 영상 기획안 생성
 # ============================================================
 
 @video_planner_v2_bp.route('/generate', methods=['POST'])
+@video_planner_v2_bp.route('/generate/stream', methods=['POST'], defaults={'stream': True})
+@video_planner_v2_bp.route('/generate/async', methods=['POST'], defaults={'run_async': True})
 @special_user_required
-def generate_plan():
-    """맞춤형 영상 기획안 생성"""
+@background_job('video_planner.generate', session_keys=('special_user_id',))
+def generate_plan(stream=False):
+    """맞춤형 영상 기획안 생성 (/stream은 SSE로 생성 중인 텍스트를 바로 전달, /async는 작업 ID 반환)"""
     try:
         data = request.json
         channel_url = data.get('channel_url')  # 유튜브 채널 URL
@@ -201,37 +151,47 @@ def generate_plan():
             return jsonify({'error': 'Gemini API 키가 설정되지 않았습니다'}), 503
         
         # 채널 ID 추출
-        channel_id, error = extract_channel_id(channel_url)
+        channel_id, error = resolve_channel_id(channel_url)
         if error:
             return jsonify({'error': '채널 ID를 확인하는 중 오류가 발생했습니다.', 'details': error}), 500
         if not channel_id:
             return jsonify({'error': '유효하지 않은 채널 URL입니다'}), 400
         
-        # 1. 채널 분석
-        channel_analysis, error = analyze_channel(channel_id)
+        # 1. 채널 분석과 2. 트렌드 분석을 동시에 실행
+        results = run_parallel({
+            'channel': lambda: analyze_channel(channel_id),
+            'trending': get_trending_topics
+        })
+        channel_analysis, error = results['channel'] or (None, '채널 분석 시간이 초과되었습니다.')
         if error:
             return jsonify({'error': '채널 분석 중 오류가 발생했습니다.', 'details': error}), 500
         if not channel_analysis:
             return jsonify({'error': '채널 정보를 가져올 수 없습니다'}), 500
         
-        # 2. 트렌드 분석
-        trending = get_trending_topics()
+        trending = results['trending'] or []
         
         # 3. 프롬프트 생성
         prompt = create_planning_prompt(channel_analysis, trending, user_topic, user_keywords, video_length)
         
+        channel_info = {
+            'name': channel_analysis['channel_name'],
+            'subscribers': channel_analysis['subscriber_count']
+        }
+        
         # 4. AI 기획안 생성
-        plan = call_gemini(prompt, gemini_key)
+        if stream:
+            return sse_response(
+                gemini_client.stream(prompt, generation_config=PLAN_GENERATION_CONFIG, endpoint='video_planner.generate'),
+                meta={'channel_info': channel_info}
+            )
+        plan = call_gemini(prompt)
         
         if not plan:
             return jsonify({'error': '기획안 생성에 실패했습니다'}), 500
         
         return jsonify({
             'plan': plan,
-            'channel_info': {
-                'name': channel_analysis['channel_name'],
-                'subscribers': channel_analysis['subscriber_count']
-            }
+            'channel_info': channel_info
         })
     
     except Exception as e:
@@ -244,73 +204,20 @@ def generate_plan():
 # 유틸리티 함수
 # ============================================================
 
-def convert_handle_to_channel_id(handle):
-    """핸들명(@username)을 채널 ID로 변환 (API 키 로테이션 적용)"""
-    try:
-        handle = handle.lstrip('@')
-        print(f"[CONVERT] Searching for handle: {handle}")
-        
-        url = 'https://www.googleapis.com/youtube/v3/search'
-        params = {
-            'part': 'snippet',
-            'q': handle,
-            'type': 'channel',
-            'maxResults': 5
-        }
-        
-        data, error = make_youtube_api_request(url, params)
-        if error:
-            return None, error
-
-        if data and 'items' in data and len(data['items']) > 0:
-            # 핸들명과 가장 유사한 채널을 찾음
-            for item in data['items']:
-                channel_title = item['snippet']['title'].lower()
-                if handle.lower() in channel_title or channel_title in handle.lower():
-                    return item['snippet']['channelId'], None
-            # 정확히 일치하지 않으면 첫 번째 결과 반환
-            return data['items'][0]['snippet']['channelId'], None
-        
-        return None, "Channel not found by handle."
-    except Exception as e:
-        return None, str(e)
-
-def extract_channel_id(url):
-    """URL에서 채널 ID 추출 (API 키 로테이션 적용)"""
-    import re
-    
-    # @핸들 URL 형식
-    handle_match = re.search(r'youtube\.com/@([^/\?]+)', url)
-    if handle_match:
-        handle = handle_match.group(1)
-        return convert_handle_to_channel_id(handle)
-    
-    # 채널 ID URL 형식
-    id_match = re.search(r'youtube\.com/channel/([^/\?]+)', url)
-    if id_match:
-        return id_match.group(1), None
-    
-    # URL이 아닌 직접 입력 형식
-    if url.startswith('UC') and len(url) == 24:
-        return url, None
-    elif url.startswith('@'):
-        return convert_handle_to_channel_id(url)
-    
-    return None, "Invalid channel URL or handle format."
-
 def create_planning_prompt(channel_analysis, trending, user_topic, user_keywords, video_length):
     """AI 프롬프트 생성"""
     
     # 인기 영상 정보
+    top_videos = trim_field('video_planner.generate', 'titles', channel_analysis['videos'][:5], key=lambda v: v['title'])
     top_videos_text = "\n".join([
         f"{i+1}. {v['title']} (조회수: {v['views']:,})"
-        for i, v in enumerate(channel_analysis['videos'][:5])
+        for i, v in enumerate(top_videos)
     ])
     
     # 트렌드 정보
     trending_text = "\n".join([
         f"- {t['title']}"
-        for t in trending[:5]
+        for t in trim_field('video_planner.generate', 'trending', trending[:5], key=lambda t: t['title'])
     ])
     
     prompt = f"""당신은 유튜브 콘텐츠 기획 전문가입니다. 다음 정보를 바탕으로 **크리에이터 맞춤형 영상 기획안**을 작성해주세요.
@@ -318,7 +225,7 @@ def create_planning_prompt(channel_analysis, trending, user_topic, user_keywords
 ## 크리에이터 정보
 - **채널명**: {channel_analysis['channel_name']}
 - **구독자**: {channel_analysis['subscriber_count']:,}명
-- **채널 설명**: {channel_analysis['description'][:200]}
+- **채널 설명**: {trim_field('video_planner.generate', 'description', channel_analysis['description'])}
 
 ## 인기 영상 Top 5
 {top_videos_text}
@@ -7,302 +7,335 @@ data_api_path = '/opt/.manus/.sandbox-runtime'
 if os.path.exists(data_api_path) and data_api_path not in sys.path:
     sys.path.append(data_api_path)
 
-from flask import Blueprint, jsonify
-import requests
-from src.utils.cache import cache, get_channel_cache_key, get_videos_cache_key
+import json
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from src.utils.cache import cache, get_channel_cache_key, get_videos_cache_key, get_hashtags_cache_key, get_insights_cache_key, get_negatives
+from src.utils.youtube_client import youtube_client
+from src.utils.youtube_quota import get_quota_cost
+from src.utils.channel_resolver import resolve_channel_id, normalize_handle, parse_channel_input
+from src.utils.concurrency import run_parallel, iter_parallel
+from src.utils.gemini_client import gemini_client, cache_bypass_requested
+from src.utils.token_budget import trim_field
+from src.utils.channel_snapshot import get_channel_snapshot, CHANNEL_NOT_FOUND
+from src.utils.entity_store import entity_store
+from src.utils.trending_snapshot import get_dataset
 from src.models.channel_database import channel_db
+from src.routes.analytics import build_performance_report
+from src.middleware.auth import require_admin
 
 youtube_bp = Blueprint('youtube', __name__)
 
-# API 키 로드 밸런싱을 위한 전역 변수
-_api_key_index = 0
-_api_keys_cache = None
+# 채널 인사이트(AI) 응답 캐시 유효 시간 (초)
+INSIGHTS_CACHE_TTL = 21600
 
-def get_youtube_api_keys():
-    """
-    환경변수에서 YouTube API 키 목록 가져오기
-    
-    환경변수 형식:
-    - YOUTUBE_API_KEY: 단일 키
-    - YOUTUBE_API_KEY_1, YOUTUBE_API_KEY_2, ...: 여러 키
-    
-    Returns:
-        list: API 키 리스트
-    """
-    global _api_keys_cache
-    
-    # 캐시된 키가 있으면 반환
-    if _api_keys_cache is not None:
-        return _api_keys_cache
-    
-    api_keys = []
-    
-    # 단일 키 확인
-    single_key = os.getenv('YOUTUBE_API_KEY')
-    if single_key:
-        api_keys.append(single_key)
-    
-    # 여러 키 확인 (YOUTUBE_API_KEY_1, YOUTUBE_API_KEY_2, ...)
-    index = 1
-    while True:
-        key = os.getenv(f'YOUTUBE_API_KEY_{index}')
-        if not key:
-            break
-        api_keys.append(key)
-        index += 1
-    
-    # 중복 제거
-    api_keys = list(set(api_keys))
-    
-    # 캐시 저장
-    _api_keys_cache = api_keys if api_keys else None
-    
-    return _api_keys_cache
+# 대시보드 섹션 (include 파라미터가 없으면 전체)
+DASHBOARD_SECTIONS = ('channel', 'videos', 'performance', 'insights')
 
-def get_youtube_api_key():
-    """
-    YouTube API 키 가져오기 - 로드 밸런싱
-    
-    여러 키가 있으면 라운드 로빈 방식으로 순환
-    
-    Returns:
-        str: API 키
-    """
-    global _api_key_index
-    
-    api_keys = get_youtube_api_keys()
-    
-    if not api_keys:
-        return None
-    
-    # 단일 키면 바로 반환
-    if len(api_keys) == 1:
-        return api_keys[0]
-    
-    # 여러 키면 라운드 로빈
-    key = api_keys[_api_key_index % len(api_keys)]
-    _api_key_index += 1
-    
-    return key
+# 일괄 채널 조회 요청당 최대 입력 수
+BULK_MAX_CHANNELS = 500
+# channels.list 한 번에 조회 가능한 최대 채널 수
+BULK_BATCH_SIZE = 50
+# 일괄 조회 전체 마감 시간 (초, 단계별)
+BULK_TIMEOUT = 60
+# 일괄 조회 요청당 채널명(자유 텍스트) 검색 최대 수 - search.list는 1회 100 단위
+BULK_MAX_QUERIES = 10
 
-def resolve_channel_id(input_str, api_key):
-    """핸들(@) 또는 채널명을 채널 ID로 변환"""
-    # 이미 채널 ID 형식이면 그대로 반환
-    if input_str.startswith('UC') and len(input_str) == 24:
-        return input_str
-    
-    # @ 제거
-    if input_str.startswith('@'):
-        input_str = input_str[1:]
+
+def build_channel_info(channel):
+    """channels.list 항목(snippet, statistics, brandingSettings)으로 채널 정보 응답 구성"""
+    # 구독자 수를 한국어 형식으로 변환
+    def format_subscribers(count):
+        count = int(count)
+        if count >= 10000:
+            return f"{count/10000:.1f}만"
+        elif count >= 1000:
+            return f"{count/1000:.1f}천"
+        else:
+            return str(count)
     
-    # YouTube Data API v3의 search 엔드포인트 사용
-    url = 'https://www.googleapis.com/youtube/v3/search'
-    params = {
-        'part': 'snippet',
-        'q': input_str,
-        'type': 'channel',
-        'maxResults': 1,
-        'key': api_key
+    # 핸들 추출
+    handle = channel['snippet'].get('customUrl', '')
+    if handle and not handle.startswith('@'):
+        handle = '@' + handle
+    
+    # 응답 데이터 구성
+    result = {
+        'handle': handle,
+        'id': channel['id'],
+        'title': channel['snippet']['title'],
+        'description': channel['snippet']['description'],
+        'customUrl': channel['snippet'].get('customUrl', ''),
+        'publishedAt': channel['snippet']['publishedAt'],
+        'thumbnail': channel['snippet']['thumbnails']['high']['url'],
+        'country': channel['snippet'].get('country', ''),
+        'stats': {
+            'subscribers': channel['statistics'].get('subscriberCount', '0'),
+            'subscribersText': format_subscribers(channel['statistics'].get('subscriberCount', '0')),
+            'views': int(channel['statistics'].get('viewCount', 0)),
+            'videos': int(channel['statistics'].get('videoCount', 0))
+        }
     }
     
-    response = requests.get(url, params=params)
+    # 배너 이미지 추가 (있는 경우)
+    if 'brandingSettings' in channel and 'image' in channel['brandingSettings']:
+        result['bannerImage'] = channel['brandingSettings']['image'].get('bannerExternalUrl', '')
     
-    if response.status_code == 200:
-        data = response.json()
-        if data.get('items'):
-            return data['items'][0]['snippet']['channelId']
+    # 키워드 추가 (있는 경우)
+    if 'brandingSettings' in channel and 'channel' in channel['brandingSettings']:
+        result['keywords'] = channel['brandingSettings']['channel'].get('keywords', '')
     
-    return None
+    return result
+
+
+def save_channel_info(result):
+    """채널 정보와 핸들을 데이터베이스에 저장"""
+    try:
+        channel_db.save_channel(result)
+        if result['handle']:
+            channel_db.save_handle(normalize_handle(result['handle']), result['id'])
+    except Exception as e:
+        print(f"Failed to save channel to database: {e}")
+
+
+def build_video_list(snapshot):
+    """채널 스냅샷의 최근 업로드로 영상 목록 응답 구성"""
+    # 텍스트 형식 변환
+    def format_count(count):
+        if count >= 1000000:
+            return f"{count/1000000:.1f}M"
+        elif count >= 1000:
+            return f"{count/1000:.1f}K"
+        return str(count)
+    
+    videos = []
+    for video in snapshot['videos']:
+        videos.append({
+            'id': video['id'],
+            'title': video['title'],
+            'description': video['description'],
+            'publishedAt': video['publishedAt'],
+            'thumbnail': video['thumbnail'],
+            'thumbnails': [{'url': video['thumbnail']}],
+            'channelTitle': video['channelTitle'],
+            'viewCount': video['views'],
+            'likeCount': video['likes'],
+            'commentCount': video['comments'],
+            'viewCountText': f"{format_count(video['views'])} 조회",
+            'likeCountText': format_count(video['likes']),
+            'commentCountText': format_count(video['comments'])
+        })
+    return videos
+
 
 @youtube_bp.route('/channel/<channel_id>', methods=['GET'])
 def get_channel(channel_id):
     """채널 정보 조회 (YouTube Data API v3)"""
-    api_key = get_youtube_api_key()
-    
-    if not api_key:
+    if not youtube_client.has_keys():
         return jsonify({'error': 'YouTube API key not configured'}), 503
     
     # 핸들(@) 또는 채널명을 채널 ID로 변환
-    resolved_id = resolve_channel_id(channel_id, api_key)
+    resolved_id, error = resolve_channel_id(channel_id)
     if not resolved_id:
-        return jsonify({'error': 'Channel not found'}), 404
+        return jsonify({'error': 'Channel not found', 'details': error}), 404
     
     channel_id = resolved_id
     
+    # 캐시 확인
+    cache_key = get_channel_cache_key(channel_id)
+    cached = cache.get(cache_key)
+    if cached:
+        return jsonify(cached)
+    
     try:
-        # YouTube Data API v3 호출
-        url = 'https://www.googleapis.com/youtube/v3/channels'
-        params = {
-            'part': 'snippet,statistics,brandingSettings',
-            'id': channel_id,
-            'key': api_key
-        }
-        
-        response = requests.get(url, params=params)
-        
-        if response.status_code != 200:
-            return jsonify({'error': 'Failed to fetch channel data'}), response.status_code
-        
-        data = response.json()
-        
-        if not data.get('items'):
+        # 채널 스냅샷 (채널 정보 + 최근 업로드, 다른 채널 엔드포인트와 공유)
+        snapshot, error = get_channel_snapshot(channel_id)
+        if error == CHANNEL_NOT_FOUND:
             return jsonify({'error': 'Channel not found'}), 404
+        if error:
+            return jsonify({'error': 'Failed to fetch channel data', 'details': error}), 500
         
-        channel = data['items'][0]
-        
-        # 구독자 수를 한국어 형식으로 변환
-        def format_subscribers(count):
-            count = int(count)
-            if count >= 10000:
-                return f"{count/10000:.1f}만"
-            elif count >= 1000:
-                return f"{count/1000:.1f}천"
-            else:
-                return str(count)
-        
-        # 핸들 추출
-        handle = channel['snippet'].get('customUrl', '')
-        if handle and not handle.startswith('@'):
-            handle = '@' + handle
-        
-        # 응답 데이터 구성
-        result = {
-            'handle': handle,
-            'id': channel['id'],
-            'title': channel['snippet']['title'],
-            'description': channel['snippet']['description'],
-            'customUrl': channel['snippet'].get('customUrl', ''),
-            'publishedAt': channel['snippet']['publishedAt'],
-            'thumbnail': channel['snippet']['thumbnails']['high']['url'],
-            'country': channel['snippet'].get('country', ''),
-            'stats': {
-                'subscribers': channel['statistics'].get('subscriberCount', '0'),
-                'subscribersText': format_subscribers(channel['statistics'].get('subscriberCount', '0')),
-                'views': int(channel['statistics'].get('viewCount', 0)),
-                'videos': int(channel['statistics'].get('videoCount', 0))
-            }
-        }
-        
-        # 배너 이미지 추가 (있는 경우)
-        if 'brandingSettings' in channel and 'image' in channel['brandingSettings']:
-            result['bannerImage'] = channel['brandingSettings']['image'].get('bannerExternalUrl', '')
-        
-        # 키워드 추가 (있는 경우)
-        if 'brandingSettings' in channel and 'channel' in channel['brandingSettings']:
-            result['keywords'] = channel['brandingSettings']['channel'].get('keywords', '')
+        result = build_channel_info(snapshot['channel'])
+        save_channel_info(result)
         
-        # 데이터베이스에 저장
-        try:
-            channel_db.save_channel(result)
-        except Exception as e:
-            print(f"Failed to save channel to database: {e}")
-        
-        # 캐시에 저장 (24시간)
-        cache_key = get_channel_cache_key(channel_id)
-        cache.set(cache_key, result, ttl=86400)
+        # 캐시에 저장 (1시간, 구독자 수 등 통계가 너무 오래되지 않도록)
+        cache.set(cache_key, result, ttl=3600)
         
         return jsonify(result)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@youtube_bp.route('/channels/bulk', methods=['POST'])
+@require_admin
+def bulk_channel_lookup():
+    """
+    채널 일괄 조회 (관리자 전용) - 결과를 NDJSON으로 한 줄씩 전달
+
+    Body:
+        channels: 채널 ID, @핸들, URL 또는 채널명 목록 (최대 BULK_MAX_CHANNELS개)
+
+    입력을 병렬로 채널 ID로 변환한 뒤, 캐시에 있는 채널은 바로 반환하고
+    나머지는 50개씩 묶어 엔티티 저장소에서 동시에 조회 (저장소에도 없거나 오래된 채널만
+    channels.list 호출, 채널 50개당 1 단위).
+    채널명(자유 텍스트) 입력은 search.list(100 단위)가 필요하므로 요청당 BULK_MAX_QUERIES개까지만
+    검색하고, 나머지는 채널 ID/핸들/URL을 요청하는 오류 줄로 응답.
+
+    응답 줄 형식:
+        {"input", "channel_id", "channel", "source": "cache" | "api"} 또는 {"input", "error"}
+        마지막 줄: {"summary": {requested, found, failed, upstream_batches, searches, max_quota_units}}
+        (max_quota_units는 캐시 적중이 없을 때의 최대 할당량 사용량)
+    """
+    if not youtube_client.has_keys():
+        return jsonify({'error': 'YouTube API key not configured'}), 503
+    
+    data = request.get_json(silent=True) or {}
+    inputs = data.get('channels')
+    if not isinstance(inputs, list) or not inputs:
+        return jsonify({'error': 'channels 목록이 필요합니다'}), 400
+    
+    # 빈 값과 중복 입력 제거 (순서 유지)
+    inputs = list(dict.fromkeys(str(value).strip() for value in inputs if str(value).strip()))
+    if len(inputs) > BULK_MAX_CHANNELS:
+        return jsonify({'error': f'한 번에 최대 {BULK_MAX_CHANNELS}개까지 조회할 수 있습니다'}), 400
+    
+    def line(payload):
+        return json.dumps(payload, ensure_ascii=False) + '\n'
+    
+    def generate():
+        summary = {
+            'requested': len(inputs), 'found': 0, 'failed': 0,
+            'upstream_batches': 0, 'searches': 0, 'max_quota_units': 0
+        }
+        
+        # 1. 채널명 검색은 요청당 BULK_MAX_QUERIES개까지만 허용
+        to_resolve = []
+        for value in inputs:
+            kind, _ = parse_channel_input(value)
+            if kind == 'query':
+                if summary['searches'] >= BULK_MAX_QUERIES:
+                    summary['failed'] += 1
+                    yield line({
+                        'input': value,
+                        'error': f'Channel name search is limited to {BULK_MAX_QUERIES} per request. '
+                                 'Use a channel ID, @handle or channel URL.'
+                    })
+                    continue
+                summary['searches'] += 1
+                summary['max_quota_units'] += get_quota_cost('search')
+            elif kind != 'id':
+                summary['max_quota_units'] += get_quota_cost('channels')
+            to_resolve.append(value)
+        
+        # 2. 채널 ID로 변환 (ID 입력은 업스트림 호출 없음)
+        inputs_by_id = {}
+        resolved = iter_parallel(
+            {value: (lambda v=value: resolve_channel_id(v)) for value in to_resolve},
+            timeout=BULK_TIMEOUT,
+            default=(None, 'Channel resolution timed out.')
+        )
+        for value, (channel_id, error) in resolved:
+            if not channel_id:
+                summary['failed'] += 1
+                yield line({'input': value, 'error': error or 'Channel not found.'})
+                continue
+            inputs_by_id.setdefault(channel_id, []).append(value)
+        
+        # 3. 캐시에 있는 채널은 바로 반환
+        missing = []
+        for channel_id, values in inputs_by_id.items():
+            cached = cache.get(get_channel_cache_key(channel_id))
+            if not cached:
+                missing.append(channel_id)
+                continue
+            for value in values:
+                summary['found'] += 1
+                yield line({'input': value, 'channel_id': channel_id, 'channel': cached, 'source': 'cache'})
+        
+        # 4. 나머지는 50개씩 묶어 동시에 조회
+        batches = {
+            start: missing[start:start + BULK_BATCH_SIZE]
+            for start in range(0, len(missing), BULK_BATCH_SIZE)
+        }
+        summary['upstream_batches'] = len(batches)
+        summary['max_quota_units'] += len(batches) * get_quota_cost('channels')
+        fetched = iter_parallel(
+            {
+                start: (lambda ids=batch: entity_store.get_channels(
+                    ids,
+                    parts=('snippet', 'statistics', 'brandingSettings')
+                ))
+                for start, batch in batches.items()
+            },
+            timeout=BULK_TIMEOUT,
+            default=(None, 'Upstream request timed out.')
+        )
+        for start, (items, error) in fetched:
+            items = items or {}
+            # 결과에 없는 ID 중 부정 캐시에 기록된 것은 '없음', 나머지는 실패한 묶음의 오류
+            not_found = set()
+            if error:
+                not_found = get_negatives('channels', [
+                    channel_id for channel_id in batches[start] if channel_id not in items
+                ])
+            for channel_id in batches[start]:
+                if channel_id not in items:
+                    message = error if error and channel_id not in not_found else 'Channel not found.'
+                    for value in inputs_by_id[channel_id]:
+                        summary['failed'] += 1
+                        yield line({'input': value, 'channel_id': channel_id, 'error': message})
+                    continue
+                
+                result = build_channel_info(items[channel_id])
+                save_channel_info(result)
+                cache.set(get_channel_cache_key(channel_id), result, ttl=3600)
+                for value in inputs_by_id[channel_id]:
+                    summary['found'] += 1
+                    yield line({'input': value, 'channel_id': channel_id, 'channel': result, 'source': 'api'})
+        
+        yield line({'summary': summary})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
 @youtube_bp.route('/channel/<channel_id>/videos', methods=['GET'])
 def get_channel_videos(channel_id):
     """채널의 최신 동영상 조회"""
-    api_key = get_youtube_api_key()
-    
-    if not api_key:
+    if not youtube_client.has_keys():
         return jsonify({'error': 'YouTube API key not configured'}), 503
     
     # 핸들(@) 또는 채널명을 채널 ID로 변환
-    resolved_id = resolve_channel_id(channel_id, api_key)
+    resolved_id, error = resolve_channel_id(channel_id)
     if not resolved_id:
-        return jsonify({'error': 'Channel not found'}), 404
+        return jsonify({'error': 'Channel not found', 'details': error}), 404
     
     channel_id = resolved_id
     
+    # 캐시 확인
+    cache_key = get_videos_cache_key(channel_id)
+    cached = cache.get(cache_key)
+    if cached:
+        return jsonify(cached)
+    
     try:
-        # YouTube Data API v3 호출 - 최신 동영상 50개
-        url = 'https://www.googleapis.com/youtube/v3/search'
-        params = {
-            'part': 'snippet',
-            'channelId': channel_id,
-            'order': 'date',
-            'type': 'video',
-            'maxResults': 50,
-            'key': api_key
-        }
-        
-        response = requests.get(url, params=params)
-        
-        if response.status_code != 200:
-            return jsonify({'error': 'Failed to fetch videos'}), response.status_code
-        
-        data = response.json()
-        
-        # 비디오 ID 목록 추출
-        video_ids = [item['id']['videoId'] for item in data.get('items', [])]
-        
-        # 비디오 통계 정보 가져오기 (조회수, 좋아요, 댓글 수)
-        stats_map = {}
-        if video_ids:
-            # 한 번에 최대 50개까지 조회 가능
-            stats_url = 'https://www.googleapis.com/youtube/v3/videos'
-            stats_params = {
-                'part': 'statistics',
-                'id': ','.join(video_ids),
-                'key': api_key
-            }
-            stats_response = requests.get(stats_url, params=stats_params)
-            if stats_response.status_code == 200:
-                stats_data = stats_response.json()
-                for video in stats_data.get('items', []):
-                    video_id = video['id']
-                    stats = video.get('statistics', {})
-                    stats_map[video_id] = {
-                        'viewCount': int(stats.get('viewCount', 0)),
-                        'likeCount': int(stats.get('likeCount', 0)),
-                        'commentCount': int(stats.get('commentCount', 0))
-                    }
-        
-        videos = []
-        for item in data.get('items', []):
-            video_id = item['id']['videoId']
-            video_stats = stats_map.get(video_id, {
-                'viewCount': 0,
-                'likeCount': 0,
-                'commentCount': 0
-            })
-            
-            view_count = video_stats['viewCount']
-            like_count = video_stats['likeCount']
-            comment_count = video_stats['commentCount']
-            
-            # 텍스트 형식 변환
-            def format_count(count):
-                if count >= 1000000:
-                    return f"{count/1000000:.1f}M"
-                elif count >= 1000:
-                    return f"{count/1000:.1f}K"
-                return str(count)
-            
-            videos.append({
-                'id': video_id,
-                'title': item['snippet']['title'],
-                'description': item['snippet']['description'],
-                'publishedAt': item['snippet']['publishedAt'],
-                'thumbnail': item['snippet']['thumbnails']['high']['url'],
-                'thumbnails': [{'url': item['snippet']['thumbnails']['high']['url']}],
-                'channelTitle': item['snippet']['channelTitle'],
-                'viewCount': view_count,
-                'likeCount': like_count,
-                'commentCount': comment_count,
-                'viewCountText': f"{format_count(view_count)} 조회",
-                'likeCountText': format_count(like_count),
-                'commentCountText': format_count(comment_count)
-            })
+        # 채널 스냅샷의 최근 업로드 (업로드 재생목록 기준, CHANNEL_UPLOADS_DEPTH개, 기본 50)
+        snapshot, error = get_channel_snapshot(channel_id)
+        if error == CHANNEL_NOT_FOUND:
+            return jsonify({'error': 'Channel not found'}), 404
+        if error:
+            return jsonify({'error': 'Failed to fetch videos', 'details': error}), 500
+        if snapshot['videos_error']:
+            return jsonify({'error': 'Failed to fetch videos', 'details': snapshot['videos_error']}), 500
         
-        return jsonify({'videos': videos})
+        result = {'videos': build_video_list(snapshot)}
+        cache.set(cache_key, result, ttl=900)  # 15분
+        return jsonify(result)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -310,57 +343,34 @@ def get_channel_videos(channel_id):
 @youtube_bp.route('/recommendations/hashtags/<channel_id>', methods=['GET'])
 def get_hashtag_recommendations(channel_id):
     """채널 기반 해시태그 추천 (Gemini AI 활용)"""
-    api_key = get_youtube_api_key()
-    
-    if not api_key:
+    if not youtube_client.has_keys():
         return jsonify({'error': 'YouTube API key not configured'}), 503
     
     # 핸들(@) 또는 채널명을 채널 ID로 변환
-    resolved_id = resolve_channel_id(channel_id, api_key)
+    resolved_id, error = resolve_channel_id(channel_id)
     if not resolved_id:
-        return jsonify({'error': 'Channel not found'}), 404
+        return jsonify({'error': 'Channel not found', 'details': error}), 404
+    
+    # 캐시 확인 (AI 생성 결과만 캐시, ?nocache=1이면 새로 생성)
+    cache_key = get_hashtags_cache_key(resolved_id)
+    cached = None if cache_bypass_requested() else cache.get(cache_key)
+    if cached:
+        return jsonify(cached)
     
     try:
-        # 채널 정보 가져오기
-        channel_url = f'https://www.googleapis.com/youtube/v3/channels'
-        channel_params = {
-            'part': 'snippet,statistics',
-            'id': resolved_id,
-            'key': api_key
-        }
-        channel_response = requests.get(channel_url, params=channel_params)
-        
-        if channel_response.status_code != 200:
-            return jsonify({'error': 'Failed to fetch channel info'}), channel_response.status_code
-        
-        channel_data = channel_response.json()
-        if not channel_data.get('items'):
+        # 채널 정보와 최근 동영상 제목(해시태그 분석용)은 채널 스냅샷에서
+        snapshot, error = get_channel_snapshot(resolved_id)
+        if error == CHANNEL_NOT_FOUND:
             return jsonify({'error': 'Channel not found'}), 404
+        if error:
+            return jsonify({'error': 'Failed to fetch channel info', 'details': error}), 500
         
-        channel_info = channel_data['items'][0]
-        channel_title = channel_info['snippet']['title']
-        channel_description = channel_info['snippet']['description']
-        
-        # 최근 동영상 제목 가져오기 (해시태그 분석용)
-        videos_url = 'https://www.googleapis.com/youtube/v3/search'
-        videos_params = {
-            'part': 'snippet',
-            'channelId': resolved_id,
-            'order': 'date',
-            'type': 'video',
-            'maxResults': 10,
-            'key': api_key
-        }
-        videos_response = requests.get(videos_url, params=videos_params)
-        
-        recent_titles = []
-        if videos_response.status_code == 200:
-            videos_data = videos_response.json()
-            recent_titles = [item['snippet']['title'] for item in videos_data.get('items', [])[:10]]
+        channel_title = snapshot['title']
+        channel_description = snapshot['description']
+        recent_titles = [video['title'] for video in snapshot['videos'][:10]]
         
         # Gemini AI로 해시태그 추천
-        gemini_api_key = os.getenv('GEMINI_API_KEY')
-        if not gemini_api_key:
+        if not gemini_client.has_keys():
             # Fallback: 기본 해시태그
             hashtags = [
                 '#YouTube', '#콘텐츠', '#크리에이터', '#영상제작',
@@ -368,15 +378,12 @@ def get_hashtag_recommendations(channel_id):
             ]
             return jsonify({'hashtags': hashtags, 'ai_generated': False})
         
-        # Gemini API 호출
-        gemini_url = f'https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={gemini_api_key}'
-        
         prompt = f"""다음 유튜브 채널을 분석하여 효과적인 해시태그 20개를 추천해주세요.
 
 채널명: {channel_title}
-채널 설명: {channel_description[:500]}
+채널 설명: {trim_field('youtube.hashtags', 'description', channel_description)}
 최근 영상 제목:
-{chr(10).join(['- ' + title for title in recent_titles[:5]])}
+{chr(10).join(['- ' + title for title in trim_field('youtube.hashtags', 'titles', recent_titles[:5])])}
 
 요구사항:
 1. 채널의 주제와 콘텐츠 스타일에 맞는 해시태그
@@ -388,32 +395,25 @@ def get_hashtag_recommendations(channel_id):
 
 출력 형식: #해시태그1 #해시태그2 #해시태그3 ..."""
         
-        gemini_payload = {
-            "contents": [{
-                "parts": [{"text": prompt}]
-            }],
-            "generationConfig": {
-                "temperature": 0.7,
-                "maxOutputTokens": 500
-            }
-        }
-        
-        gemini_response = requests.post(gemini_url, json=gemini_payload, timeout=30)
-        
-        if gemini_response.status_code == 200:
-            gemini_data = gemini_response.json()
-            if 'candidates' in gemini_data and len(gemini_data['candidates']) > 0:
-                ai_text = gemini_data['candidates'][0]['content']['parts'][0]['text']
-                
-                # 해시태그 추출
-                import re
-                hashtags = re.findall(r'#[\w가-힣]+', ai_text)
-                
-                if hashtags:
-                    return jsonify({
-                        'hashtags': hashtags[:20],  # 최대 20개
-                        'ai_generated': True
-                    })
+        # Gemini API 호출
+        ai_text, ai_error = gemini_client.generate(prompt, generation_config={
+            "temperature": 0.7
+        }, cache_ttl=86400, endpoint='youtube.hashtags')
+        if ai_error:
+            print(f"Hashtag generation failed: {ai_error}")
+        
+        if ai_text:
+            # 해시태그 추출
+            import re
+            hashtags = re.findall(r'#[\w가-힣]+', ai_text)
+            
+            if hashtags:
+                result = {
+                    'hashtags': hashtags[:20],  # 최대 20개
+                    'ai_generated': True
+                }
+                cache.set(cache_key, result, ttl=21600)  # 6시간
+                return jsonify(result)
         
         # AI 실패시 기본 해시태그
         hashtags = [
@@ -434,15 +434,13 @@ def get_hashtag_recommendations(channel_id):
 @youtube_bp.route('/recommendations/topics/<channel_id>', methods=['GET'])
 def get_topic_recommendations(channel_id):
     """채널 기반 주제 추천"""
-    api_key = get_youtube_api_key()
-    
-    if not api_key:
+    if not youtube_client.has_keys():
         return jsonify({'error': 'YouTube API key not configured'}), 503
     
     # 핸들(@) 또는 채널명을 채널 ID로 변환
-    resolved_id = resolve_channel_id(channel_id, api_key)
+    resolved_id, error = resolve_channel_id(channel_id)
     if not resolved_id:
-        return jsonify({'error': 'Channel not found'}), 404
+        return jsonify({'error': 'Channel not found', 'details': error}), 404
     
     try:
         # 임시 주제 (실제로는 AI 분석 필요)
@@ -459,28 +457,15 @@ def get_topic_recommendations(channel_id):
 @youtube_bp.route('/trends', methods=['GET'])
 def get_trends():
     """YouTube 트렌드 조회"""
-    api_key = get_youtube_api_key()
-    
-    if not api_key:
+    if not youtube_client.has_keys():
         return jsonify({'error': 'YouTube API key not configured'}), 503
     
     try:
-        # YouTube Data API v3 호출 - 인기 동영상
-        url = 'https://www.googleapis.com/youtube/v3/videos'
-        params = {
-            'part': 'snippet,statistics',
-            'chart': 'mostPopular',
-            'regionCode': 'KR',
-            'maxResults': 10,
-            'key': api_key
-        }
-        
-        response = requests.get(url, params=params)
-        
-        if response.status_code != 200:
-            return jsonify({'error': 'Failed to fetch trends'}), response.status_code
+        # 인기 동영상 (백그라운드에서 갱신되는 공유 스냅샷)
+        items, error = get_dataset('most_popular_kr')
         
-        data = response.json()
+        if error:
+            return jsonify({'error': 'Failed to fetch trends', 'details': error}), 500
         
         # 텍스트 형식 변환 함수
         def format_count(count):
@@ -491,7 +476,7 @@ def get_trends():
             return str(count)
         
         trends = []
-        for item in data.get('items', []):
+        for item in items[:10]:
             view_count = int(item['statistics'].get('viewCount', 0))
             like_count = int(item['statistics'].get('likeCount', 0))
             comment_count = int(item['statistics'].get('commentCount', 0))
@@ -522,10 +507,9 @@ def get_similar_video_recommendations(channel_id):
     """비슷한 스타일의 높은 조회수 영상 추천"""
     from src.utils.api_key_manager import get_gemini_api_key
     
-    api_key = get_youtube_api_key()
     gemini_key = get_gemini_api_key()
     
-    if not api_key:
+    if not youtube_client.has_keys():
         return jsonify({'error': 'YouTube API key not configured'}), 503
     
     if not gemini_key:
@@ -533,56 +517,38 @@ def get_similar_video_recommendations(channel_id):
     
     try:
         # 1. 채널 정보 가져오기
-        resolved_id = resolve_channel_id(channel_id, api_key)
+        resolved_id, error = resolve_channel_id(channel_id)
         if not resolved_id:
-            return jsonify({'error': 'Channel not found'}), 404
+            return jsonify({'error': 'Channel not found', 'details': error}), 404
         
         channel_id = resolved_id
         
-        # 채널 정보 조회
-        channel_url = 'https://www.googleapis.com/youtube/v3/channels'
-        channel_params = {
-            'part': 'snippet',
-            'id': channel_id,
-            'key': api_key
-        }
-        channel_response = requests.get(channel_url, params=channel_params)
-        
-        if channel_response.status_code != 200:
-            return jsonify({'error': 'Failed to fetch channel info'}), channel_response.status_code
-        
-        channel_data = channel_response.json()
-        channel_title = channel_data['items'][0]['snippet']['title']
-        channel_description = channel_data['items'][0]['snippet']['description']
-        
-        # 2. 채널의 최근 영상 가져오기 (분석용)
-        search_url = 'https://www.googleapis.com/youtube/v3/search'
-        search_params = {
-            'part': 'snippet',
-            'channelId': channel_id,
-            'order': 'date',
-            'type': 'video',
-            'maxResults': 10,
-            'key': api_key
-        }
-        search_response = requests.get(search_url, params=search_params)
+        # 채널 정보와 최근 영상(분석용)은 채널 스냅샷에서
+        snapshot, error = get_channel_snapshot(channel_id)
+        if error == CHANNEL_NOT_FOUND:
+            return jsonify({'error': 'Channel not found'}), 404
+        if error:
+            return jsonify({'error': 'Failed to fetch channel info', 'details': error}), 500
+        
+        channel_title = snapshot['title']
+        channel_description = snapshot['description']
         
-        if search_response.status_code != 200:
-            return jsonify({'error': 'Failed to fetch channel videos'}), search_response.status_code
+        # 2. 채널의 최근 영상
+        if snapshot['videos_error']:
+            return jsonify({'error': 'Failed to fetch channel videos', 'details': snapshot['videos_error']}), 500
         
-        search_data = search_response.json()
-        recent_titles = [item['snippet']['title'] for item in search_data.get('items', [])]
+        recent_titles = [video['title'] for video in snapshot['videos'][:10]]
         
         # 3. Gemini AI로 채널 스타일 분석 및 검색 키워드 생성
-        from src.routes.ai_consultant import call_gemini_api
+        from src.routes.ai_consultant import call_gemini_json, StyleAnalysis
         
         analysis_prompt = f"""
 당신은 YouTube 콘텐츠 분석 전문가입니다. 다음 채널을 분석하여 비슷한 스타일의 영상을 찾기 위한 검색 키워드 3개를 제안해주세요.
 
 채널명: {channel_title}
-채널 설명: {channel_description}
+채널 설명: {trim_field('youtube.similar_videos', 'description', channel_description)}
 최근 영상 제목:
-{chr(10).join(f"- {title}" for title in recent_titles[:5])}
+{chr(10).join(f"- {title}" for title in trim_field('youtube.similar_videos', 'titles', recent_titles[:5]))}
 
 이 채널의 주요 주제, 스타일, 타겟 시청자를 분석하고, YouTube에서 검색할 때 사용할 한국어 키워드 3개를 제안해주세요.
 키워드는 이 채널과 비슷한 스타일의 높은 조회수 영상을 찾는 데 최적화되어야 합니다.
@@ -596,87 +562,75 @@ def get_similar_video_recommendations(channel_id):
 JSON 형식으로만 응답해주세요.
 """
         
-        ai_response = call_gemini_api(analysis_prompt)
-        
-        if not ai_response:
-            return jsonify({'error': 'Failed to analyze channel style'}), 500
-        
-        # JSON 파싱
-        import json
-        import re
-        json_match = re.search(r'```json\s*(.*?)\s*```', ai_response, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1)
-        else:
-            json_str = ai_response
+        analysis, error = call_gemini_json(analysis_prompt, StyleAnalysis, endpoint='youtube.similar_videos')
+        
+        if error:
+            return jsonify({'error': 'Failed to analyze channel style', 'details': error}), 500
+        
+        keywords = analysis['keywords']
+        style_summary = analysis['style_summary']
+        
+        # 4. 각 키워드로 높은 조회수 영상 검색 (상위 2개 키워드, 키워드별로 동시에 실행)
+        def fetch_keyword_videos(keyword):
+            keyword_data, keyword_error = youtube_client.search(
+                part='snippet',
+                q=keyword,
+                type='video',
+                order='viewCount',
+                maxResults=5,
+                regionCode='KR',
+                relevanceLanguage='ko'
+            )
+            if keyword_error:
+                return []
+            
+            video_ids = [item['id']['videoId'] for item in keyword_data.get('items', [])]
+            if not video_ids:
+                return []
+            
+            # 비디오 통계 정보 가져오기 (엔티티 저장소에 없거나 오래된 영상만 조회)
+            # 일부 묶음이 실패해도 조회된 영상은 사용
+            videos, _ = entity_store.get_videos(video_ids, parts=('snippet', 'statistics'))
+            videos = videos or {}
+            return [videos[video_id] for video_id in video_ids if video_id in videos]
         
-        analysis = json.loads(json_str)
-        keywords = analysis.get('keywords', [])
-        style_summary = analysis.get('style_summary', '')
+        keyword_results = run_parallel(
+            {keyword: (lambda k=keyword: fetch_keyword_videos(k)) for keyword in keywords[:2]},
+            default=[]
+        )
         
-        # 4. 각 키워드로 높은 조회수 영상 검색
         recommendations = []
         
-        for keyword in keywords[:2]:  # 상위 2개 키워드만 사용
-            search_params = {
-                'part': 'snippet',
-                'q': keyword,
-                'type': 'video',
-                'order': 'viewCount',
-                'maxResults': 5,
-                'regionCode': 'KR',
-                'relevanceLanguage': 'ko',
-                'key': api_key
-            }
-            
-            keyword_response = requests.get(search_url, params=search_params)
-            
-            if keyword_response.status_code == 200:
-                keyword_data = keyword_response.json()
-                video_ids = [item['id']['videoId'] for item in keyword_data.get('items', [])]
+        for keyword, keyword_videos in keyword_results.items():
+            for video in keyword_videos:
+                view_count = int(video['statistics'].get('viewCount', 0))
+                like_count = int(video['statistics'].get('likeCount', 0))
+                comment_count = int(video['statistics'].get('commentCount', 0))
                 
-                # 비디오 통계 정보 가져오기
-                if video_ids:
-                    stats_url = 'https://www.googleapis.com/youtube/v3/videos'
-                    stats_params = {
-                        'part': 'snippet,statistics',
-                        'id': ','.join(video_ids),
-                        'key': api_key
-                    }
-                    stats_response = requests.get(stats_url, params=stats_params)
+                # 조회수 100만 이상만 추천
+                if view_count >= 1000000:
+                    # 텍스트 형식 변환
+                    def format_count(count):
+                        if count >= 1000000:
+                            return f"{count/1000000:.1f}M"
+                        elif count >= 1000:
+                            return f"{count/1000:.1f}K"
+                        return str(count)
                     
-                    if stats_response.status_code == 200:
-                        stats_data = stats_response.json()
-                        
-                        for video in stats_data.get('items', []):
-                            view_count = int(video['statistics'].get('viewCount', 0))
-                            like_count = int(video['statistics'].get('likeCount', 0))
-                            comment_count = int(video['statistics'].get('commentCount', 0))
-                            
-                            # 조회수 100만 이상만 추천
-                            if view_count >= 1000000:
-                                # 텍스트 형식 변환
-                                def format_count(count):
-                                    if count >= 1000000:
-                                        return f"{count/1000000:.1f}M"
-                                    elif count >= 1000:
-                                        return f"{count/1000:.1f}K"
-                                    return str(count)
-                                
-                                recommendations.append({
-                                    'id': video['id'],
-                                    'title': video['snippet']['title'],
-                                    'channelTitle': video['snippet']['channelTitle'],
-                                    'thumbnail': video['snippet']['thumbnails']['high']['url'],
-                                    'thumbnails': [{'url': video['snippet']['thumbnails']['high']['url']}],
-                                    'viewCount': view_count,
-                                    'likeCount': like_count,
-                                    'commentCount': comment_count,
-                                    'viewCountText': f"{format_count(view_count)} 조회",
-                                    'likeCountText': format_count(like_count),
-                                    'commentCountText': format_count(comment_count),
-                                    'keyword': keyword
-                                })
+                    recommendations.append({
+                        'id': video['id'],
+                        'title': video['snippet']['title'],
+                        'channelTitle': video['snippet']['channelTitle'],
+                        'thumbnail': video['snippet']['thumbnails']['high']['url'],
+                        'thumbnails': [{'url': video['snippet']['thumbnails']['high']['url']}],
+                        'viewCount': view_count,
+                        'likeCount': like_count,
+                        'commentCount': comment_count,
+                        'viewCountText': f"{format_count(view_count)} 조회",
+                        'likeCountText': format_count(like_count),
+                        'commentCountText': format_count(comment_count),
+                        'keyword': keyword
+                    })
         
         # 조회수 기준 정렬 및 중복 제거
         seen_ids = set()
@@ -698,76 +652,37 @@ JSON 형식으로만 응답해주세요.
 
 
 
-@youtube_bp.route('/insights/<channel_id>', methods=['GET'])
-def get_channel_insights(channel_id):
-    """채널 성장 인사이트 및 트렌드 키워드 제공"""
-    from src.utils.api_key_manager import get_gemini_api_key
-    from src.routes.ai_consultant import call_gemini_api
+def generate_channel_insights(snapshot):
+    """
+    채널 스냅샷으로 성장 인사이트와 트렌드 키워드 생성 (Gemini 응답은 디스크 캐시)
+    생성 결과는 채널별 캐시에도 저장하여 대시보드가 생성 없이 읽을 수 있게 함
+
+    Returns:
+        tuple: (insights, error)
+    """
+    from src.routes.ai_consultant import call_gemini_json, ChannelInsights
     
-    api_key = get_youtube_api_key()
-    gemini_key = get_gemini_api_key()
+    channel_title = snapshot['title']
+    channel_description = snapshot['description']
+    subscriber_count = snapshot['subscriber_count']
+    video_count = snapshot['video_count']
+    view_count = snapshot['view_count']
     
-    if not api_key or not gemini_key:
-        return jsonify({'error': 'API keys not configured'}), 503
+    # 2. 최근 영상 제목
+    recent_titles = [video['title'] for video in snapshot['videos'][:5]]
     
-    try:
-        # 1. 채널 정보 가져오기
-        resolved_id = resolve_channel_id(channel_id, api_key)
-        if not resolved_id:
-            return jsonify({'error': 'Channel not found'}), 404
-        
-        channel_id = resolved_id
-        
-        # 채널 정보 조회
-        channel_url = 'https://www.googleapis.com/youtube/v3/channels'
-        channel_params = {
-            'part': 'snippet,statistics',
-            'id': channel_id,
-            'key': api_key
-        }
-        channel_response = requests.get(channel_url, params=channel_params)
-        
-        if channel_response.status_code != 200:
-            return jsonify({'error': 'Failed to fetch channel info'}), channel_response.status_code
-        
-        channel_data = channel_response.json()
-        channel_item = channel_data['items'][0]
-        
-        channel_title = channel_item['snippet']['title']
-        channel_description = channel_item['snippet']['description']
-        subscriber_count = int(channel_item['statistics'].get('subscriberCount', 0))
-        video_count = int(channel_item['statistics'].get('videoCount', 0))
-        view_count = int(channel_item['statistics'].get('viewCount', 0))
-        
-        # 2. 최근 영상 제목 가져오기
-        search_url = 'https://www.googleapis.com/youtube/v3/search'
-        search_params = {
-            'part': 'snippet',
-            'channelId': channel_id,
-            'order': 'date',
-            'type': 'video',
-            'maxResults': 5,
-            'key': api_key
-        }
-        search_response = requests.get(search_url, params=search_params)
-        
-        recent_titles = []
-        if search_response.status_code == 200:
-            search_data = search_response.json()
-            recent_titles = [item['snippet']['title'] for item in search_data.get('items', [])]
-        
-        # 3. Gemini AI로 인사이트 및 트렌드 분석
-        prompt = f"""
+    # 3. Gemini AI로 인사이트 및 트렌드 분석
+    prompt = f"""
 당신은 YouTube 채널 성장 전문가이자 트렌드 분석가입니다.
 
 **채널 정보:**
 - 채널명: {channel_title}
-- 설명: {channel_description[:200]}
+- 설명: {trim_field('youtube.insights', 'description', channel_description)}
 - 구독자: {subscriber_count:,}명
 - 영상 수: {video_count}개
 - 총 조회수: {view_count:,}
 - 최근 영상 제목:
-{chr(10).join(f"  - {title}" for title in recent_titles[:3])}
+{chr(10).join(f"  - {title}" for title in trim_field('youtube.insights', 'titles', recent_titles[:3]))}
 
 **요청사항:**
 1. 채널 성장 인사이트 (간단명료하게)
@@ -798,22 +713,42 @@ def get_channel_insights(channel_id):
 
 JSON 형식으로만 응답해주세요.
 """
+    
+    insights, error = call_gemini_json(prompt, ChannelInsights, cache_ttl=INSIGHTS_CACHE_TTL, endpoint='youtube.insights')
+    if not error:
+        cache.set(get_insights_cache_key(snapshot['channel_id']), insights, ttl=INSIGHTS_CACHE_TTL)
+    return insights, error
+
+
+@youtube_bp.route('/insights/<channel_id>', methods=['GET'])
+def get_channel_insights(channel_id):
+    """채널 성장 인사이트 및 트렌드 키워드 제공"""
+    from src.utils.api_key_manager import get_gemini_api_key
+    
+    gemini_key = get_gemini_api_key()
+    
+    if not youtube_client.has_keys() or not gemini_key:
+        return jsonify({'error': 'API keys not configured'}), 503
+    
+    try:
+        # 1. 채널 정보 가져오기
+        resolved_id, error = resolve_channel_id(channel_id)
+        if not resolved_id:
+            return jsonify({'error': 'Channel not found', 'details': error}), 404
         
-        ai_response = call_gemini_api(prompt)
+        channel_id = resolved_id
         
-        if not ai_response:
-            return jsonify({'error': 'Failed to generate insights'}), 500
+        # 채널 정보와 최근 영상 제목은 채널 스냅샷에서
+        snapshot, error = get_channel_snapshot(channel_id)
+        if error == CHANNEL_NOT_FOUND:
+            return jsonify({'error': 'Channel not found'}), 404
+        if error:
+            return jsonify({'error': 'Failed to fetch channel info', 'details': error}), 500
         
-        # JSON 파싱
-        import json
-        import re
-        json_match = re.search(r'```json\s*(.*?)\s*```', ai_response, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1)
-        else:
-            json_str = ai_response
+        result, error = generate_channel_insights(snapshot)
         
-        result = json.loads(json_str)
+        if error:
+            return jsonify({'error': 'Failed to generate insights', 'details': error}), 500
         
         return jsonify(result)
     
@@ -821,3 +756,85 @@ JSON 형식으로만 응답해주세요.
         print(f"Error in get_channel_insights: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+
+@youtube_bp.route('/dashboard/<channel_id>', methods=['GET'])
+def get_channel_dashboard(channel_id):
+    """
+    채널 대시보드 - 채널 정보, 최근 영상, 성과 분석, 캐시된 AI 인사이트를 한 번에 조회
+
+    모든 섹션이 같은 채널 스냅샷(업스트림 3회 호출, 15분 캐시)에서 만들어지므로
+    채널 페이지가 기능별 엔드포인트를 여러 번 호출하는 것보다 요청과 조회가 적음.
+
+    Query:
+        include: 포함할 섹션 (쉼표 구분, 기본값 전체) - channel, videos, performance, insights
+
+    섹션별 실패는 전체 응답을 실패시키지 않고 errors에 담아 반환.
+    AI 인사이트는 이미 생성된 결과만 반환하며, 없으면 insights는 null이고
+    insights_status가 'not_cached' (생성은 /api/youtube/insights/<channel_id>에서).
+    """
+    if not youtube_client.has_keys():
+        return jsonify({'error': 'YouTube API key not configured'}), 503
+    
+    include = request.args.get('include')
+    sections = [section.strip() for section in include.split(',') if section.strip()] if include else list(DASHBOARD_SECTIONS)
+    unknown = [section for section in sections if section not in DASHBOARD_SECTIONS]
+    if unknown:
+        return jsonify({
+            'error': 'Unknown dashboard section',
+            'details': f"{', '.join(unknown)} (available: {', '.join(DASHBOARD_SECTIONS)})"
+        }), 400
+    
+    # 핸들(@) 또는 채널명을 채널 ID로 변환
+    resolved_id, error = resolve_channel_id(channel_id)
+    if not resolved_id:
+        return jsonify({'error': 'Channel not found', 'details': error}), 404
+    
+    channel_id = resolved_id
+    
+    try:
+        snapshot, error = get_channel_snapshot(channel_id)
+        if error == CHANNEL_NOT_FOUND:
+            return jsonify({'error': 'Channel not found'}), 404
+        if error:
+            return jsonify({'error': 'Failed to fetch channel data', 'details': error}), 500
+        
+        result = {'channel_id': channel_id, 'sections': sections, 'errors': {}}
+        
+        if 'channel' in sections:
+            # /channel/<id>와 같은 캐시 사용 (DB 저장도 캐시가 없을 때만)
+            cache_key = get_channel_cache_key(channel_id)
+            channel_info = cache.get(cache_key)
+            if not channel_info:
+                channel_info = build_channel_info(snapshot['channel'])
+                save_channel_info(channel_info)
+                cache.set(cache_key, channel_info, ttl=3600)
+            result['channel'] = channel_info
+        
+        if 'videos' in sections:
+            if snapshot['videos_error']:
+                result['errors']['videos'] = snapshot['videos_error']
+            result['videos'] = build_video_list(snapshot)
+        
+        if 'performance' in sections:
+            if snapshot['videos_error']:
+                result['errors']['performance'] = snapshot['videos_error']
+                result['performance'] = None
+            else:
+                result['performance'] = build_performance_report(snapshot)
+                if not result['performance']:
+                    result['errors']['performance'] = 'No videos found'
+        
+        if 'insights' in sections:
+            # 요청 경로에서 Gemini 생성을 기다리지 않도록 캐시된 결과만 사용
+            result['insights'] = cache.get(get_insights_cache_key(channel_id))
+            if result['insights'] is not None:
+                result['insights_status'] = 'cached'
+            else:
+                result['insights_status'] = 'not_cached'
+                result['insights_url'] = f'/api/youtube/insights/{channel_id}'
+        
+        return jsonify(result)
+    
+    except Exception as e:
+        print(f"Error in get_channel_dashboard: {str(e)}")
+        return jsonify({'error': str(e)}), 500
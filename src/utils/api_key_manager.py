@@ -4,8 +4,7 @@ API 키 로드 및 로테이션 관리
 """
 import os
 import json
-import requests
-from itertools import cycle
+from src.utils.youtube_quota import quota_scheduler
 
 class ApiKeyManager:
     """API 키를 관리하고 로테이션하는 싱글톤 클래스"""
@@ -23,9 +22,7 @@ class ApiKeyManager:
         self.initialized = True
         
         self.gemini_keys = []
-        self.gemini_key_iterator = None
         self.youtube_keys = []
-        self.youtube_key_iterator = None
         self._load_keys()
 
     def _load_keys(self):
@@ -94,8 +91,8 @@ class ApiKeyManager:
 
         if self.gemini_keys:
             print(f"\n✅ Gemini API: Loaded {len(self.gemini_keys)} key(s)")
-            print(f"   - Using FIRST key only (paid plan): ...{self.gemini_keys[0][-8:]}")
-            self.gemini_key_iterator = cycle(self.gemini_keys)
+            for i, key in enumerate(self.gemini_keys):
+                print(f"   [{i+1}] ...{key[-8:]}")
         else:
             print("\n⚠️ Gemini API: No keys loaded!")
 
@@ -112,33 +109,34 @@ class ApiKeyManager:
             print(f"\n✅ YouTube API: Loaded {len(self.youtube_keys)} key(s)")
             for i, key in enumerate(self.youtube_keys):
                 print(f"   [{i+1}] ...{key[-8:]}")
-            self.youtube_key_iterator = cycle(self.youtube_keys)
         else:
             print("\n⚠️ YouTube API: No keys loaded!")
         print("="*60 + "\n")
 
     def get_next_gemini_key(self):
-        """Gemini API 키 반환 (유료 플랜이므로 첫 번째 키만 사용)"""
+        """현재 사용률(RPM/TPM)이 가장 낮은 Gemini API 키 반환"""
         if not self.gemini_keys:
             return None
-        # 유료 플랜이므로 항상 첫 번째 키만 사용
-        key = self.gemini_keys[0]
-        return key
+        from src.utils.gemini_client import gemini_client
+        return gemini_client.pick_key()
 
     def get_gemini_key(self):
         """Gemini API 키 반환 (호환성을 위해 유지)"""
         return self.get_next_gemini_key()
 
-    def get_next_youtube_key(self):
-        """다음 YouTube API 키를 순환하며 반환"""
-        if not self.youtube_key_iterator:
-            return None
-        try:
-            key = next(self.youtube_key_iterator)
-            print(f"🔑 Using YouTube API key ending with: ...{key[-4:]}")
-            return key
-        except StopIteration:
+    def get_next_youtube_key(self, cost=1):
+        """
+        남은 할당량이 가장 많은 YouTube API 키를 반환
+
+        Args:
+            cost: 이번 호출의 할당량 비용 (선택된 키에서 차감)
+
+        Returns:
+            str: API 키 (모든 키의 할당량이 부족하면 None)
+        """
+        if not self.youtube_keys:
             return None
+        return quota_scheduler.acquire(self.youtube_keys, cost)
 
 # 싱글톤 인스턴스 생성
 api_key_manager = ApiKeyManager()
@@ -154,38 +152,8 @@ def get_youtube_api_key():
 def make_youtube_api_request(url, params, timeout=10):
     """
     YouTube API 요청을 보내고 할당량 초과 시 키를 자동으로 로테이션합니다.
+    (호환성을 위해 유지 - 공용 YouTube 클라이언트로 위임)
     """
-    # 시도 횟수는 보유한 키의 개수만큼으로 제한
-    max_retries = len(api_key_manager.youtube_keys)
-    if max_retries == 0:
-        return None, "No YouTube API keys are available."
-
-    for i in range(max_retries):
-        api_key = get_youtube_api_key()
-        if not api_key:
-            return None, "Failed to get a YouTube API key."
-
-        params['key'] = api_key
-        
-        try:
-            response = requests.get(url, params=params, timeout=timeout)
-            data = response.json()
-
-            # 할당량 초과 오류 감지
-            if response.status_code == 403 and 'quotaExceeded' in response.text:
-                print(f"- Quota exceeded for key ending in ...{api_key[-4:]}. Rotating... ({i + 1}/{max_retries}) ")
-                continue  # 다음 키로 재시도
-            
-            # 다른 HTTP 오류 발생 시 예외 발생
-            response.raise_for_status()
-            
-            return data, None  # 성공
-
-        except requests.exceptions.RequestException as e:
-            print(f"API request error: {e}")
-            # 네트워크 오류 시에도 키 로테이션 시도
-            continue
-            
-    # 모든 키가 할당량 초과
-    return None, "QUOTA_EXCEEDED: 모든 YouTube API 키의 할당량이 초과되었습니다. 잠시 후 다시 시도하면 다른 API 키로 접속됩니다."
-
+    from src.utils.youtube_client import youtube_client
+    resource = url.rstrip('/').rsplit('/', 1)[-1]
+    return youtube_client.request(resource, params, timeout=timeout)
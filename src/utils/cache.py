@@ -1,43 +1,141 @@
 """
 메모리 기반 캐싱 시스템
 Redis 없이 간단한 메모리 캐싱 구현
+- 메모리 상한 + LRU 축출, 항목별 TTL, 잠금 분할, 프리픽스별 통계
+- 프로세스 메모리(L1) 뒤에 워커 간 공유 SQLite 캐시(L2)
 """
 
+import os
 import time
 import hashlib
+import inspect
 import json
-from threading import Lock
+import pickle
+import functools
+from collections import defaultdict
+from threading import Lock, Thread
+
+from cachetools import TLRUCache
+
+from src.utils.shared_cache import SQLiteCache
+
+# 전체 캐시 메모리 상한 (바이트), 기본 64MB
+DEFAULT_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+# 잠금 분할(lock striping) 개수
+DEFAULT_STRIPES = 16
+# 만료 항목 백그라운드 정리 주기 (초)
+DEFAULT_EXPIRY_INTERVAL = 60
+
+
+def _key_prefix(key):
+    """캐시 키의 프리픽스 (예: 'channel:abc' → 'channel')"""
+    return key.partition(':')[0]
+
+
+def _estimate_size(data):
+    """캐시 항목의 대략적인 메모리 크기 (바이트)"""
+    try:
+        return len(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 1024
+
+
+class _CacheStripe(TLRUCache):
+    """
+    캐시 한 조각 (항목별 TTL + LRU + 크기 상한)
+
+    항목 값은 (data, expires_at, size) 튜플이며, 만료/축출을
+    프리픽스별 카운터에 기록합니다.
+    """
+
+    def __init__(self, max_bytes):
+        super().__init__(
+            maxsize=max_bytes,
+            ttu=lambda key, value, now: value[1],
+            timer=time.time,
+            getsizeof=lambda value: value[2]
+        )
+        self.lock = Lock()
+        self.metrics = defaultdict(lambda: {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0})
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for key, _ in expired:
+            self.metrics[_key_prefix(key)]['expired'] += 1
+        return expired
+
+    def popitem(self):
+        key, value = super().popitem()
+        self.metrics[_key_prefix(key)]['evictions'] += 1
+        return key, value
+
+
+class BoundedCache:
+    """
+    메모리 상한이 있는 LRU + TTL 캐시
+
+    - 전체 크기 상한을 넘으면 가장 오래 사용하지 않은 항목부터 축출
+    - 만료 항목은 백그라운드 스레드가 주기적으로 정리
+    - 키 해시로 나눈 여러 조각(stripe)에 각각 잠금을 두어 동시성 확보
+    - 프리픽스별(channel, videos, ai_analysis ...) 적중/실패/축출 통계
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, stripes=DEFAULT_STRIPES,
+                 expiry_interval=DEFAULT_EXPIRY_INTERVAL):
+        self.max_bytes = max_bytes
+        self.expiry_interval = expiry_interval
+        self._stripes = [_CacheStripe(max_bytes // stripes) for _ in range(stripes)]
+        self._reaper_pid = None
+        self._reaper_lock = Lock()
+
+    def _stripe(self, key):
+        return self._stripes[hash(key) % len(self._stripes)]
 
-class SimpleCache:
-    """간단한 메모리 캐싱 클래스"""
-    
-    def __init__(self):
-        self._cache = {}
-        self._lock = Lock()
-    
     def _generate_key(self, prefix, data):
         """캐시 키 생성"""
         if isinstance(data, dict):
-            data_str = json.dumps(data, sort_keys=True)
+            data_str = json.dumps(data, sort_keys=True, default=str)
         else:
             data_str = str(data)
-        
-        hash_obj = hashlib.md5(data_str.encode())
+            # 짧은 문자열(채널 ID 등)은 해시 없이 그대로 사용
+            if len(data_str) <= 64 and ':' not in data_str:
+                return f"{prefix}:{data_str}"
+
+        hash_obj = hashlib.blake2b(data_str.encode(), digest_size=16)
         return f"{prefix}:{hash_obj.hexdigest()}"
-    
+
+    def _ensure_reaper(self):
+        """만료 항목 정리 스레드 시작 (fork된 워커마다 한 번)"""
+        pid = os.getpid()
+        if self._reaper_pid == pid:
+            return
+        with self._reaper_lock:
+            if self._reaper_pid == pid:
+                return
+            self._reaper_pid = pid
+
+            def run():
+                while True:
+                    time.sleep(self.expiry_interval)
+                    try:
+                        self.cleanup_expired()
+                    except Exception as e:
+                        print(f"Cache cleanup failed: {e}")
+
+            Thread(target=run, daemon=True).start()
+
     def get(self, key):
         """캐시에서 데이터 가져오기"""
-        with self._lock:
-            if key in self._cache:
-                item = self._cache[key]
-                # 만료 시간 확인
-                if item['expires_at'] > time.time():
-                    return item['data']
-                else:
-                    # 만료된 항목 삭제
-                    del self._cache[key]
-            return None
-    
+        stripe = self._stripe(key)
+        with stripe.lock:
+            item = stripe.get(key)
+            metrics = stripe.metrics[_key_prefix(key)]
+            if item is None:
+                metrics['misses'] += 1
+                return None
+            metrics['hits'] += 1
+            return item[0]
+
     def set(self, key, data, ttl=86400):
         """
         캐시에 데이터 저장
@@ -47,52 +145,174 @@ class SimpleCache:
             data: 저장할 데이터
             ttl: 유효 시간 (초), 기본 24시간
         """
-        with self._lock:
-            self._cache[key] = {
-                'data': data,
-                'expires_at': time.time() + ttl
-            }
-    
+        self._ensure_reaper()
+        size = _estimate_size(data) + len(key)
+        stripe = self._stripe(key)
+        with stripe.lock:
+            # 조각 하나보다 큰 항목은 캐시하지 않음
+            if size > stripe.maxsize:
+                stripe.pop(key, None)
+                return
+            stripe[key] = (data, time.time() + ttl, size)
+
     def delete(self, key):
         """캐시에서 데이터 삭제"""
-        with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-    
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.pop(key, None)
+
     def clear(self):
         """모든 캐시 삭제"""
-        with self._lock:
-            self._cache.clear()
-    
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.clear()
+
     def cleanup_expired(self):
         """만료된 캐시 항목 정리"""
-        with self._lock:
-            current_time = time.time()
-            expired_keys = [
-                key for key, item in self._cache.items()
-                if item['expires_at'] <= current_time
-            ]
-            for key in expired_keys:
-                del self._cache[key]
-            return len(expired_keys)
-    
+        removed = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                removed += len(stripe.expire())
+        return removed
+
     def get_stats(self):
         """캐시 통계 반환"""
+        total = 0
+        size_bytes = 0
+        prefixes = defaultdict(lambda: {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0})
+        for stripe in self._stripes:
+            with stripe.lock:
+                total += len(stripe)
+                size_bytes += stripe.currsize
+                for prefix, counters in stripe.metrics.items():
+                    for name, value in counters.items():
+                        prefixes[prefix][name] += value
+
+        for counters in prefixes.values():
+            lookups = counters['hits'] + counters['misses']
+            counters['hit_rate'] = round(counters['hits'] / lookups, 3) if lookups else None
+
+        return {
+            'total': total,
+            'size_bytes': size_bytes,
+            'max_bytes': self.max_bytes,
+            'prefixes': dict(prefixes)
+        }
+
+class TieredCache:
+    """
+    L1(프로세스 메모리) + L2(워커 간 공유) 2단계 캐시
+
+    L1에 없으면 L2를 확인하고, L2 적중 시 남은 TTL만큼 L1에 다시 채웁니다.
+    다른 워커가 저장한 항목도 L2를 통해 적중합니다.
+    """
+
+    def __init__(self, l1, l2):
+        self.l1 = l1
+        self.l2 = l2
+        self._lock = Lock()
+        self._l2_metrics = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+    def _generate_key(self, prefix, data):
+        return self.l1._generate_key(prefix, data)
+
+    def _record_l2(self, key, hit):
         with self._lock:
-            total = len(self._cache)
-            current_time = time.time()
-            expired = sum(
-                1 for item in self._cache.values()
-                if item['expires_at'] <= current_time
-            )
-            return {
-                'total': total,
-                'active': total - expired,
-                'expired': expired
-            }
+            self._l2_metrics[_key_prefix(key)]['hits' if hit else 'misses'] += 1
+
+    def get(self, key):
+        """캐시에서 데이터 가져오기 (L1 → L2)"""
+        data = self.l1.get(key)
+        if data is not None:
+            return data
+
+        try:
+            entry = self.l2.get_entry(key)
+        except Exception as e:
+            print(f"L2 cache read failed: {e}")
+            return None
+
+        self._record_l2(key, entry is not None)
+        if entry is None:
+            return None
+
+        data, expires_at = entry
+        remaining = expires_at - time.time()
+        if remaining > 0:
+            self.l1.set(key, data, ttl=remaining)
+        return data
+
+    def get_many(self, keys):
+        """
+        여러 키를 한 번에 조회 (L1에 없는 키만 L2에서 한 번의 쿼리로)
+
+        Returns:
+            dict: {key: data} - 없는 키는 제외
+        """
+        found = {}
+        missing = []
+        for key in keys:
+            data = self.l1.get(key)
+            if data is not None:
+                found[key] = data
+            else:
+                missing.append(key)
+        if not missing:
+            return found
+
+        try:
+            entries = self.l2.get_entries(missing)
+        except Exception as e:
+            print(f"L2 cache read failed: {e}")
+            return found
+
+        now = time.time()
+        for key in missing:
+            self._record_l2(key, key in entries)
+            if key not in entries:
+                continue
+            data, expires_at = entries[key]
+            if expires_at - now > 0:
+                self.l1.set(key, data, ttl=expires_at - now)
+            found[key] = data
+        return found
+
+    def set(self, key, data, ttl=86400):
+        """캐시에 데이터 저장 (L1과 L2 모두)"""
+        self.l1.set(key, data, ttl=ttl)
+        try:
+            self.l2.set(key, data, ttl=ttl)
+        except Exception as e:
+            print(f"L2 cache write failed: {e}")
+
+    def delete(self, key):
+        """캐시에서 데이터 삭제"""
+        self.l1.delete(key)
+        try:
+            self.l2.delete(key)
+        except Exception as e:
+            print(f"L2 cache delete failed: {e}")
+
+    def clear(self):
+        """모든 캐시 삭제"""
+        self.l1.clear()
+        self.l2.clear()
+
+    def cleanup_expired(self):
+        """만료된 캐시 항목 정리"""
+        return self.l1.cleanup_expired() + self.l2.trim()
+
+    def get_stats(self):
+        """캐시 통계 반환 (L1 통계 + L2 통계)"""
+        stats = self.l1.get_stats()
+        l2_stats = self.l2.get_stats()
+        with self._lock:
+            l2_stats['prefixes'] = {prefix: dict(counters) for prefix, counters in self._l2_metrics.items()}
+        stats['l2'] = l2_stats
+        return stats
 
 # 전역 캐시 인스턴스
-cache = SimpleCache()
+cache = TieredCache(BoundedCache(), SQLiteCache())
 
 # 캐시 키 프리픽스
 CACHE_PREFIX_CHANNEL = 'channel'
@@ -101,6 +321,7 @@ CACHE_PREFIX_AI_ANALYSIS = 'ai_analysis'
 CACHE_PREFIX_CONTENT_IDEAS = 'content_ideas'
 CACHE_PREFIX_HASHTAGS = 'hashtags'
 CACHE_PREFIX_TOPICS = 'topics'
+CACHE_PREFIX_INSIGHTS = 'insights'
 
 def get_channel_cache_key(channel_id):
     """채널 정보 캐시 키 생성"""
@@ -126,3 +347,137 @@ def get_topics_cache_key(channel_id):
     """주제 추천 캐시 키 생성"""
     return cache._generate_key(CACHE_PREFIX_TOPICS, channel_id)
 
+def get_insights_cache_key(channel_id):
+    """채널 인사이트 캐시 키 생성"""
+    return cache._generate_key(CACHE_PREFIX_INSIGHTS, channel_id)
+
+
+# ============================================================
+# 부정 캐시 (없는 채널, 이메일 없음, 빈 검색 결과)
+# ============================================================
+
+# 부정 캐시 유효 시간 (초) - 오타/삭제된 채널 재시도가 업스트림을 다시 호출하지 않도록 짧게 보관
+NEGATIVE_CACHE_TTL = int(os.getenv('NEGATIVE_CACHE_TTL', '600'))
+
+def get_negative_cache_key(kind, value):
+    """부정 캐시 키 생성 (프리픽스 negative_<kind>, 캐시 통계에 종류별로 집계)"""
+    return cache._generate_key(f'negative_{kind}', value)
+
+def get_negative(kind, value):
+    """
+    최근 '없음'으로 확인된 값인지 확인 (워커 간 공유)
+
+    Args:
+        kind: 부정 캐시 종류 ('channel_input', 'channels', 'email' 등)
+        value: 조회 값
+
+    Returns:
+        str: 저장된 사유 또는 None (부정 캐시 없음)
+    """
+    entry = cache.get(get_negative_cache_key(kind, value))
+    return entry['reason'] if entry else None
+
+def get_negatives(kind, values):
+    """
+    여러 값의 부정 캐시를 한 번에 확인 (L2는 한 번의 쿼리)
+
+    Returns:
+        set: 최근 '없음'으로 확인된 값
+    """
+    keys = {get_negative_cache_key(kind, value): value for value in values}
+    if not keys:
+        return set()
+    return {keys[key] for key in cache.get_many(keys)}
+
+def set_negative(kind, value, reason, ttl=NEGATIVE_CACHE_TTL):
+    """'없음' 결과를 짧은 TTL로 저장 (업스트림 오류는 저장하지 않음)"""
+    cache.set(get_negative_cache_key(kind, value), {'reason': reason}, ttl=ttl)
+
+
+
+# ============================================================
+# 읽기 관통(read-through) 캐시 데코레이터
+# ============================================================
+
+# 일부만 조회된 결과(partial)를 보관하는 시간 (초) - 유예 기간 없이 만료 후 다시 조회
+PARTIAL_RESULT_TTL = 60
+
+# 백그라운드 갱신 중인 캐시 키 (키당 하나의 갱신만 실행)
+_refreshing_keys = set()
+_refreshing_lock = Lock()
+
+
+def _store_entry(key, data, ttl, stale_ttl):
+    """신선 기간(ttl)과 유예 기간(stale_ttl)을 함께 저장"""
+    cache.set(key, {
+        'data': data,
+        'fresh_until': time.time() + ttl
+    }, ttl=ttl + stale_ttl)
+
+
+def _refresh_in_background(key, loader, ttl, stale_ttl, partial=None):
+    """만료된 항목을 백그라운드에서 한 번만 다시 채움 (일부만 조회된 결과로는 기존 항목을 덮지 않음)"""
+    with _refreshing_lock:
+        if key in _refreshing_keys:
+            return
+        _refreshing_keys.add(key)
+
+    def run():
+        try:
+            data, error = loader()
+            if error is None and not (partial and partial(data)):
+                _store_entry(key, data, ttl, stale_ttl)
+        except Exception as e:
+            print(f"Background cache refresh failed ({key}): {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing_keys.discard(key)
+
+    Thread(target=run, daemon=True).start()
+
+
+def read_through(prefix, ttl, stale_ttl=0, partial=None):
+    """
+    (data, error)를 반환하는 업스트림 조회 함수용 읽기 관통 캐시 데코레이터
+
+    - 신선한 항목은 업스트림 호출 없이 반환
+    - 만료되었지만 유예 기간(stale_ttl) 안의 항목은 즉시 반환하고 백그라운드에서 갱신
+      (stale-while-revalidate)
+    - 오류 응답은 캐시하지 않음
+    - 일부만 조회된 응답(partial(data)가 True)은 PARTIAL_RESULT_TTL 동안만 캐시
+
+    Args:
+        prefix: 캐시 키 프리픽스
+        ttl: 신선 기간 (초) 또는 호출 kwargs를 받아 초를 반환하는 함수
+        stale_ttl: 만료 후에도 반환할 수 있는 유예 기간 (초)
+        partial: 응답 데이터를 받아 일부 조회 실패 여부를 반환하는 함수
+    """
+    def decorator(func):
+        # 메서드이면 self는 캐시 키에서 제외
+        params = list(inspect.signature(func).parameters)
+        skip_self = bool(params) and params[0] == 'self'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key_args = args[1:] if skip_self else args
+            key = cache._generate_key(prefix, {'args': list(key_args), 'kwargs': kwargs})
+            entry_ttl = ttl(kwargs) if callable(ttl) else ttl
+
+            entry = cache.get(key)
+            if entry is not None:
+                if entry['fresh_until'] <= time.time():
+                    _refresh_in_background(
+                        key, lambda: func(*args, **kwargs), entry_ttl, stale_ttl, partial
+                    )
+                return entry['data'], None
+
+            data, error = func(*args, **kwargs)
+            if error is None:
+                if partial and partial(data):
+                    _store_entry(key, data, PARTIAL_RESULT_TTL, 0)
+                else:
+                    _store_entry(key, data, entry_ttl, stale_ttl)
+            return data, error
+
+        return wrapper
+    return decorator
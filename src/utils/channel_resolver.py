@@ -0,0 +1,150 @@
+"""
+채널 입력값(ID, @핸들, URL, 채널명)을 채널 ID로 변환하는 공용 리졸버
+- @핸들(또는 /@ URL)은 channels.list?forHandle= (1 단위)로 조회 - @ 없는 입력은 핸들로 추측하지 않음
+- search.list (100 단위)는 자유 텍스트 채널명에만 사용
+- 핸들 → 채널 ID 매핑은 채널 데이터베이스에 영구 저장하고, 앞단에 메모리 LRU 캐시 사용
+- 없는 핸들/사용자명과 빈 검색 결과는 부정 캐시(워커 간 공유)에 짧게 기록하여 오타 재시도 시 업스트림을 호출하지 않음
+"""
+
+import re
+from threading import Lock
+from urllib.parse import unquote
+
+from cachetools import LRUCache
+
+from src.models.channel_database import channel_db
+from src.utils.cache import get_negative, set_negative
+from src.utils.youtube_client import youtube_client
+
+CHANNEL_ID_PATTERN = re.compile(r'^UC[\w-]{22}$')
+
+# 메모리 LRU 캐시 (입력 종류, 정규화된 값) → 채널 ID
+_resolved_cache = LRUCache(maxsize=4096)
+_cache_lock = Lock()
+
+
+def normalize_handle(handle):
+    """핸들 정규화 (@ 제거, URL 디코딩, 소문자)"""
+    return unquote(handle).strip().lstrip('@').lower()
+
+
+def parse_channel_input(channel_input):
+    """
+    채널 입력값 분류
+
+    Returns:
+        tuple: (종류, 값) - 종류는 'id', 'handle', 'username', 'query' 중 하나
+    """
+    value = channel_input.strip()
+
+    # URL 형식
+    if 'youtube.com' in value or 'youtu.be' in value:
+        id_match = re.search(r'/channel/([^/?#]+)', value)
+        if id_match:
+            return 'id', id_match.group(1)
+        handle_match = re.search(r'/@([^/?#]+)', value)
+        if handle_match:
+            return 'handle', normalize_handle(handle_match.group(1))
+        user_match = re.search(r'/user/([^/?#]+)', value)
+        if user_match:
+            return 'username', unquote(user_match.group(1))
+        custom_match = re.search(r'/c/([^/?#]+)', value)
+        if custom_match:
+            return 'query', unquote(custom_match.group(1))
+
+    # 채널 ID (UC로 시작하는 24자리)
+    if CHANNEL_ID_PATTERN.match(value):
+        return 'id', value
+
+    if value.startswith('@'):
+        return 'handle', normalize_handle(value)
+
+    return 'query', value
+
+
+def _lookup_handle(handle):
+    """forHandle 조회 (1 단위)"""
+    if get_negative('handle', handle):
+        return None, None
+    data, error = youtube_client.channels(part='id', forHandle=handle)
+    if error:
+        return None, error
+    if data and data.get('items'):
+        return data['items'][0]['id'], None
+    set_negative('handle', handle, 'not_found')
+    return None, None
+
+
+def _lookup_username(username):
+    """forUsername 조회 (1 단위)"""
+    if get_negative('username', username.lower()):
+        return None, None
+    data, error = youtube_client.channels(part='id', forUsername=username)
+    if error:
+        return None, error
+    if data and data.get('items'):
+        return data['items'][0]['id'], None
+    set_negative('username', username.lower(), 'not_found')
+    return None, None
+
+
+def _search_channel(query):
+    """채널명 검색 (100 단위)"""
+    if get_negative('search', query.lower()):
+        return None, None
+    data, error = youtube_client.search(part='snippet', q=query, type='channel', maxResults=1)
+    if error:
+        return None, error
+    if data and data.get('items'):
+        return data['items'][0]['snippet']['channelId'], None
+    set_negative('search', query.lower(), 'empty_results')
+    return None, None
+
+
+def resolve_channel_id(channel_input):
+    """
+    핸들(@), URL 또는 채널명을 채널 ID로 변환
+
+    Args:
+        channel_input: 채널 ID, @핸들, 채널 URL 또는 채널명
+
+    Returns:
+        tuple: (channel_id, error)
+    """
+    if not channel_input or not channel_input.strip():
+        return None, "Channel input is empty."
+
+    kind, value = parse_channel_input(channel_input)
+    if kind == 'id':
+        return value, None
+
+    cache_key = (kind, value.lower())
+    with _cache_lock:
+        cached = _resolved_cache.get(cache_key)
+    if cached:
+        return cached, None
+
+    channel_id = None
+    error = None
+
+    if kind == 'handle':
+        # 영구 저장된 매핑 확인
+        channel_id = channel_db.get_channel_id_by_handle(value)
+        if not channel_id:
+            channel_id, error = _lookup_handle(value)
+            if channel_id:
+                channel_db.save_handle(value, channel_id)
+    elif kind == 'username':
+        channel_id, error = _lookup_username(value)
+    else:
+        # 자유 텍스트는 핸들로 추측하지 않고 검색 (같은 이름의 다른 채널 핸들과 섞이지 않도록)
+        channel_id, error = _search_channel(value)
+
+    if error:
+        return None, error
+    if not channel_id:
+        return None, "Channel not found."
+
+    with _cache_lock:
+        _resolved_cache[cache_key] = channel_id
+    return channel_id, None
@@ -0,0 +1,149 @@
+"""
+채널 스냅샷
+- 채널 정보, 업로드 재생목록, 최근 영상 통계를 한 번에 조회하여 하나의 dict로 캐시
+- 채널 관련 엔드포인트(채널/영상 목록/인사이트/해시태그/성과 분석/AI 분석/기획안)가
+  각자 채널·업로드 목록을 다시 조회하지 않고 같은 스냅샷을 사용
+- 업스트림 호출: channels.list 1회 + 업로드 50개당 playlistItems.list 1회 + videos.list 1회
+  (기본 깊이 50개 기준 총 3회, search.list 대비 할당량 약 1% 수준)
+- 채널/영상 레코드는 엔티티 저장소를 거치므로 저장소에 신선한 part가 있으면 조회 생략
+"""
+
+import os
+import re
+
+from src.utils.cache import read_through
+from src.utils.concurrency import run_parallel
+from src.utils.entity_store import entity_store
+from src.utils.single_flight import coalesce
+from src.utils.youtube_client import youtube_client, CACHE_STALE_TTL
+
+# 스냅샷 신선 기간 (초) - 만료 후에는 기존 값을 반환하면서 백그라운드 갱신
+CHANNEL_SNAPSHOT_TTL = 900
+# 스냅샷에 포함하는 최근 업로드 수 (50개를 넘으면 업로드 재생목록을 여러 페이지 조회)
+SNAPSHOT_VIDEO_COUNT = int(os.getenv('CHANNEL_UPLOADS_DEPTH', '50'))
+
+CHANNEL_NOT_FOUND = 'Channel not found.'
+
+
+def _is_not_found(error):
+    """업스트림 404 (업로드가 없는 채널은 업로드 재생목록 자체가 없음)"""
+    return bool(error) and error.startswith('YouTube API error 404')
+
+
+def _has_videos_error(snapshot):
+    """업로드 목록 조회가 일시적으로 실패한 스냅샷 (짧게만 캐시)"""
+    return bool(snapshot.get('videos_error'))
+
+
+def parse_duration(duration):
+    """ISO 8601 재생 시간(PT1H2M3S)을 초로 변환"""
+    match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', duration or '')
+    if not match:
+        return 0
+    hours, minutes, seconds = (int(value or 0) for value in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def _video_entry(item):
+    """videos.list 항목을 스냅샷 영상 형식으로 변환"""
+    snippet = item.get('snippet', {})
+    statistics = item.get('statistics', {})
+    thumbnails = snippet.get('thumbnails', {})
+    thumbnail = (thumbnails.get('high') or thumbnails.get('medium') or thumbnails.get('default') or {}).get('url', '')
+    return {
+        'id': item['id'],
+        'title': snippet.get('title', ''),
+        'description': snippet.get('description', ''),
+        'publishedAt': snippet.get('publishedAt', ''),
+        'channelTitle': snippet.get('channelTitle', ''),
+        'thumbnail': thumbnail,
+        'duration': parse_duration(item.get('contentDetails', {}).get('duration')),
+        'views': int(statistics.get('viewCount', 0)),
+        'likes': int(statistics.get('likeCount', 0)),
+        'comments': int(statistics.get('commentCount', 0))
+    }
+
+
+@read_through('channel_snapshot', ttl=CHANNEL_SNAPSHOT_TTL, stale_ttl=CACHE_STALE_TTL, partial=_has_videos_error)
+@coalesce('channel_snapshot')
+def get_channel_snapshot(channel_id):
+    """
+    채널 스냅샷 조회 (채널 ID는 resolve_channel_id로 변환된 값)
+
+    Returns:
+        tuple: (snapshot, error) - 채널이 없으면 (None, CHANNEL_NOT_FOUND)
+
+        snapshot = {
+            'channel_id', 'title', 'description', 'custom_url', 'published_at',
+            'thumbnail', 'country', 'subscriber_count', 'video_count', 'view_count',
+            'uploads_playlist_id',
+            'channel': channels.list 원본 항목 (snippet, statistics, contentDetails, brandingSettings),
+            'videos': 최근 업로드 목록 (최신순) [{id, title, description, publishedAt, channelTitle,
+                      thumbnail, duration(초), views, likes, comments}],
+            'videos_error': 업로드 목록 조회 실패 시 오류 메시지 (채널 정보는 유효, 일부 영상만 조회됐을 수 있음, 이 경우 짧게만 캐시)
+        }
+    """
+    # 업로드 재생목록 ID는 채널 ID의 'UC'를 'UU'로 바꾼 값이므로 채널 조회와 동시에 실행
+    uploads_playlist_id = 'UU' + channel_id[2:]
+    results = run_parallel({
+        'channel': lambda: entity_store.get_channels(
+            [channel_id],
+            parts=('snippet', 'statistics', 'contentDetails', 'brandingSettings')
+        ),
+        'uploads': lambda: youtube_client.list_playlist_video_ids(
+            uploads_playlist_id,
+            max_items=SNAPSHOT_VIDEO_COUNT
+        )
+    }, default=(None, 'Upstream request timed out.'))
+
+    channels, error = results['channel']
+    if error:
+        return None, error
+    if not channels or channel_id not in channels:
+        return None, CHANNEL_NOT_FOUND
+
+    channel = channels[channel_id]
+    snippet = channel['snippet']
+    statistics = channel.get('statistics', {})
+    related = channel.get('contentDetails', {}).get('relatedPlaylists', {})
+
+    videos = []
+    video_ids, videos_error = results['uploads']
+    if related.get('uploads') and related['uploads'] != uploads_playlist_id:
+        # 규칙과 다른 재생목록 ID인 경우 실제 ID로 다시 조회
+        video_ids, videos_error = youtube_client.list_playlist_video_ids(
+            related['uploads'],
+            max_items=SNAPSHOT_VIDEO_COUNT
+        )
+
+    if _is_not_found(videos_error):
+        # 업로드가 없는 채널
+        video_ids, videos_error = [], None
+
+    if not videos_error and video_ids:
+        by_id, videos_error = entity_store.get_videos(video_ids, parts=('snippet', 'statistics', 'contentDetails'))
+        # 업로드 순서(최신순) 유지, 비공개/삭제된 영상과 조회에 실패한 묶음의 영상은 제외
+        by_id = by_id or {}
+        videos = [_video_entry(by_id[video_id]) for video_id in video_ids if video_id in by_id]
+
+    if videos_error:
+        print(f"Channel snapshot uploads error for {channel_id}: {videos_error}")
+
+    thumbnails = snippet.get('thumbnails', {})
+    snapshot = {
+        'channel_id': channel['id'],
+        'title': snippet.get('title', ''),
+        'description': snippet.get('description', ''),
+        'custom_url': snippet.get('customUrl', ''),
+        'published_at': snippet.get('publishedAt', ''),
+        'thumbnail': (thumbnails.get('high') or thumbnails.get('default') or {}).get('url', ''),
+        'country': snippet.get('country', ''),
+        'subscriber_count': int(statistics.get('subscriberCount', 0)),
+        'video_count': int(statistics.get('videoCount', 0)),
+        'view_count': int(statistics.get('viewCount', 0)),
+        'uploads_playlist_id': related.get('uploads', uploads_playlist_id),
+        'channel': channel,
+        'videos': videos,
+        'videos_error': videos_error
+    }
+    return snapshot, None
@@ -0,0 +1,93 @@
+"""
+업스트림 병렬 호출 유틸리티
+- 프로세스별로 크기가 제한된 스레드 풀 하나를 공유
+- 서로 독립적인 조회를 동시에 실행하고, 마감 시간을 넘긴 작업은 기본값으로 대체
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from threading import Lock
+
+# 프로세스당 최대 동시 업스트림 작업 수
+MAX_WORKERS = int(os.getenv('UPSTREAM_MAX_WORKERS', '16'))
+# 작업별 기본 마감 시간 (초)
+DEFAULT_TASK_TIMEOUT = 20
+
+_executor = None
+_executor_pid = None
+_executor_lock = Lock()
+
+
+def get_executor():
+    """현재 프로세스의 스레드 풀 (fork된 워커마다 새로 생성)"""
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='upstream')
+                _executor_pid = pid
+    return _executor
+
+
+def run_parallel(tasks, timeout=DEFAULT_TASK_TIMEOUT, default=None):
+    """
+    독립적인 작업들을 병렬로 실행
+
+    Args:
+        tasks: {이름: 인자 없는 함수}
+        timeout: 작업별 마감 시간 (초), 모든 작업이 같은 시점에 시작하므로 공통 마감 시각 기준
+        default: 마감 시간을 넘기거나 예외가 발생한 작업의 결과 값
+
+    Returns:
+        dict: {이름: 결과}
+    """
+    executor = get_executor()
+    deadline = time.monotonic() + timeout
+    futures = {name: executor.submit(func) for name, func in tasks.items()}
+
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError:
+            print(f"Parallel task '{name}' exceeded {timeout}s deadline")
+            future.cancel()
+            results[name] = default
+        except Exception as e:
+            print(f"Parallel task '{name}' failed: {e}")
+            results[name] = default
+    return results
+
+
+def iter_parallel(tasks, timeout=DEFAULT_TASK_TIMEOUT, default=None):
+    """
+    독립적인 작업들을 병렬로 실행하고 끝나는 순서대로 결과 반환 (스트리밍 응답용)
+
+    Args:
+        tasks: {이름: 인자 없는 함수}
+        timeout: 전체 작업의 공통 마감 시간 (초)
+        default: 마감 시간을 넘기거나 예외가 발생한 작업의 결과 값
+
+    Yields:
+        tuple: (이름, 결과)
+    """
+    executor = get_executor()
+    futures = {executor.submit(func): name for name, func in tasks.items()}
+
+    pending = set(futures)
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            pending.discard(future)
+            name = futures[future]
+            try:
+                yield name, future.result()
+            except Exception as e:
+                print(f"Parallel task '{name}' failed: {e}")
+                yield name, default
+    except FutureTimeoutError:
+        for future in pending:
+            print(f"Parallel task '{futures[future]}' exceeded {timeout}s deadline")
+            future.cancel()
+            yield futures[future], default
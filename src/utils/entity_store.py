@@ -0,0 +1,272 @@
+"""
+정규화된 YouTube 엔티티 저장소
+- 채널/영상 레코드를 ID별로 저장하고, part(snippet, statistics ...)마다 갱신 시각을 따로 기록
+- 조회 시 필요한 ID와 part를 지정하면 저장소에 없거나 오래된 것만 업스트림에서 가져옴
+- 업스트림 조회는 50개 ID 단위로 묶고, 빠진 part만 요청
+- 워커 간 공유를 위해 SQLite(WAL)에 저장
+- 업스트림 응답에 없던 ID(삭제/비공개)는 부정 캐시에 짧게 기록하여 재시도 시 다시 조회하지 않음
+"""
+
+import os
+import json
+import sqlite3
+import time
+from threading import Lock
+
+from src.utils.cache import get_negatives, set_negative
+from src.utils.youtube_client import youtube_client, MAX_PAGE_SIZE
+
+# part별 신선 기간 (초) - 통계는 자주 바뀌고, 제목/설명/재생 시간은 거의 바뀌지 않음
+PART_TTLS = {
+    'channels': {
+        'snippet': 86400,
+        'statistics': 3600,
+        'contentDetails': 86400,
+        'brandingSettings': 86400,
+    },
+    'videos': {
+        'snippet': 86400,
+        'statistics': 900,
+        'contentDetails': 7 * 86400,
+    },
+}
+# 정의되지 않은 part의 신선 기간 (초)
+DEFAULT_PART_TTL = 3600
+# 업스트림 실패 시 대신 반환할 수 있는 오래된 part의 보관 기간 (초)
+ENTITY_RETENTION = 7 * 86400
+# 이 횟수만큼 저장할 때마다 보관 기간이 지난 레코드 정리
+PURGE_EVERY_WRITES = 500
+
+
+class EntityStore:
+    """채널/영상 레코드를 part 단위로 저장하는 공유 저장소"""
+
+    def __init__(self, db_path='data/entities.db'):
+        self.db_path = db_path
+        self._lock = Lock()
+        self._writes_since_purge = 0
+        self._metrics = {
+            'hits': 0, 'misses': 0, 'stale': 0, 'negative_hits': 0,
+            'upstream_calls': 0, 'upstream_errors': 0
+        }
+        self._init_database()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _init_database(self):
+        """데이터베이스 초기화"""
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS entity_parts (
+                    kind TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    part TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (kind, id, part)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_entity_fetched ON entity_parts(fetched_at)')
+        finally:
+            conn.close()
+
+    def _load(self, kind, ids, parts):
+        """저장된 part 조회 → {id: {part: (data, fetched_at)}}"""
+        stored = {}
+        conn = self._connect()
+        try:
+            # SQLite 바인딩 변수 개수 제한을 넘지 않도록 나누어 조회
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = conn.execute(
+                    f'''SELECT id, part, data, fetched_at FROM entity_parts
+                        WHERE kind = ? AND id IN ({','.join('?' * len(chunk))})
+                          AND part IN ({','.join('?' * len(parts))})''',
+                    (kind, *chunk, *parts)
+                ).fetchall()
+                for entity_id, part, data, fetched_at in rows:
+                    stored.setdefault(entity_id, {})[part] = (json.loads(data), fetched_at)
+        finally:
+            conn.close()
+        return stored
+
+    def _save(self, kind, items, parts):
+        """업스트림 응답 항목의 part들을 저장"""
+        now = time.time()
+        rows = [
+            (kind, item['id'], part, json.dumps(item[part], ensure_ascii=False), now)
+            for item in items
+            for part in parts
+            if part in item
+        ]
+        if not rows:
+            return
+
+        conn = self._connect()
+        try:
+            conn.executemany(
+                'INSERT OR REPLACE INTO entity_parts (kind, id, part, data, fetched_at) VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+        finally:
+            conn.close()
+        self._maybe_purge()
+
+    def get(self, kind, ids, parts):
+        """
+        레코드 조회 (없거나 오래된 part만 업스트림에서 50개씩 묶어 조회)
+
+        Args:
+            kind: 'channels' 또는 'videos'
+            ids: 엔티티 ID 목록
+            parts: 필요한 part 목록 (예: ['snippet', 'statistics'])
+
+        Returns:
+            tuple: (items, error) - items는 {id: API 응답 형식 항목}, 존재하지 않는 ID는 제외.
+                   업스트림이 실패해도 오래된 part가 모두 남아 있으면 그 값을 반환.
+                   일부 묶음만 실패하면 나머지 묶음의 항목과 함께 마지막 오류를 반환
+                   (실패한 묶음의 ID는 items에서 빠지고 부정 캐시에도 기록되지 않음)
+        """
+        ids = list(dict.fromkeys(entity_id for entity_id in ids if entity_id))
+        parts = list(dict.fromkeys(parts))
+        if not ids:
+            return {}, None
+
+        ttls = PART_TTLS.get(kind, {})
+        now = time.time()
+        stored = self._load(kind, ids, parts)
+
+        # ID별로 빠졌거나 오래된 part 확인
+        needed = {}
+        for entity_id in ids:
+            entity_parts = stored.get(entity_id, {})
+            missing = [
+                part for part in parts
+                if part not in entity_parts
+                or now - entity_parts[part][1] > ttls.get(part, DEFAULT_PART_TTL)
+            ]
+            if missing:
+                needed[entity_id] = missing
+
+        # 저장소에 없는 ID 중 최근 존재하지 않는 것으로 확인된 ID는 업스트림을 다시 호출하지 않음
+        absent = get_negatives(kind, [entity_id for entity_id in needed if entity_id not in stored])
+        for entity_id in absent:
+            del needed[entity_id]
+
+        with self._lock:
+            self._metrics['negative_hits'] += len(absent)
+            self._metrics['hits'] += len(ids) - len(needed) - len(absent)
+            self._metrics['misses'] += sum(1 for entity_id in needed if entity_id not in stored)
+            self._metrics['stale'] += sum(1 for entity_id in needed if entity_id in stored)
+
+        # 같은 part 조합이 필요한 ID끼리 50개씩 묶어 조회
+        groups = {}
+        for entity_id, missing in needed.items():
+            groups.setdefault(tuple(missing), []).append(entity_id)
+
+        fetched = {}
+        served_stale = set()
+        batch_error = None
+        for missing_parts, group_ids in groups.items():
+            for start in range(0, len(group_ids), MAX_PAGE_SIZE):
+                batch = group_ids[start:start + MAX_PAGE_SIZE]
+                data, error = youtube_client.request(kind, {
+                    'part': ','.join(missing_parts),
+                    'id': ','.join(batch)
+                })
+                with self._lock:
+                    self._metrics['upstream_calls'] += 1
+                    if error:
+                        self._metrics['upstream_errors'] += 1
+
+                if error:
+                    # 오래된 값이라도 모든 part가 남아 있으면 그대로 사용
+                    if all(set(missing_parts) <= set(stored.get(entity_id, {})) for entity_id in batch):
+                        print(f"Entity store serving stale {kind} after upstream error: {error}")
+                        served_stale.update(batch)
+                        continue
+                    # 이 묶음만 실패로 처리하고 나머지 묶음은 계속 조회
+                    print(f"Entity store {kind} batch failed ({len(batch)} ids): {error}")
+                    batch_error = error
+                    continue
+
+                items = (data or {}).get('items', [])
+                self._save(kind, items, missing_parts)
+                for item in items:
+                    fetched[item['id']] = item
+                for entity_id in batch:
+                    if entity_id not in fetched:
+                        set_negative(kind, entity_id, 'not_found')
+
+        # 저장된 part와 새로 가져온 part를 합쳐 API 응답 형식으로 구성
+        result = {}
+        for entity_id in ids:
+            if entity_id in absent:
+                continue
+            if entity_id in needed and entity_id not in fetched and entity_id not in served_stale:
+                continue  # 존재하지 않거나 비공개/삭제된 엔티티
+            item = {'id': entity_id}
+            for part, (data, _) in stored.get(entity_id, {}).items():
+                item[part] = data
+            for part in needed.get(entity_id, ()):
+                if part in fetched.get(entity_id, {}):
+                    item[part] = fetched[entity_id][part]
+            result[entity_id] = item
+        return result, batch_error
+
+    def get_channels(self, ids, parts=('snippet', 'statistics')):
+        """채널 레코드 조회 - (items, error)"""
+        return self.get('channels', ids, parts)
+
+    def get_videos(self, ids, parts=('snippet', 'statistics')):
+        """영상 레코드 조회 - (items, error)"""
+        return self.get('videos', ids, parts)
+
+    def _maybe_purge(self):
+        with self._lock:
+            self._writes_since_purge += 1
+            should_purge = self._writes_since_purge >= PURGE_EVERY_WRITES
+            if should_purge:
+                self._writes_since_purge = 0
+        if should_purge:
+            self.purge()
+
+    def purge(self):
+        """
+        보관 기간이 지난 part 삭제
+
+        Returns:
+            int: 삭제된 part 수
+        """
+        conn = self._connect()
+        try:
+            return conn.execute(
+                'DELETE FROM entity_parts WHERE fetched_at < ?', (time.time() - ENTITY_RETENTION,)
+            ).rowcount
+        finally:
+            conn.close()
+
+    def get_stats(self):
+        """종류별 저장된 엔티티 수와 적중/갱신/업스트림 호출 수 (이 워커 기준)"""
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT kind, COUNT(DISTINCT id) FROM entity_parts GROUP BY kind').fetchall()
+        finally:
+            conn.close()
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {
+            'entities': {kind: count for kind, count in rows},
+            **metrics
+        }
+
+
+# 전역 인스턴스
+entity_store = EntityStore()
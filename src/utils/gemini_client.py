@@ -0,0 +1,612 @@
+"""
+Gemini API 공용 클라이언트
+- 워커 프로세스마다 keep-alive 커넥션 풀(requests.Session) 하나를 공유
+- 429/5xx 응답과 네트워크 오류는 지수 백오프 + 지터로 재시도
+- 설정된 모든 Gemini 키(GEMINI_API_KEY, GEMINI_API_KEY_n)에
+  분당 요청 수(RPM)/분당 토큰 수(TPM) 사용률 기준으로 부하 분산
+- 동시에 들어온 같은 요청은 업스트림 호출 하나로 병합 (single-flight)
+- 모델 + 요청 본문 해시 기준의 디스크 캐시 (재시작 후에도 유지, 호출별 TTL, 크기 상한)
+- streamGenerateContent 스트리밍 생성
+- JSON 모드 생성 (responseMimeType + pydantic 모델로 선언한 responseSchema, 검증 및 복구)
+- 엔드포인트별 출력 토큰 예산 적용 및 토큰 사용량/지연 시간 집계
+"""
+
+import os
+import re
+import hashlib
+import json
+import random
+import time
+from collections import defaultdict, deque
+from threading import Lock
+
+import requests
+from flask import has_request_context, request as flask_request
+from pydantic import ValidationError
+from requests.adapters import HTTPAdapter
+
+from src.utils.api_key_manager import api_key_manager
+from src.utils.shared_cache import SQLiteCache
+from src.utils.single_flight import single_flight, make_flight_key
+from src.utils.token_budget import apply_output_budget, estimate_payload_tokens, token_metrics
+
+GEMINI_API_BASE_URL = 'https://generativelanguage.googleapis.com/v1beta/models'
+DEFAULT_MODEL = 'gemini-2.0-flash-exp'
+
+# 기본 타임아웃 (초)
+DEFAULT_TIMEOUT = 120
+# 기본 최대 시도 횟수
+DEFAULT_MAX_RETRIES = 4
+
+# 지수 백오프 (초): min(BACKOFF_MAX, BACKOFF_BASE * 2^시도) 범위에서 무작위 대기
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 20.0
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# 429를 받은 키를 쉬게 하는 시간 (Retry-After 헤더가 없을 때, 초)
+RATE_LIMIT_COOLDOWN = 30
+# 잘못된 키를 쉬게 하는 시간 (초)
+INVALID_KEY_COOLDOWN = 3600
+
+# 응답 디스크 캐시 크기 상한 (바이트), 기본 128MB
+GEMINI_CACHE_MAX_BYTES = int(os.getenv('GEMINI_CACHE_MAX_BYTES', str(128 * 1024 * 1024)))
+# 'true'이면 응답 캐시 전체 비활성화
+GEMINI_CACHE_DISABLED = os.getenv('GEMINI_CACHE_DISABLED', 'false').lower() == 'true'
+
+# 키당 분당 한도 (워커 프로세스 기준)
+GEMINI_RPM_LIMIT = int(os.getenv('GEMINI_RPM_LIMIT', '1000'))
+GEMINI_TPM_LIMIT = int(os.getenv('GEMINI_TPM_LIMIT', '1000000'))
+
+
+class GeminiStreamError(Exception):
+    """스트리밍 생성 실패"""
+
+
+def gemini_cache_key(model, payload):
+    """모델 + 요청 본문(프롬프트, generationConfig ...)의 해시"""
+    raw = json.dumps({'model': model, 'payload': payload}, sort_keys=True, ensure_ascii=False)
+    return 'gemini:' + hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def cache_bypass_requested():
+    """
+    현재 요청이 캐시 우회를 요청했는지 확인
+    (?nocache=1 또는 Cache-Control: no-cache 헤더)
+    """
+    if not has_request_context():
+        return False
+    if flask_request.args.get('nocache') in ('1', 'true'):
+        return True
+    return 'no-cache' in flask_request.headers.get('Cache-Control', '')
+
+
+def build_payload(prompt, generation_config=None):
+    """generateContent 요청 본문 생성"""
+    payload = {
+        "contents": [{
+            "parts": [{
+                "text": prompt
+            }]
+        }]
+    }
+    if generation_config:
+        payload["generationConfig"] = generation_config
+    return payload
+
+
+def extract_text(result):
+    """generateContent 응답에서 텍스트 추출"""
+    candidates = (result or {}).get('candidates') or []
+    if not candidates:
+        return None
+    parts = candidates[0].get('content', {}).get('parts') or []
+    texts = [part['text'] for part in parts if 'text' in part]
+    return ''.join(texts) if texts else None
+
+
+# JSON 응답 검증 실패 시 새로 생성하는 최대 횟수
+JSON_MAX_REGENERATIONS = 1
+
+# pydantic JSON Schema → Gemini responseSchema(OpenAPI 부분집합) 타입
+_SCHEMA_TYPES = {
+    'string': 'STRING',
+    'number': 'NUMBER',
+    'integer': 'INTEGER',
+    'boolean': 'BOOLEAN',
+    'array': 'ARRAY',
+    'object': 'OBJECT'
+}
+
+
+def response_schema(model_cls):
+    """pydantic 모델을 Gemini responseSchema로 변환 ($ref 전개, 지원하지 않는 키워드 제거)"""
+    schema = model_cls.model_json_schema()
+    definitions = schema.get('$defs', {})
+
+    def convert(node):
+        if '$ref' in node:
+            node = definitions[node['$ref'].split('/')[-1]]
+
+        # Optional[X] → X + nullable
+        variants = node.get('anyOf')
+        if variants:
+            non_null = [variant for variant in variants if variant.get('type') != 'null']
+            converted = convert(non_null[0]) if non_null else {'type': 'STRING'}
+            if len(non_null) < len(variants):
+                converted['nullable'] = True
+            return converted
+
+        converted = {'type': _SCHEMA_TYPES.get(node.get('type'), 'STRING')}
+        if node.get('description'):
+            converted['description'] = node['description']
+        if node.get('enum'):
+            converted['enum'] = [str(value) for value in node['enum']]
+        if node.get('type') == 'array':
+            converted['items'] = convert(node.get('items', {}))
+        if node.get('type') == 'object' and node.get('properties'):
+            converted['properties'] = {name: convert(prop) for name, prop in node['properties'].items()}
+            converted['propertyOrdering'] = list(node['properties'])
+            if node.get('required'):
+                converted['required'] = node['required']
+        return converted
+
+    return convert(schema)
+
+
+def repair_json_text(text):
+    """
+    모델 출력에서 JSON을 최대한 복구 (재생성 전에 시도하는 저비용 단계)
+    - 마크다운 코드 블록 및 앞뒤 설명 문장 제거
+    - 닫는 괄호 앞의 불필요한 쉼표 제거
+    - 출력이 잘린 경우 열린 문자열/괄호를 닫음
+    """
+    text = (text or '').strip()
+    fenced = re.search(r'```(?:json)?\s*(.*?)(?:```|$)', text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1).strip()
+
+    starts = [index for index in (text.find('{'), text.find('[')) if index != -1]
+    if not starts:
+        return text
+    text = text[min(starts):]
+
+    # 문자열 밖의 괄호 짝 추적
+    stack = []
+    in_string = False
+    escaped = False
+    end = len(text)
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+        elif char in '}]':
+            if stack:
+                stack.pop()
+            if not stack:
+                end = index + 1
+                break
+    text = text[:end]
+
+    if in_string:
+        text += '"'
+    if stack:
+        text = re.sub(r'[,:]\s*$', '', text.rstrip())
+        text += ''.join(reversed(stack))
+
+    return re.sub(r',\s*([}\]])', r'\1', text)
+
+
+def parse_json_response(text, model_cls):
+    """
+    모델 출력 텍스트를 파싱하고 pydantic 모델로 검증 (실패 시 복구 후 한 번 더 시도)
+
+    Returns:
+        tuple: (검증된 dict, error)
+    """
+    error = "Empty response from Gemini API."
+    for candidate in (text, repair_json_text(text)):
+        if not candidate:
+            continue
+        try:
+            return model_cls.model_validate_json(candidate).model_dump(), None
+        except ValidationError as e:
+            error = f"Invalid JSON response: {e.errors()[0].get('msg')} at {e.errors()[0].get('loc')}"
+    return None, error
+
+
+class GeminiKeyBalancer:
+    """
+    키별 최근 1분간 요청 수/토큰 수를 기록하고
+    사용률(RPM, TPM 중 큰 값)이 가장 낮은 키를 선택
+    """
+
+    def __init__(self, rpm_limit=GEMINI_RPM_LIMIT, tpm_limit=GEMINI_TPM_LIMIT, window=60):
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.window = window
+        self._lock = Lock()
+        # 키 → [[시각, 토큰 수], ...]
+        self._usage = defaultdict(deque)
+        self._cooldown_until = {}
+
+    def _prune(self, key, now):
+        usage = self._usage[key]
+        while usage and usage[0][0] <= now - self.window:
+            usage.popleft()
+        return usage
+
+    def _load(self, key, now):
+        usage = self._prune(key, now)
+        tokens = sum(entry[1] for entry in usage)
+        return max(len(usage) / self.rpm_limit, tokens / self.tpm_limit)
+
+    def acquire(self, keys, estimated_tokens=0):
+        """
+        사용률이 가장 낮은 키 선택 후 이번 요청을 기록
+
+        Returns:
+            tuple: (키, 사용량 기록) - 모든 키가 쉬는 중이면 (None, 가장 빠른 재개까지 남은 초)
+        """
+        now = time.time()
+        with self._lock:
+            candidates = [key for key in keys if self._cooldown_until.get(key, 0) <= now]
+            if not candidates:
+                wait = min(self._cooldown_until[key] for key in keys) - now
+                return None, max(wait, 0)
+
+            key = min(candidates, key=lambda k: self._load(k, now))
+            entry = [now, estimated_tokens]
+            self._usage[key].append(entry)
+            return key, entry
+
+    def least_loaded(self, keys):
+        """사용률이 가장 낮은 키 (기록하지 않음, 모두 쉬는 중이면 전체 중에서 선택)"""
+        if not keys:
+            return None
+        now = time.time()
+        with self._lock:
+            available = [key for key in keys if self._cooldown_until.get(key, 0) <= now] or keys
+            return min(available, key=lambda k: self._load(k, now))
+
+    def record_tokens(self, entry, tokens):
+        """응답의 실제 토큰 사용량으로 기록 보정"""
+        with self._lock:
+            entry[1] = tokens
+
+    def cooldown(self, key, seconds):
+        """키를 일정 시간 선택 대상에서 제외"""
+        with self._lock:
+            self._cooldown_until[key] = max(self._cooldown_until.get(key, 0), time.time() + seconds)
+
+    def get_stats(self, keys):
+        """키별 최근 1분 사용량 (이 워커 기준)"""
+        now = time.time()
+        with self._lock:
+            stats = []
+            for key in keys:
+                usage = self._prune(key, now)
+                cooldown_until = self._cooldown_until.get(key, 0)
+                stats.append({
+                    'key': f"...{key[-4:]}",
+                    'requests_last_minute': len(usage),
+                    'tokens_last_minute': sum(entry[1] for entry in usage),
+                    'cooldown_until': cooldown_until if cooldown_until > now else None
+                })
+            return stats
+
+
+class GeminiClient:
+    """Gemini API 클라이언트 (프로세스별 커넥션 풀, 키 부하 분산)"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_size=20):
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.balancer = GeminiKeyBalancer()
+        self.cache = SQLiteCache(db_path='data/gemini_cache.db', max_bytes=GEMINI_CACHE_MAX_BYTES)
+        self._session = None
+        self._session_pid = None
+        self._lock = Lock()
+
+    def _get_session(self):
+        """현재 프로세스의 세션 반환 (fork된 워커마다 새로 생성)"""
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._lock:
+                if self._session is None or self._session_pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    self._session = session
+                    self._session_pid = pid
+        return self._session
+
+    def has_keys(self):
+        """사용 가능한 Gemini API 키가 설정되어 있는지 확인"""
+        return bool(api_key_manager.gemini_keys)
+
+    def pick_key(self):
+        """현재 사용률이 가장 낮은 키 (호환용, 사용량은 기록하지 않음)"""
+        return self.balancer.least_loaded(api_key_manager.gemini_keys)
+
+    def generate_content(self, payload, model=DEFAULT_MODEL, timeout=None,
+                         max_retries=DEFAULT_MAX_RETRIES, api_key=None,
+                         cache_ttl=None, bypass_cache=None, endpoint=None):
+        """
+        generateContent 호출 (같은 요청의 동시 호출은 하나로 병합)
+
+        Args:
+            payload: 요청 본문 (contents, generationConfig ...)
+            model: 모델명
+            timeout: 요청 타임아웃 (초), None이면 기본값
+            max_retries: 최대 시도 횟수
+            api_key: 특정 키로만 호출할 때 지정 (키 테스트용), None이면 부하 분산
+            cache_ttl: 응답 캐시 유효 시간 (초), None이면 캐시하지 않음
+            bypass_cache: True이면 캐시를 읽지 않고 새로 생성 (None이면 현재 요청의
+                ?nocache=1 / Cache-Control: no-cache 여부로 판단)
+            endpoint: 토큰 예산/사용량 집계용 엔드포인트 이름 (예산이 있으면 maxOutputTokens 설정)
+
+        Returns:
+            tuple: (response_json, error)
+        """
+        payload = apply_output_budget(payload, endpoint)
+        started = time.monotonic()
+        use_cache = bool(cache_ttl) and not api_key and not GEMINI_CACHE_DISABLED
+        if use_cache:
+            cache_key = gemini_cache_key(model, payload)
+            if bypass_cache is None:
+                bypass_cache = cache_bypass_requested()
+            if not bypass_cache:
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    token_metrics.record(endpoint, time.monotonic() - started, cached=True)
+                    return cached, None
+
+        result, error = single_flight.do(
+            make_flight_key(model, payload, api_key),
+            lambda: self._generate_content(payload, model, timeout, max_retries, api_key),
+            name='gemini'
+        )
+        if error:
+            token_metrics.record(endpoint, time.monotonic() - started, error=True)
+        else:
+            token_metrics.record_result(endpoint, started, payload, result)
+
+        if use_cache and error is None and extract_text(result) is not None:
+            try:
+                self.cache.set(cache_key, result, ttl=cache_ttl)
+            except Exception as e:
+                print(f"Gemini cache write failed: {e}")
+        return result, error
+
+    def _cache_get(self, cache_key):
+        """캐시된 응답 조회 (실패 시 캐시 미적중으로 처리)"""
+        try:
+            return self.cache.get(cache_key)
+        except Exception as e:
+            print(f"Gemini cache read failed: {e}")
+            return None
+
+    def _generate_content(self, payload, model, timeout, max_retries, api_key):
+        """재시도/키 분산을 포함한 실제 업스트림 요청"""
+        url = f'{GEMINI_API_BASE_URL}/{model}:generateContent'
+        response, entry, error = self._post(url, payload, timeout, max_retries, api_key)
+        if error:
+            return None, error
+
+        try:
+            result = response.json()
+        except ValueError:
+            return None, "Invalid JSON response from Gemini API."
+        self._record_usage(entry, result)
+        return result, None
+
+    def _post(self, url, payload, timeout, max_retries, api_key, stream=False):
+        """
+        키를 골라 POST 요청 (429/5xx/네트워크 오류는 백오프 후 다른 키로 재시도)
+
+        Returns:
+            tuple: (성공한 response, 사용량 기록, error)
+        """
+        keys = [api_key] if api_key else api_key_manager.gemini_keys
+        if not keys:
+            return None, None, "No Gemini API keys are available."
+
+        session = self._get_session()
+        prompt_tokens = estimate_payload_tokens(payload)
+        last_error = "Gemini API request failed."
+
+        for attempt in range(max_retries):
+            if api_key:
+                key, entry = api_key, None
+            else:
+                key, entry = self.balancer.acquire(keys, prompt_tokens)
+                if key is None:
+                    # 모든 키가 쉬는 중: 곧 풀리면 기다렸다가 재시도, 아니면 즉시 실패
+                    if entry > BACKOFF_MAX or attempt == max_retries - 1:
+                        return None, None, f"All Gemini API keys are rate limited. Retry in {int(entry) + 1}s."
+                    time.sleep(entry)
+                    continue
+
+            try:
+                response = session.post(
+                    url,
+                    json=payload,
+                    headers={'x-goog-api-key': key},
+                    timeout=timeout or self.timeout,
+                    stream=stream
+                )
+            except requests.exceptions.RequestException as e:
+                last_error = f"Gemini API request error: {e}"
+                print(f"[Gemini] {last_error} (attempt {attempt + 1}/{max_retries})")
+                self._backoff(attempt, max_retries)
+                continue
+
+            if response.status_code == 200:
+                return response, entry, None
+
+            message = _error_message(response)
+            last_error = f"Gemini API error {response.status_code}: {message}"
+            print(f"[Gemini] {last_error} (key ...{key[-4:]}, attempt {attempt + 1}/{max_retries})")
+            response.close()
+
+            if response.status_code == 429:
+                self.balancer.cooldown(key, _retry_after(response) or RATE_LIMIT_COOLDOWN)
+            elif response.status_code in (400, 403) and 'API key' in message:
+                # 잘못된 키는 한동안 제외하고 다른 키로 재시도 (지정한 키이거나 다른 키가 없으면 바로 실패)
+                self.balancer.cooldown(key, INVALID_KEY_COOLDOWN)
+                if api_key or len(keys) == 1:
+                    return None, None, last_error
+                continue
+            elif response.status_code not in RETRYABLE_STATUS:
+                return None, None, last_error
+
+            # 다른 키가 남아 있으면 바로 재시도, 아니면 백오프
+            if len(keys) == 1 or response.status_code != 429:
+                self._backoff(attempt, max_retries)
+
+        return None, None, last_error
+
+    def _record_usage(self, entry, result):
+        """응답의 usageMetadata로 키 사용량 보정"""
+        if entry is None:
+            return
+        usage = (result or {}).get('usageMetadata', {})
+        total_tokens = usage.get('totalTokenCount') or (
+            usage.get('promptTokenCount', 0) + usage.get('candidatesTokenCount', 0)
+        )
+        if total_tokens:
+            self.balancer.record_tokens(entry, total_tokens)
+
+    def stream(self, prompt, model=DEFAULT_MODEL, generation_config=None,
+               timeout=None, max_retries=DEFAULT_MAX_RETRIES, endpoint=None):
+        """
+        streamGenerateContent(SSE) 호출 - 생성되는 텍스트 조각을 차례로 반환하는 제너레이터
+
+        첫 조각을 받기 전의 오류는 다른 키로 재시도하고,
+        재시도가 모두 실패하거나 스트리밍 도중 끊기면 GeminiStreamError를 발생시킵니다.
+        """
+        url = f'{GEMINI_API_BASE_URL}/{model}:streamGenerateContent?alt=sse'
+        payload = apply_output_budget(build_payload(prompt, generation_config), endpoint)
+        started = time.monotonic()
+        response, entry, error = self._post(url, payload, timeout, max_retries, None, stream=True)
+        if error:
+            token_metrics.record(endpoint, time.monotonic() - started, error=True)
+            raise GeminiStreamError(error)
+
+        last_chunk = None
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                try:
+                    chunk = json.loads(line[len('data:'):].strip())
+                except ValueError:
+                    continue
+                last_chunk = chunk
+                text = extract_text(chunk)
+                if text:
+                    yield text
+        except requests.exceptions.RequestException as e:
+            raise GeminiStreamError(f"Gemini stream interrupted: {e}")
+        finally:
+            response.close()
+            # 마지막 조각의 usageMetadata가 전체 사용량
+            self._record_usage(entry, last_chunk)
+            token_metrics.record_result(endpoint, started, payload, last_chunk)
+
+    def _backoff(self, attempt, max_retries):
+        """지수 백오프 + 전체 지터 (마지막 시도 뒤에는 대기하지 않음)"""
+        if attempt < max_retries - 1:
+            time.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))))
+
+    def generate(self, prompt, model=DEFAULT_MODEL, generation_config=None, **kwargs):
+        """
+        프롬프트로 텍스트 생성
+
+        Args:
+            prompt: 프롬프트
+            model: 모델명
+            generation_config: generationConfig (temperature, maxOutputTokens ...)
+            **kwargs: generate_content 옵션 (timeout, max_retries, api_key, cache_ttl, bypass_cache, endpoint)
+
+        Returns:
+            tuple: (text, error)
+        """
+        result, error = self.generate_content(build_payload(prompt, generation_config), model=model, **kwargs)
+        if error:
+            return None, error
+        text = extract_text(result)
+        if text is None:
+            return None, "Empty response from Gemini API."
+        return text, None
+
+    def generate_json(self, prompt, schema, model=DEFAULT_MODEL, generation_config=None, **kwargs):
+        """
+        JSON 모드로 생성하고 pydantic 모델로 검증
+
+        responseMimeType: application/json과 schema에서 변환한 responseSchema를 함께 보내고,
+        응답이 검증을 통과하지 못하면 복구를 먼저 시도한 뒤에만 캐시를 우회해 새로 생성합니다.
+
+        Args:
+            prompt: 프롬프트
+            schema: 응답 형식을 선언한 pydantic 모델 클래스
+            model: 모델명
+            generation_config: generationConfig (temperature, maxOutputTokens ...)
+            **kwargs: generate_content 옵션 (timeout, max_retries, api_key, cache_ttl, bypass_cache, endpoint)
+
+        Returns:
+            tuple: (검증된 dict, error)
+        """
+        config = dict(generation_config or {})
+        config['responseMimeType'] = 'application/json'
+        config['responseSchema'] = response_schema(schema)
+        payload = apply_output_budget(build_payload(prompt, config), kwargs.get('endpoint'))
+
+        error = None
+        for attempt in range(JSON_MAX_REGENERATIONS + 1):
+            if attempt > 0:
+                print(f"[Gemini] {error} - regenerating ({attempt}/{JSON_MAX_REGENERATIONS})")
+                kwargs['bypass_cache'] = True
+            result, error = self.generate_content(payload, model=model, **kwargs)
+            if error:
+                return None, error
+            data, error = parse_json_response(extract_text(result), schema)
+            if data is not None:
+                return data, None
+
+        # 검증에 실패한 응답이 캐시에 남지 않도록 삭제
+        if kwargs.get('cache_ttl'):
+            try:
+                self.cache.delete(gemini_cache_key(model, payload))
+            except Exception as e:
+                print(f"Gemini cache delete failed: {e}")
+        return None, error
+
+
+def _error_message(response):
+    """Gemini API 오류 응답에서 메시지 추출"""
+    try:
+        return response.json().get('error', {}).get('message', response.reason)
+    except ValueError:
+        return response.reason
+
+
+def _retry_after(response):
+    """Retry-After 헤더 (초)"""
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+# 전역 클라이언트 인스턴스
+gemini_client = GeminiClient()
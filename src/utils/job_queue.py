@@ -0,0 +1,544 @@
+"""
+장시간 AI 생성 작업 큐
+- POST 요청은 작업 ID만 바로 반환하고, 실제 생성은 프로세스별 백그라운드 스레드 풀에서 실행
+- 작업 상태와 결과는 SQLite(WAL)에 저장하여 어느 워커에서든 조회 가능
+- 같은 엔드포인트에 같은 요청이 다시 들어오면 진행 중이거나 최근 완료된 작업을 재사용
+- 동기 요청도 작업으로 기록하여, 재시도/중복 클릭은 새로 생성하지 않고 진행 중이거나 완료된 결과를 받음
+  (Idempotency-Key 헤더가 있으면 그 값으로, 없으면 요청 본문 해시로 중복 판별, 캐시 우회 요청은 본문 중복 판별 제외)
+- 진행 중인 작업은 실행하는 워커가 리스(lease)를 주기적으로 갱신하며, 워커가 종료되어 리스가 만료되면 실패로 간주
+"""
+
+import os
+import json
+import sqlite3
+import time
+import uuid
+import hashlib
+import socket
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Thread
+
+from flask import current_app, jsonify, request, session
+
+from src.utils.gemini_client import cache_bypass_requested
+
+# 프로세스당 동시에 실행할 작업 수
+JOB_MAX_WORKERS = int(os.getenv('JOB_MAX_WORKERS', '2'))
+# 프로세스당 대기+실행 중 작업 수 상한 (넘으면 503)
+JOB_MAX_PENDING = int(os.getenv('JOB_MAX_PENDING', '32'))
+# 완료된 작업 결과를 중복 요청에 재사용하는 시간 (초)
+JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', '3600'))
+# 동기 요청의 완료된 결과를 중복 요청에 재사용하는 시간 (초)
+IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', '600'))
+# 중복 요청이 진행 중인 작업의 완료를 확인하는 간격 (초)
+JOB_WAIT_INTERVAL = 0.5
+# 중복 동기 요청이 진행 중인 작업을 기다리는 최대 시간 (초) - 넘으면 409와 작업 ID 반환
+IDEMPOTENCY_WAIT_TIMEOUT = int(os.getenv('IDEMPOTENCY_WAIT_TIMEOUT', '30'))
+# 진행 중인 작업의 리스 유효 시간 (초) - 실행 워커가 이 시간 동안 갱신하지 않으면 실패로 간주
+JOB_LEASE_TTL = 60
+# 리스 갱신 주기 (초)
+JOB_HEARTBEAT_INTERVAL = 15
+# 이 시간 동안 끝나지 않은 작업은 워커가 종료된 것으로 보고 실패 처리 (초)
+JOB_STALE_SECONDS = int(os.getenv('JOB_STALE_SECONDS', '900'))
+# 완료된 작업 기록 보관 기간 (초)
+JOB_RETENTION = 7 * 86400
+# 이 횟수만큼 작업을 등록할 때마다 오래된 기록 정리
+PURGE_EVERY_SUBMITS = 100
+# 백그라운드 실행 시 원래 요청에서 전달하지 않는 헤더 (본문은 다시 직렬화하고 세션은 직접 복사)
+FORWARD_EXCLUDED_HEADERS = ('content-length', 'content-type', 'cookie', 'host')
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED)
+
+
+def make_dedupe_key(name, payload, context):
+    """엔드포인트 이름 + 요청 본문 + 세션 정보로 중복 판별 키 생성"""
+    raw = json.dumps(
+        {'name': name, 'payload': payload, 'context': context},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def make_request_dedupe_key(name, payload, context):
+    """
+    Idempotency-Key 헤더가 있으면 그 값으로, 없으면 요청 본문으로 중복 판별 키 생성
+    (헤더 없이 캐시 우회(?nocache=1, Cache-Control: no-cache)를 요청하면 본문 중복 판별을 건너뜀)
+    """
+    idempotency_key = request.headers.get('Idempotency-Key', '').strip()
+    if idempotency_key:
+        return make_dedupe_key(name, {'idempotency_key': idempotency_key[:255]}, context)
+    if cache_bypass_requested():
+        return make_dedupe_key(name, {'nocache': uuid.uuid4().hex}, context)
+    return make_dedupe_key(name, payload, context)
+
+
+class IdempotencyKeyMismatch(Exception):
+    """같은 Idempotency-Key가 다른 요청 본문으로 다시 사용됨"""
+
+
+class JobQueue:
+    """SQLite에 상태를 저장하는 백그라운드 작업 큐"""
+
+    def __init__(self, db_path='data/jobs.db', max_workers=JOB_MAX_WORKERS, max_pending=JOB_MAX_PENDING):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._lock = Lock()
+        self._executor = None
+        self._executor_pid = None
+        self._pending = 0
+        self._submits_since_purge = 0
+        self._owned = set()
+        self._heartbeat_pid = None
+        self.owner_id = None
+        self._init_database()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_database(self):
+        """데이터베이스 초기화"""
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    dedupe_key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    status_code INTEGER,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            ''')
+            # 이전 버전 테이블에 리스/본문 해시 컬럼 추가
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+            for column, column_type in (('body_hash', 'TEXT'), ('owner', 'TEXT'), ('lease_until', 'REAL')):
+                if column not in columns:
+                    conn.execute(f'ALTER TABLE jobs ADD COLUMN {column} {column_type}')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs(dedupe_key, created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at)')
+        finally:
+            conn.close()
+
+    def _get_executor(self):
+        """현재 프로세스의 작업 스레드 풀 (fork된 워커마다 새로 생성)"""
+        pid = os.getpid()
+        with self._lock:
+            if self._executor is None or self._executor_pid != pid:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+                self._executor_pid = pid
+                self._pending = 0
+            return self._executor
+
+    def _own(self, job_id):
+        """현재 프로세스가 실행하는 작업으로 등록 (리스 갱신 스레드는 fork된 워커마다 새로 시작)"""
+        pid = os.getpid()
+        with self._lock:
+            if self._heartbeat_pid != pid:
+                self._heartbeat_pid = pid
+                self.owner_id = f'{socket.gethostname()}:{pid}'
+                self._owned = set()
+                Thread(target=self._heartbeat_loop, daemon=True, name='job-heartbeat').start()
+            self._owned.add(job_id)
+        return self.owner_id
+
+    def _disown(self, job_id):
+        with self._lock:
+            self._owned.discard(job_id)
+
+    def _heartbeat_loop(self):
+        """실행 중인 작업의 리스 갱신"""
+        while True:
+            time.sleep(JOB_HEARTBEAT_INTERVAL)
+            with self._lock:
+                job_ids = list(self._owned)
+            if not job_ids:
+                continue
+            try:
+                conn = self._connect()
+                try:
+                    conn.execute(
+                        f'''UPDATE jobs SET lease_until = ?
+                            WHERE id IN ({','.join('?' * len(job_ids))}) AND status IN (?, ?)''',
+                        (time.time() + JOB_LEASE_TTL, *job_ids, STATUS_QUEUED, STATUS_RUNNING)
+                    )
+                finally:
+                    conn.close()
+            except Exception as e:
+                print(f"Job lease renewal failed: {e}")
+
+    def _find_reusable(self, conn, dedupe_key, body_hash, result_ttl=JOB_RESULT_TTL):
+        """
+        재사용할 수 있는 진행 중(리스 유효) 또는 최근(result_ttl 이내) 완료 작업 ID
+
+        Raises:
+            IdempotencyKeyMismatch: 같은 키의 작업이 다른 요청 본문으로 등록되어 있음
+        """
+        now = time.time()
+        row = conn.execute('''
+            SELECT id, body_hash FROM jobs
+            WHERE dedupe_key = ?
+              AND (
+                (status IN (?, ?) AND created_at > ? AND lease_until > ?)
+                OR (status = ? AND finished_at > ?)
+              )
+            ORDER BY created_at DESC
+            LIMIT 1
+        ''', (
+            dedupe_key,
+            STATUS_QUEUED, STATUS_RUNNING, now - JOB_STALE_SECONDS, now,
+            STATUS_DONE, now - result_ttl
+        )).fetchone()
+        if not row:
+            return None
+        if row['body_hash'] and body_hash and row['body_hash'] != body_hash:
+            raise IdempotencyKeyMismatch('같은 Idempotency-Key가 다른 요청 본문으로 이미 사용되었습니다.')
+        return row['id']
+
+    def submit(self, name, dedupe_key, func, body_hash=None):
+        """
+        작업 등록 (같은 키의 작업이 있으면 재사용)
+
+        Args:
+            name: 작업 종류 (예: 'ai.analyze')
+            dedupe_key: 중복 판별 키
+            func: 인자 없는 함수, (status_code, result) 반환
+            body_hash: 요청 본문 해시 (Idempotency-Key 재사용 시 본문 비교용)
+
+        Returns:
+            tuple: (job_id, deduplicated, error)
+
+        Raises:
+            IdempotencyKeyMismatch: 같은 키가 다른 요청 본문으로 이미 사용됨
+        """
+        executor = self._get_executor()
+
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            job_id = self._find_reusable(conn, dedupe_key, body_hash)
+            if job_id:
+                conn.execute('COMMIT')
+                return job_id, True, None
+
+            with self._lock:
+                if self._pending >= self.max_pending:
+                    conn.execute('ROLLBACK')
+                    return None, False, '대기 중인 작업이 너무 많습니다. 잠시 후 다시 시도해주세요.'
+                self._pending += 1
+
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            conn.execute(
+                '''INSERT INTO jobs (id, name, dedupe_key, body_hash, status, owner, created_at, lease_until)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                (job_id, name, dedupe_key, body_hash, STATUS_QUEUED, self._own(job_id), now, now + JOB_LEASE_TTL)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+        executor.submit(self._run, job_id, name, func)
+        self._maybe_purge()
+        return job_id, False, None
+
+    def begin(self, name, dedupe_key, body_hash=None, result_ttl=IDEMPOTENCY_TTL):
+        """
+        요청 스레드에서 직접 실행할 작업 등록 (같은 키의 작업이 있으면 재사용)
+
+        Args:
+            name: 작업 종류
+            dedupe_key: 중복 판별 키
+            body_hash: 요청 본문 해시 (Idempotency-Key 재사용 시 본문 비교용)
+            result_ttl: 완료된 작업을 재사용하는 시간 (초)
+
+        Returns:
+            tuple: (job_id, deduplicated) - deduplicated이면 실행하지 말고 wait()로 결과를 받음.
+                   직접 실행하는 경우 반드시 finish()로 결과를 기록
+
+        Raises:
+            IdempotencyKeyMismatch: 같은 키가 다른 요청 본문으로 이미 사용됨
+        """
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            job_id = self._find_reusable(conn, dedupe_key, body_hash, result_ttl)
+            if job_id:
+                conn.execute('COMMIT')
+                return job_id, True
+
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            conn.execute(
+                '''INSERT INTO jobs (id, name, dedupe_key, body_hash, status, owner, created_at, started_at, lease_until)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                (job_id, name, dedupe_key, body_hash, STATUS_RUNNING, self._own(job_id), now, now, now + JOB_LEASE_TTL)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+        self._maybe_purge()
+        return job_id, False
+
+    def finish(self, job_id, status_code, result):
+        """작업 결과 저장 (4xx/5xx 상태 코드는 실패로 기록되어 재사용되지 않음)"""
+        self._disown(job_id)
+        status = STATUS_DONE if status_code < 400 else STATUS_FAILED
+        error = None
+        if status == STATUS_FAILED and isinstance(result, dict):
+            error = result.get('error')
+        self._update(job_id, status=status, status_code=status_code,
+                     result=json.dumps(result, ensure_ascii=False, default=str),
+                     error=error, finished_at=time.time())
+
+    def wait(self, job_id, timeout, poll_interval=JOB_WAIT_INTERVAL):
+        """
+        작업이 끝날 때까지 최대 timeout초 대기
+
+        Returns:
+            dict: 작업 정보 (리스가 만료된 작업은 실패로 반환, 시간 안에 끝나지 않으면 진행 중 상태 그대로) - 없으면 None
+        """
+        deadline = time.time() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job['status'] in FINISHED_STATUSES or time.time() >= deadline:
+                return job
+            time.sleep(poll_interval)
+
+    def _run(self, job_id, name, func):
+        """작업 실행 후 결과 저장"""
+        try:
+            self._update(job_id, status=STATUS_RUNNING, started_at=time.time())
+            try:
+                status_code, result = func()
+            except BaseException as e:
+                print(f"Job {name} ({job_id}) failed: {e}")
+                self.finish(job_id, 500, {'error': str(e) or type(e).__name__})
+                if not isinstance(e, Exception):
+                    raise
+                return
+
+            self.finish(job_id, status_code, result)
+        finally:
+            self._disown(job_id)
+            with self._lock:
+                self._pending = max(self._pending - 1, 0)
+
+    def _update(self, job_id, **fields):
+        columns = ', '.join(f'{column} = ?' for column in fields)
+        conn = self._connect()
+        try:
+            conn.execute(f'UPDATE jobs SET {columns} WHERE id = ?', (*fields.values(), job_id))
+        finally:
+            conn.close()
+
+    def get(self, job_id):
+        """
+        작업 상태 조회
+
+        Returns:
+            dict: 작업 정보 - 없으면 None
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        finally:
+            conn.close()
+
+        if not row:
+            return None
+
+        job = {
+            'job_id': row['id'],
+            'name': row['name'],
+            'status': row['status'],
+            'status_code': row['status_code'],
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
+
+        # 실행하던 워커가 종료되어 끝나지 못한 작업
+        if job['status'] not in FINISHED_STATUSES:
+            now = time.time()
+            if now - job['created_at'] > JOB_STALE_SECONDS:
+                job['status'] = STATUS_FAILED
+                job['status_code'] = 500
+                job['error'] = '작업이 제한 시간 안에 완료되지 않았습니다.'
+            elif not row['lease_until'] or row['lease_until'] < now:
+                job['status'] = STATUS_FAILED
+                job['status_code'] = 500
+                job['error'] = '작업을 실행하던 워커가 종료되었습니다. 다시 요청해주세요.'
+        return job
+
+    def _maybe_purge(self):
+        with self._lock:
+            self._submits_since_purge += 1
+            should_purge = self._submits_since_purge >= PURGE_EVERY_SUBMITS
+            if should_purge:
+                self._submits_since_purge = 0
+        if should_purge:
+            self.purge()
+
+    def purge(self):
+        """
+        보관 기간이 지난 작업 기록 삭제
+
+        Returns:
+            int: 삭제된 작업 수
+        """
+        conn = self._connect()
+        try:
+            return conn.execute(
+                'DELETE FROM jobs WHERE created_at < ?', (time.time() - JOB_RETENTION,)
+            ).rowcount
+        finally:
+            conn.close()
+
+    def get_stats(self):
+        """상태별 작업 수"""
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        finally:
+            conn.close()
+        with self._lock:
+            pending = self._pending
+        return {
+            'by_status': {status: count for status, count in rows},
+            'pending_in_worker': pending,
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending
+        }
+
+
+# 전역 인스턴스
+job_queue = JobQueue()
+
+
+def _job_links(job_id):
+    return {
+        'job_id': job_id,
+        'status_url': f'/api/jobs/{job_id}',
+        'events_url': f'/api/jobs/{job_id}/events'
+    }
+
+
+def _run_idempotent(name, dedupe_key, body_hash, func):
+    """
+    동기 요청을 작업으로 기록하며 실행 (같은 키의 요청은 먼저 시작된 실행의 결과를 받음)
+
+    Returns:
+        Response: 직접 실행한 응답, 재사용한 결과 (Idempotent-Replayed 헤더 포함),
+                  또는 먼저 시작된 실행이 IDEMPOTENCY_WAIT_TIMEOUT 안에 끝나지 않으면 409와 작업 ID
+    """
+    try:
+        job_id, deduplicated = job_queue.begin(name, dedupe_key, body_hash)
+    except IdempotencyKeyMismatch as e:
+        return jsonify({'error': str(e)}), 422
+
+    if deduplicated:
+        job = job_queue.wait(job_id, timeout=IDEMPOTENCY_WAIT_TIMEOUT)
+        if job is None:
+            return jsonify({'error': '작업을 찾을 수 없습니다'}), 500
+        if job['status'] not in FINISHED_STATUSES:
+            return jsonify({'error': '같은 요청이 아직 처리 중입니다. 작업 상태를 확인해주세요.', **_job_links(job_id)}), 409
+        body = job['result'] if job['result'] is not None else {'error': job['error']}
+        response = jsonify(body)
+        response.status_code = job['status_code'] or 500
+        response.headers['Idempotent-Replayed'] = 'true'
+        return response
+
+    # 워커 타임아웃(SystemExit) 등으로 중단되어도 작업이 진행 중으로 남지 않도록 기록
+    try:
+        response = current_app.make_response(func())
+    except BaseException as e:
+        job_queue.finish(job_id, 500, {'error': str(e) or type(e).__name__})
+        raise
+    job_queue.finish(job_id, response.status_code, response.get_json(silent=True))
+    return response
+
+
+def background_job(name, session_keys=()):
+    """
+    뷰 함수를 백그라운드 작업으로도 실행할 수 있게 하는 데코레이터
+
+    라우트 기본값으로 run_async=True가 넘어오면 요청 본문과 필요한 세션 값을 저장해 두고
+    작업 스레드에서 같은 뷰를 다시 실행한 뒤, 202와 작업 ID를 바로 반환.
+    동기 요청도 작업으로 기록하여, 같은 요청(Idempotency-Key 헤더 또는 본문 해시)이
+    IDEMPOTENCY_TTL 안에 다시 들어오면 새로 생성하지 않고 진행 중이거나 완료된 결과를 반환
+    (진행 중인 실행은 IDEMPOTENCY_WAIT_TIMEOUT까지만 기다리고 409와 작업 ID 반환,
+    같은 Idempotency-Key에 다른 본문이면 422).
+    스트리밍 요청(stream=True)은 그대로 실행.
+    인증 데코레이터보다 안쪽에 두어 권한 확인은 등록 시점에 끝나도록 사용.
+
+    Args:
+        name: 작업 종류 이름
+        session_keys: 작업 실행 시 복원할 세션 키 (중복 판별에도 포함)
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, run_async=False, **kwargs):
+            if kwargs.get('stream'):
+                return f(*args, **kwargs)
+
+            payload = request.get_json(silent=True) or {}
+            context = {key: session.get(key) for key in session_keys if key in session}
+            dedupe_key = make_request_dedupe_key(name, payload, context)
+            body_hash = make_dedupe_key(name, payload, context)
+
+            if not run_async:
+                return _run_idempotent(name, dedupe_key, body_hash, lambda: f(*args, **kwargs))
+
+            app = current_app._get_current_object()
+            path = request.path
+            # 쿼리 문자열(?nocache=1 등)과 헤더도 백그라운드 요청 컨텍스트에 전달
+            query_string = request.query_string.decode('utf-8', 'replace')
+            headers = [
+                (key, value) for key, value in request.headers.items()
+                if key.lower() not in FORWARD_EXCLUDED_HEADERS
+            ]
+
+            def run():
+                with app.test_request_context(path, method='POST', json=payload,
+                                              query_string=query_string, headers=headers):
+                    session.update(context)
+                    response = app.make_response(f(*args, **kwargs))
+                    return response.status_code, response.get_json(silent=True)
+
+            try:
+                job_id, deduplicated, error = job_queue.submit(name, dedupe_key, run, body_hash=body_hash)
+            except IdempotencyKeyMismatch as e:
+                return jsonify({'error': str(e)}), 422
+            if error:
+                return jsonify({'error': error}), 503
+
+            return jsonify({**_job_links(job_id), 'deduplicated': deduplicated}), 202
+        return wrapper
+    return decorator
@@ -0,0 +1,66 @@
+"""
+주기 작업 목록
+- 트렌딩 스냅샷 갱신 (인기 급상승 30분, 뷰티 트렌드 6시간)
+- 캐시/저장소 정리 (공유 캐시 크기 상한 확인, 보관 기간이 지난 엔티티/작업 기록 삭제)
+- 저장된 채널 통계 재수집 (가장 오래전에 갱신된 채널부터 50개씩)
+"""
+
+from src.utils.cache import cache
+from src.utils.entity_store import entity_store
+from src.utils.gemini_client import gemini_client
+from src.utils.job_queue import job_queue
+from src.utils.trending_snapshot import register_jobs as register_trending_jobs
+from src.utils.youtube_client import youtube_client, MAX_PAGE_SIZE
+from src.models.channel_database import channel_db
+
+# 재수집 작업 한 번에 갱신할 최대 채널 수 (50개당 1 단위)
+RECRAWL_CHANNELS_PER_RUN = 500
+
+
+def trim_shared_caches():
+    """만료 항목 삭제 및 크기 상한 확인 (공유 캐시, Gemini 응답 캐시)"""
+    return {'shared_cache': cache.l2.trim(), 'gemini_cache': gemini_client.cache.trim()}
+
+
+def purge_expired_records():
+    """보관 기간이 지난 엔티티 part와 작업 기록 삭제"""
+    return {'entities': entity_store.purge(), 'jobs': job_queue.purge()}
+
+
+def recrawl_channels():
+    """
+    저장된 채널 중 가장 오래전에 갱신된 채널의 통계 재수집
+
+    Returns:
+        tuple: (갱신된 채널 수, error)
+    """
+    if not youtube_client.has_keys():
+        return 0, 'YouTube API key not configured'
+
+    channel_ids = channel_db.get_stale_channel_ids(limit=RECRAWL_CHANNELS_PER_RUN)
+    updated = 0
+    last_error = None
+    for start in range(0, len(channel_ids), MAX_PAGE_SIZE):
+        batch = channel_ids[start:start + MAX_PAGE_SIZE]
+        # 일부 묶음이 실패해도 조회된 채널은 갱신하고 다음 묶음 계속 진행
+        channels, error = entity_store.get_channels(batch, parts=('statistics',))
+        if error:
+            last_error = error
+        for channel_id, channel in (channels or {}).items():
+            statistics = channel.get('statistics', {})
+            channel_db.update_channel_stats(
+                channel_id,
+                int(statistics.get('subscriberCount', 0)),
+                int(statistics.get('videoCount', 0)),
+                int(statistics.get('viewCount', 0))
+            )
+            updated += 1
+    return updated, last_error
+
+
+def register_scheduled_jobs(scheduler):
+    """모든 주기 작업을 스케줄러에 등록"""
+    register_trending_jobs(scheduler)
+    scheduler.add_cron_job('maintenance.trim_caches', trim_shared_caches, cron='*/10 * * * *', jitter=30)
+    scheduler.add_cron_job('maintenance.purge_records', purge_expired_records, cron='30 3 * * *', jitter=300)
+    scheduler.add_cron_job('channels.recrawl', recrawl_channels, cron='0 4 * * *', jitter=600)
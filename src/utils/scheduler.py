@@ -0,0 +1,371 @@
+"""
+프로세스 내 주기 작업 스케줄러
+- 주기(interval) 또는 cron 형식으로 작업 등록, 실행 시각에 지터 적용
+- gunicorn 워커마다 스케줄러 스레드가 돌지만, SQLite 리스(lease)를 가진 리더 워커 하나만 작업 실행
+- 리더가 종료되면 리스가 만료된 뒤 다른 워커가 이어받음 (다음 실행 시각은 DB에 저장되어 유지)
+- 작업별 실행 시각, 소요 시간, 실패 횟수를 DB에 기록 (관리자 API에서 조회)
+"""
+
+import os
+import atexit
+import random
+import socket
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from threading import Lock, Thread
+
+# 스케줄러 확인 주기 (초)
+TICK_INTERVAL = 5
+# 리더 리스 유효 시간 (초) - 리더가 이 시간 동안 갱신하지 않으면 다른 워커가 이어받음
+LEASE_TTL = 30
+# 리스 이름 (호스트당 하나의 리더)
+LEADER_LEASE = 'scheduler_leader'
+
+STATUS_RUNNING = 'running'
+STATUS_OK = 'ok'
+STATUS_FAILED = 'failed'
+
+# cron 필드별 허용 범위 (분, 시, 일, 월, 요일 - 요일은 0=일요일, 7도 일요일로 허용)
+CRON_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def _parse_cron_field(field, low, high):
+    """cron 필드 하나를 허용 값 집합으로 변환 ('*', '*/n', 'a', 'a-b', 'a-b/n', 쉼표 목록)"""
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+            if step <= 0:
+                raise ValueError(f"Invalid cron step: {field}")
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(value) for value in part.split('-', 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field out of range: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """5필드 cron 표현식 (분 시 일 월 요일, 서버 로컬 시간 기준)"""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_cron_field(field, low, high)
+            for field, (low, high) in zip(fields, CRON_FIELD_RANGES)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        # 일/요일이 모두 지정되면 둘 중 하나만 맞아도 실행 (표준 cron 동작)
+        self._day_restricted = fields[2] != '*'
+        self._weekday_restricted = fields[4] != '*'
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, timestamp):
+        """timestamp 이후 처음 일치하는 시각 (unix time)"""
+        moment = datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366)
+        while moment < limit:
+            if moment.month not in self.months or not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+                continue
+            if moment.minute in self.minutes:
+                return moment.timestamp()
+            moment += timedelta(minutes=1)
+        raise ValueError(f"Cron expression never matches: {self.expression}")
+
+
+class ScheduledJob:
+    """등록된 작업 하나"""
+
+    def __init__(self, name, func, interval=None, cron=None, jitter=0, run_on_start=False):
+        if (interval is None) == (cron is None):
+            raise ValueError("Specify exactly one of interval or cron")
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cron = CronSchedule(cron) if cron else None
+        self.jitter = jitter
+        self.run_on_start = run_on_start
+
+    @property
+    def schedule(self):
+        return f'cron {self.cron.expression}' if self.cron else f'every {self.interval}s'
+
+    def next_run(self, now):
+        """다음 실행 시각 (지터 포함)"""
+        base = self.cron.next_after(now) if self.cron else now + self.interval
+        return base + random.uniform(0, self.jitter)
+
+
+class Scheduler:
+    """SQLite 리스로 리더를 선출하는 주기 작업 스케줄러"""
+
+    def __init__(self, db_path='data/scheduler.db'):
+        self.db_path = db_path
+        self.owner_id = None
+        self._jobs = {}
+        self._running = set()
+        self._lock = Lock()
+        self._pid = None
+        self._is_leader = False
+        self._init_database()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_database(self):
+        """데이터베이스 초기화"""
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS leases (
+                    name TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    acquired_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                    name TEXT PRIMARY KEY,
+                    next_run_at REAL,
+                    last_started_at REAL,
+                    last_finished_at REAL,
+                    last_duration REAL,
+                    last_status TEXT,
+                    last_error TEXT,
+                    last_owner TEXT,
+                    run_count INTEGER NOT NULL DEFAULT 0,
+                    failure_count INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+        finally:
+            conn.close()
+
+    def add_interval_job(self, name, func, seconds, jitter=0, run_on_start=False):
+        """
+        주기 작업 등록
+
+        Args:
+            name: 작업 이름 (DB 기록 키)
+            func: 인자 없는 함수 - 예외를 던지거나 (data, error) 튜플의 error가 있으면 실패로 기록
+            seconds: 실행 간격 (초)
+            jitter: 실행 시각에 더할 최대 무작위 지연 (초)
+            run_on_start: 처음 등록될 때 바로 실행할지 여부
+        """
+        self._jobs[name] = ScheduledJob(name, func, interval=seconds, jitter=jitter, run_on_start=run_on_start)
+
+    def add_cron_job(self, name, func, cron, jitter=0):
+        """
+        cron 작업 등록
+
+        Args:
+            name: 작업 이름 (DB 기록 키)
+            func: 인자 없는 함수
+            cron: '분 시 일 월 요일' 형식 (서버 로컬 시간 기준, 예: '*/10 * * * *')
+            jitter: 실행 시각에 더할 최대 무작위 지연 (초)
+        """
+        self._jobs[name] = ScheduledJob(name, func, cron=cron, jitter=jitter)
+
+    def ensure_started(self):
+        """스케줄러 스레드 시작 (fork된 워커마다 한 번)"""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            self.owner_id = f'{socket.gethostname()}:{pid}'
+            self._running = set()
+            self._is_leader = False
+            Thread(target=self._loop, daemon=True, name='scheduler').start()
+            atexit.register(self._release_lease)
+
+    def _loop(self):
+        while True:
+            try:
+                self._tick()
+            except Exception as e:
+                print(f"Scheduler tick failed: {e}")
+            time.sleep(TICK_INTERVAL)
+
+    def _try_lead(self, conn, now):
+        """리더 리스 획득 또는 갱신 - 리더이면 True"""
+        conn.execute('BEGIN IMMEDIATE')
+        row = conn.execute('SELECT owner, expires_at FROM leases WHERE name = ?', (LEADER_LEASE,)).fetchone()
+        if row and row['owner'] != self.owner_id and row['expires_at'] > now:
+            conn.execute('COMMIT')
+            return False
+
+        if row and row['owner'] == self.owner_id:
+            conn.execute('UPDATE leases SET expires_at = ? WHERE name = ?', (now + LEASE_TTL, LEADER_LEASE))
+        else:
+            conn.execute(
+                'INSERT OR REPLACE INTO leases (name, owner, acquired_at, expires_at) VALUES (?, ?, ?, ?)',
+                (LEADER_LEASE, self.owner_id, now, now + LEASE_TTL)
+            )
+            print(f"Scheduler leader elected: {self.owner_id}")
+        conn.execute('COMMIT')
+        return True
+
+    def _tick(self):
+        """리더이면 실행 시각이 된 작업 시작"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            self._is_leader = self._try_lead(conn, now)
+            if not self._is_leader:
+                return
+
+            rows = {row['name']: row for row in conn.execute('SELECT name, next_run_at FROM scheduled_jobs')}
+            for name, job in self._jobs.items():
+                row = rows.get(name)
+                if row is None or row['next_run_at'] is None:
+                    # 처음 등록된 작업
+                    next_run_at = now if job.run_on_start else job.next_run(now)
+                    conn.execute(
+                        'INSERT OR REPLACE INTO scheduled_jobs (name, next_run_at) VALUES (?, ?)',
+                        (name, next_run_at)
+                    )
+                    if next_run_at > now:
+                        continue
+                elif row['next_run_at'] > now:
+                    continue
+
+                with self._lock:
+                    if name in self._running:
+                        continue
+                    self._running.add(name)
+
+                conn.execute(
+                    'UPDATE scheduled_jobs SET next_run_at = ?, last_started_at = ?, last_status = ?, last_owner = ? WHERE name = ?',
+                    (job.next_run(now), now, STATUS_RUNNING, self.owner_id, name)
+                )
+                Thread(target=self._run_job, args=(job,), daemon=True, name=f'job-{name}').start()
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _run_job(self, job):
+        """작업 실행 후 결과 기록"""
+        started = time.time()
+        error = None
+        try:
+            result = job.func()
+            if isinstance(result, tuple) and len(result) == 2 and result[1]:
+                error = str(result[1])
+        except Exception as e:
+            error = str(e)
+        finally:
+            with self._lock:
+                self._running.discard(job.name)
+
+        if error:
+            print(f"Scheduled job {job.name} failed: {error}")
+
+        conn = self._connect()
+        try:
+            conn.execute('''
+                UPDATE scheduled_jobs SET
+                    last_finished_at = ?, last_duration = ?, last_status = ?, last_error = ?,
+                    run_count = run_count + 1, failure_count = failure_count + ?
+                WHERE name = ?
+            ''', (
+                time.time(), round(time.time() - started, 3),
+                STATUS_FAILED if error else STATUS_OK, error,
+                int(bool(error)), job.name
+            ))
+        finally:
+            conn.close()
+
+    def _release_lease(self):
+        """종료 시 리더 리스 반환 (다른 워커가 바로 이어받도록)"""
+        try:
+            conn = self._connect()
+            try:
+                conn.execute('DELETE FROM leases WHERE name = ? AND owner = ?', (LEADER_LEASE, self.owner_id))
+            finally:
+                conn.close()
+        except Exception:
+            pass
+
+    def trigger(self, name):
+        """
+        작업을 리더의 다음 확인 주기에 바로 실행하도록 예약
+
+        Returns:
+            bool: 등록된 작업이면 True
+        """
+        if name not in self._jobs:
+            return False
+        conn = self._connect()
+        try:
+            conn.execute(
+                'INSERT INTO scheduled_jobs (name, next_run_at) VALUES (?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET next_run_at = excluded.next_run_at',
+                (name, time.time())
+            )
+        finally:
+            conn.close()
+        return True
+
+    def get_status(self):
+        """리더 정보와 작업별 실행 기록"""
+        conn = self._connect()
+        try:
+            lease = conn.execute('SELECT * FROM leases WHERE name = ?', (LEADER_LEASE,)).fetchone()
+            rows = {row['name']: dict(row) for row in conn.execute('SELECT * FROM scheduled_jobs')}
+        finally:
+            conn.close()
+
+        jobs = []
+        for name, job in self._jobs.items():
+            record = rows.get(name, {})
+            record.pop('name', None)
+            jobs.append({'name': name, 'schedule': job.schedule, **record})
+
+        return {
+            'leader': {
+                'owner': lease['owner'],
+                'acquired_at': lease['acquired_at'],
+                'expires_at': lease['expires_at'],
+                'active': lease['expires_at'] > time.time()
+            } if lease else None,
+            'worker': self.owner_id,
+            'is_leader': self._is_leader,
+            'jobs': jobs
+        }
+
+
+# 전역 인스턴스
+scheduler = Scheduler()
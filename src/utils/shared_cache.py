@@ -0,0 +1,215 @@
+"""
+워커 간 공유 캐시 (L2)
+- gunicorn 워커들이 같은 호스트의 SQLite(WAL) 파일 하나를 공유
+- 값은 JSON으로 직렬화 후 zlib 압축하여 저장
+- 만료 시각을 함께 저장하여 모든 프로세스에서 TTL 적용
+- 전체 크기 상한을 넘으면 만료가 가장 가까운 항목부터 삭제
+"""
+
+import os
+import json
+import sqlite3
+import time
+import zlib
+from threading import Lock
+
+# L2 캐시 크기 상한 (바이트), 기본 256MB
+DEFAULT_L2_MAX_BYTES = int(os.getenv('CACHE_L2_MAX_BYTES', str(256 * 1024 * 1024)))
+# 이 횟수만큼 저장할 때마다 만료 항목 정리 및 크기 상한 확인
+TRIM_EVERY_SETS = 200
+
+
+class SQLiteCache:
+    """SQLite 기반 프로세스 간 공유 캐시"""
+
+    def __init__(self, db_path='data/shared_cache.db', max_bytes=DEFAULT_L2_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        self._sets_since_trim = 0
+        self._init_database()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _init_database(self):
+        """데이터베이스 초기화"""
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries(expires_at)')
+        finally:
+            conn.close()
+
+    def get_entry(self, key):
+        """
+        캐시 항목 조회
+
+        Returns:
+            tuple: (data, expires_at) - 없거나 만료되었으면 None
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT value, expires_at FROM cache_entries WHERE key = ? AND expires_at > ?',
+                (key, time.time())
+            ).fetchone()
+        finally:
+            conn.close()
+
+        if not row:
+            return None
+        try:
+            return json.loads(zlib.decompress(row[0])), row[1]
+        except (zlib.error, ValueError):
+            return None
+
+    def get_entries(self, keys):
+        """
+        여러 캐시 항목을 한 번에 조회
+
+        Returns:
+            dict: {key: (data, expires_at)} - 없거나 만료된 키는 제외
+        """
+        keys = list(keys)
+        rows = []
+        conn = self._connect()
+        try:
+            # SQLite 바인딩 변수 개수 제한을 넘지 않도록 나누어 조회
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows.extend(conn.execute(
+                    f'''SELECT key, value, expires_at FROM cache_entries
+                        WHERE key IN ({','.join('?' * len(chunk))}) AND expires_at > ?''',
+                    (*chunk, time.time())
+                ).fetchall())
+        finally:
+            conn.close()
+
+        entries = {}
+        for key, value, expires_at in rows:
+            try:
+                entries[key] = (json.loads(zlib.decompress(value)), expires_at)
+            except (zlib.error, ValueError):
+                continue
+        return entries
+
+    def get(self, key):
+        """캐시에서 데이터 가져오기"""
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def set(self, key, data, ttl=86400):
+        """
+        캐시에 데이터 저장 (JSON으로 직렬화할 수 없는 값은 저장하지 않음)
+
+        Returns:
+            bool: 저장 여부
+        """
+        try:
+            raw = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        except (TypeError, ValueError):
+            return False
+        value = zlib.compress(raw.encode('utf-8'), 6)
+
+        conn = self._connect()
+        try:
+            conn.execute('''
+                INSERT INTO cache_entries (key, value, size, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    value = excluded.value,
+                    size = excluded.size,
+                    expires_at = excluded.expires_at
+            ''', (key, value, len(value) + len(key), time.time() + ttl))
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._sets_since_trim += 1
+            should_trim = self._sets_since_trim >= TRIM_EVERY_SETS
+            if should_trim:
+                self._sets_since_trim = 0
+        if should_trim:
+            self.trim()
+        return True
+
+    def delete(self, key):
+        """캐시에서 데이터 삭제"""
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+        finally:
+            conn.close()
+
+    def clear(self):
+        """모든 캐시 삭제"""
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM cache_entries')
+        finally:
+            conn.close()
+
+    def trim(self):
+        """
+        만료 항목 삭제 후 크기 상한을 넘으면 만료가 가까운 항목부터 삭제
+
+        Returns:
+            int: 삭제된 항목 수
+        """
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            removed = conn.execute(
+                'DELETE FROM cache_entries WHERE expires_at <= ?', (time.time(),)
+            ).rowcount
+
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache_entries').fetchone()[0]
+            if total > self.max_bytes:
+                # 상한의 90%까지 줄임
+                excess = total - int(self.max_bytes * 0.9)
+                freed = 0
+                victims = []
+                for key, size in conn.execute('SELECT key, size FROM cache_entries ORDER BY expires_at'):
+                    victims.append((key,))
+                    freed += size
+                    if freed >= excess:
+                        break
+                conn.executemany('DELETE FROM cache_entries WHERE key = ?', victims)
+                removed += len(victims)
+            conn.execute('COMMIT')
+            return removed
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def get_stats(self):
+        """L2 캐시 통계"""
+        conn = self._connect()
+        try:
+            total, size_bytes = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE expires_at > ?',
+                (time.time(),)
+            ).fetchone()
+        finally:
+            conn.close()
+        return {
+            'total': total,
+            'size_bytes': size_bytes,
+            'max_bytes': self.max_bytes
+        }
@@ -0,0 +1,97 @@
+"""
+동일 요청 병합 (single-flight)
+- 같은 키로 동시에 들어온 호출은 진행 중인 업스트림 호출 하나를 기다렸다가 같은 결과를 받음
+- 병합된 호출 수를 이름별로 집계
+"""
+
+import functools
+import json
+from collections import defaultdict
+from threading import Event, Lock
+
+
+class _Call:
+    """진행 중인 호출 하나"""
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.exception = None
+
+
+class SingleFlight:
+    """키별로 동시에 하나의 업스트림 호출만 실행"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls = {}
+        self._metrics = defaultdict(lambda: {'calls': 0, 'coalesced': 0})
+
+    def do(self, key, func, name='default'):
+        """
+        같은 키의 호출이 진행 중이면 그 결과를 기다리고, 아니면 func를 실행
+
+        Args:
+            key: 정규화된 요청 키
+            func: 인자 없는 호출 함수
+            name: 통계용 이름 (예: 'youtube', 'gemini')
+
+        Returns:
+            func의 반환값 (예외도 모든 대기자에게 그대로 전달)
+        """
+        flight_key = (name, key)
+        with self._lock:
+            self._metrics[name]['calls'] += 1
+            call = self._calls.get(flight_key)
+            if call is not None:
+                self._metrics[name]['coalesced'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[flight_key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.exception = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(flight_key, None)
+            call.done.set()
+
+    def get_stats(self):
+        """이름별 호출/병합 횟수"""
+        with self._lock:
+            return {name: dict(counters) for name, counters in self._metrics.items()}
+
+
+def make_flight_key(*args, **kwargs):
+    """호출 인자를 정규화한 키"""
+    return json.dumps({'args': args, 'kwargs': kwargs}, sort_keys=True, default=str)
+
+
+def coalesce(name):
+    """함수 호출을 인자 기준으로 병합하는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return single_flight.do(
+                make_flight_key(*args, **kwargs),
+                lambda: func(*args, **kwargs),
+                name=name
+            )
+        return wrapper
+    return decorator
+
+
+# 전역 인스턴스
+single_flight = SingleFlight()
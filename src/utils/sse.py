@@ -0,0 +1,56 @@
+"""
+Server-Sent Events(SSE) 응답 유틸리티
+- AI 생성 텍스트를 조각 단위로 브라우저에 바로 전달
+"""
+
+import json
+
+from flask import Response, stream_with_context
+
+
+def format_sse(data, event=None):
+    """SSE 이벤트 한 건을 문자열로 변환"""
+    message = ''
+    if event:
+        message += f'event: {event}\n'
+    message += f'data: {json.dumps(data, ensure_ascii=False)}\n\n'
+    return message
+
+
+def sse_response(chunks, meta=None):
+    """
+    텍스트 조각 제너레이터를 SSE 응답으로 변환
+
+    이벤트 순서:
+        meta (선택) → message {'text': 조각} 반복 → done {'text': 전체 텍스트}
+        실패 시 error {'error': 메시지}
+
+    Args:
+        chunks: 텍스트 조각을 반환하는 이터레이터 (예: gemini_client.stream(...))
+        meta: 첫 이벤트로 보낼 부가 정보 (예: 채널 정보)
+    """
+    def generate():
+        if meta is not None:
+            yield format_sse(meta, event='meta')
+
+        collected = []
+        try:
+            for text in chunks:
+                collected.append(text)
+                yield format_sse({'text': text})
+        except Exception as e:
+            print(f"SSE stream error: {e}")
+            yield format_sse({'error': str(e)}, event='error')
+            return
+
+        yield format_sse({'text': ''.join(collected)}, event='done')
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            # 프록시(nginx 등)가 응답을 버퍼링하지 않도록
+            'X-Accel-Buffering': 'no'
+        }
+    )
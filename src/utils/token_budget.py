@@ -0,0 +1,206 @@
+"""
+엔드포인트별 토큰 예산
+- 프롬프트에 넣는 컨텍스트(채널 설명, 영상 제목 목록 등)를 필드별 예산에 맞게 자름
+- 응답 길이에 맞는 maxOutputTokens 설정
+- 엔드포인트별 입력/출력 토큰 수와 지연 시간 집계 (예산 조정용)
+"""
+
+import copy
+import time
+from collections import defaultdict, deque
+from threading import Lock
+
+# 엔드포인트별 예산 (토큰)
+#   output: maxOutputTokens
+#   fields: 프롬프트 컨텍스트 필드별 최대 토큰 수
+TOKEN_BUDGETS = {
+    'ai.channel_score': {'output': 1024, 'fields': {}},
+    'ai.analyze': {'output': 3072, 'fields': {'description': 150, 'titles': 200}},
+    'ai.content_ideas': {'output': 3072, 'fields': {'description': 150, 'titles': 300}},
+    'ai.title_optimizer': {'output': 1024, 'fields': {'title': 100}},
+    'youtube.hashtags': {'output': 400, 'fields': {'description': 150, 'titles': 150}},
+    'youtube.similar_videos': {'output': 256, 'fields': {'description': 150, 'titles': 150}},
+    'youtube.insights': {'output': 768, 'fields': {'description': 100, 'titles': 100}},
+    'trends.analyze_for_creator': {'output': 3072, 'fields': {'description': 150, 'titles': 250, 'trending': 500}},
+    'video_planner.generate': {'output': 6144, 'fields': {'description': 100, 'titles': 200, 'trending': 150}},
+    'shorts_planner.generate': {'output': 3072, 'fields': {'description': 100, 'titles': 150, 'trending': 150}},
+    'video_planner_old.script': {'output': 4096, 'fields': {}},
+    'video_planner_old.scenes': {'output': 4096, 'fields': {'script': 2000}},
+    'video_planner_old.full_plan': {'output': 6144, 'fields': {}},
+    'beauty.script': {'output': 3072, 'fields': {}},
+    'beauty.trends': {'output': 2048, 'fields': {'titles': 300}},
+    'beauty.hook_phrases': {'output': 2048, 'fields': {}},
+}
+
+# 엔드포인트별로 보관하는 최근 지연 시간 개수 (백분위 계산용)
+LATENCY_SAMPLES = 200
+
+
+def estimate_tokens(text):
+    """대략적인 토큰 수 (한국어 기준 2자당 1토큰 정도로 추정)"""
+    return max(len(text) // 2, 1)
+
+
+def trim_text(text, max_tokens):
+    """텍스트를 예산 안으로 자름 (가능하면 단어 경계에서, 잘린 경우 말줄임표)"""
+    text = text or ''
+    max_chars = max_tokens * 2
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    boundary = cut.rfind(' ')
+    if boundary > max_chars * 0.8:
+        cut = cut[:boundary]
+    return cut.rstrip() + '…'
+
+
+def trim_items(items, max_tokens, key=None):
+    """
+    목록 앞쪽부터 예산 안에 들어가는 항목만 유지 (최소 1개)
+
+    Args:
+        items: 문자열 또는 dict 목록
+        max_tokens: 목록 전체 예산
+        key: 항목에서 토큰 수를 셀 텍스트를 꺼내는 함수 (None이면 str(item))
+    """
+    kept = []
+    used = 0
+    for item in items:
+        tokens = estimate_tokens(key(item) if key else str(item))
+        if kept and used + tokens > max_tokens:
+            break
+        kept.append(item)
+        used += tokens
+    return kept
+
+
+def trim_field(endpoint, field, value, key=None):
+    """
+    엔드포인트 예산에 정의된 필드 한도로 컨텍스트 값을 자름 (한도가 없으면 그대로 반환)
+
+    Args:
+        endpoint: TOKEN_BUDGETS의 엔드포인트 이름
+        field: 필드 이름 (예: 'description', 'titles', 'trending')
+        value: 문자열 또는 목록
+        key: 목록 항목의 텍스트 추출 함수
+    """
+    limit = TOKEN_BUDGETS.get(endpoint, {}).get('fields', {}).get(field)
+    if limit is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return trim_items(value, limit, key=key)
+    return trim_text(value, limit)
+
+
+def apply_output_budget(payload, endpoint):
+    """요청 본문의 generationConfig.maxOutputTokens를 엔드포인트 예산으로 설정 (원본은 변경하지 않음)"""
+    budget = TOKEN_BUDGETS.get(endpoint)
+    if not budget:
+        return payload
+    payload = copy.deepcopy(payload)
+    payload.setdefault('generationConfig', {})['maxOutputTokens'] = budget['output']
+    return payload
+
+
+class TokenUsageMetrics:
+    """엔드포인트별 토큰 사용량/지연 시간 집계 (이 워커 기준)"""
+
+    def __init__(self, samples=LATENCY_SAMPLES):
+        self._lock = Lock()
+        self._metrics = defaultdict(lambda: {
+            'calls': 0,
+            'cached': 0,
+            'errors': 0,
+            'truncated': 0,
+            'prompt_tokens': 0,
+            'estimated_prompt_tokens': 0,
+            'output_tokens': 0,
+            'max_output_tokens': 0,
+            'latencies': deque(maxlen=samples)
+        })
+
+    def record(self, endpoint, latency, prompt_tokens=0, output_tokens=0,
+               estimated_prompt_tokens=0, cached=False, error=False, truncated=False):
+        """
+        호출 한 건 기록
+
+        Args:
+            endpoint: 엔드포인트 이름 (None이면 'default')
+            latency: 소요 시간 (초)
+            prompt_tokens: 실제 입력 토큰 수 (usageMetadata.promptTokenCount)
+            output_tokens: 실제 출력 토큰 수 (usageMetadata.candidatesTokenCount)
+            estimated_prompt_tokens: 요청 전 추정한 입력 토큰 수
+            cached: 디스크 캐시 적중 여부 (토큰/지연 시간 집계에서 제외)
+            error: 실패 여부
+            truncated: maxOutputTokens에 걸려 잘렸는지 여부 (finishReason == MAX_TOKENS)
+        """
+        with self._lock:
+            metrics = self._metrics[endpoint or 'default']
+            if cached:
+                metrics['cached'] += 1
+                return
+            if error:
+                metrics['errors'] += 1
+                return
+            metrics['calls'] += 1
+            metrics['truncated'] += int(truncated)
+            metrics['prompt_tokens'] += prompt_tokens
+            metrics['estimated_prompt_tokens'] += estimated_prompt_tokens
+            metrics['output_tokens'] += output_tokens
+            metrics['max_output_tokens'] = max(metrics['max_output_tokens'], output_tokens)
+            metrics['latencies'].append(latency)
+
+    def record_result(self, endpoint, started, payload, result):
+        """generateContent 응답(usageMetadata, finishReason)으로 기록"""
+        usage = (result or {}).get('usageMetadata', {})
+        candidates = (result or {}).get('candidates') or [{}]
+        self.record(
+            endpoint,
+            time.monotonic() - started,
+            prompt_tokens=usage.get('promptTokenCount', 0),
+            output_tokens=usage.get('candidatesTokenCount', 0),
+            estimated_prompt_tokens=estimate_payload_tokens(payload),
+            truncated=candidates[0].get('finishReason') == 'MAX_TOKENS'
+        )
+
+    def get_stats(self):
+        """엔드포인트별 평균 토큰 수, 지연 시간(p50/p95), 잘림 횟수, 현재 예산"""
+        with self._lock:
+            stats = {}
+            for endpoint, metrics in self._metrics.items():
+                calls = metrics['calls']
+                latencies = sorted(metrics['latencies'])
+                stats[endpoint] = {
+                    'calls': calls,
+                    'cached': metrics['cached'],
+                    'errors': metrics['errors'],
+                    'truncated': metrics['truncated'],
+                    'avg_prompt_tokens': round(metrics['prompt_tokens'] / calls) if calls else 0,
+                    'avg_estimated_prompt_tokens': round(metrics['estimated_prompt_tokens'] / calls) if calls else 0,
+                    'avg_output_tokens': round(metrics['output_tokens'] / calls) if calls else 0,
+                    'max_output_tokens': metrics['max_output_tokens'],
+                    'latency_p50': _percentile(latencies, 0.5),
+                    'latency_p95': _percentile(latencies, 0.95),
+                    'budget': TOKEN_BUDGETS.get(endpoint)
+                }
+            return stats
+
+
+def estimate_payload_tokens(payload):
+    """요청 본문의 프롬프트 토큰 수 추정"""
+    return sum(
+        estimate_tokens(part.get('text', ''))
+        for content in (payload or {}).get('contents', [])
+        for part in content.get('parts', [])
+    )
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return round(sorted_values[index], 3)
+
+
+# 전역 인스턴스
+token_metrics = TokenUsageMetrics()
@@ -0,0 +1,150 @@
+"""
+전역 트렌딩 데이터 스냅샷
+- 한국 인기 급상승(mostPopular KR)과 뷰티 트렌드 검색 결과를 스케줄러 작업으로 주기적으로 조회하여
+  워커 간 공유 캐시(L2)에 저장 (리더 워커 하나만 갱신)
+- 트렌드 관련 엔드포인트는 요청 경로에서 업스트림을 호출하지 않고 스냅샷을 읽음
+- 스냅샷이 아직 없을 때(최초 기동 직후)만 요청 경로에서 한 번 조회
+"""
+
+import os
+import time
+
+from src.utils.cache import cache
+from src.utils.entity_store import entity_store
+from src.utils.single_flight import coalesce
+from src.utils.youtube_client import youtube_client
+
+# 갱신 주기 (초)
+MOST_POPULAR_REFRESH_INTERVAL = int(os.getenv('MOST_POPULAR_REFRESH_INTERVAL', '1800'))
+BEAUTY_TRENDING_REFRESH_INTERVAL = int(os.getenv('BEAUTY_TRENDING_REFRESH_INTERVAL', '21600'))
+# 갱신이 계속 실패해도 마지막 스냅샷을 반환하는 기간 (초)
+SNAPSHOT_RETENTION = 86400
+# 워커 메모리(L1)에 스냅샷을 보관하는 시간 (초) - 다른 워커가 갱신한 값은 이 시간 안에 반영
+LOCAL_TTL = 60
+
+# 인기 급상승 스냅샷 크기 (mostPopular 한 페이지 최대치)
+MOST_POPULAR_COUNT = 50
+
+
+def _fetch_most_popular():
+    """한국 인기 급상승 영상 50개 (snippet, statistics, contentDetails)"""
+    data, error = youtube_client.request('videos', {
+        'part': 'snippet,statistics,contentDetails',
+        'chart': 'mostPopular',
+        'regionCode': 'KR',
+        'maxResults': MOST_POPULAR_COUNT
+    })
+    if error:
+        return None, error
+    return (data or {}).get('items', []), None
+
+
+def _fetch_beauty_trending():
+    """한국 뷰티 인기 영상 검색 결과 (search.list 100 단위 + 영상 상세)"""
+    search_data, error = youtube_client.request('search', {
+        'part': 'snippet',
+        'q': '뷰티 화장품 리뷰 올리브영',
+        'type': 'video',
+        'regionCode': 'KR',
+        'relevanceLanguage': 'ko',
+        'order': 'viewCount',
+        'maxResults': 20,
+        'publishedAfter': '2024-01-01T00:00:00Z'  # 최근 1년
+    })
+    if error:
+        return None, error
+
+    video_ids = [item['id']['videoId'] for item in (search_data or {}).get('items', [])]
+    videos, error = entity_store.get_videos(video_ids, parts=('snippet', 'statistics'))
+    if error:
+        return None, error
+    return [videos[video_id] for video_id in video_ids if video_id in videos], None
+
+
+# 데이터셋 이름 → (조회 함수, 갱신 주기)
+DATASETS = {
+    'most_popular_kr': (_fetch_most_popular, MOST_POPULAR_REFRESH_INTERVAL),
+    'beauty_trending_kr': (_fetch_beauty_trending, BEAUTY_TRENDING_REFRESH_INTERVAL),
+}
+
+
+def _cache_key(name):
+    return f'trending_snapshot:{name}'
+
+
+def _read_shared(name):
+    """공유 캐시(L2)에서 스냅샷 조회 → {'items', 'fetched_at'} 또는 None"""
+    try:
+        entry = cache.l2.get_entry(_cache_key(name))
+    except Exception as e:
+        print(f"Trending snapshot read failed ({name}): {e}")
+        return None
+    return entry[0] if entry else None
+
+
+@coalesce('trending_snapshot')
+def refresh_dataset(name):
+    """
+    데이터셋을 업스트림에서 다시 조회하여 스냅샷 저장
+
+    Returns:
+        tuple: (items, error)
+    """
+    fetch, _ = DATASETS[name]
+    items, error = fetch()
+    if error:
+        print(f"Trending snapshot refresh failed ({name}): {error}")
+        return None, error
+
+    snapshot = {'items': items, 'fetched_at': time.time()}
+    cache.set(_cache_key(name), snapshot, ttl=SNAPSHOT_RETENTION)
+    cache.l1.set(_cache_key(name), snapshot, ttl=LOCAL_TTL)
+    return items, None
+
+
+def get_dataset(name):
+    """
+    트렌딩 스냅샷 조회 (요청 경로용)
+
+    Args:
+        name: DATASETS의 데이터셋 이름
+
+    Returns:
+        tuple: (items, error) - items는 videos.list 응답 형식 항목 목록
+    """
+    snapshot = cache.l1.get(_cache_key(name))
+    if snapshot is None:
+        snapshot = _read_shared(name)
+        if snapshot is not None:
+            cache.l1.set(_cache_key(name), snapshot, ttl=LOCAL_TTL)
+
+    if snapshot is not None:
+        return snapshot['items'], None
+
+    # 아직 스냅샷이 없으면 (최초 기동 직후) 요청 경로에서 한 번 조회
+    return refresh_dataset(name)
+
+
+def register_jobs(scheduler):
+    """데이터셋별 갱신 작업을 스케줄러에 등록 (기동 직후 한 번 실행 후 주기마다)"""
+    for name, (_, interval) in DATASETS.items():
+        scheduler.add_interval_job(
+            f'trending.{name}',
+            lambda name=name: refresh_dataset(name),
+            seconds=interval,
+            jitter=min(interval * 0.05, 300),
+            run_on_start=True
+        )
+
+
+def get_snapshot_stats():
+    """데이터셋별 마지막 갱신 시각과 항목 수"""
+    stats = {}
+    for name, (_, interval) in DATASETS.items():
+        snapshot = _read_shared(name)
+        stats[name] = {
+            'interval': interval,
+            'fetched_at': snapshot['fetched_at'] if snapshot else None,
+            'items': len(snapshot['items']) if snapshot else 0
+        }
+    return stats
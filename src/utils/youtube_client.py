@@ -0,0 +1,307 @@
+"""
+YouTube Data API v3 공용 클라이언트
+- 워커 프로세스마다 keep-alive 커넥션 풀(requests.Session) 하나를 공유
+- 모든 요청에 기본 타임아웃 적용
+- 할당량 초과 시 API 키 자동 로테이션
+- 모든 키가 격리된 동안에는 업스트림 호출 없이 즉시 실패 (서킷 브레이커)
+- 리소스별 TTL을 가진 읽기 관통 캐시 (만료 항목은 즉시 반환 후 백그라운드 갱신)
+- 동시에 들어온 같은 요청은 업스트림 호출 하나로 병합 (single-flight)
+- 응답 ETag를 저장해 두고 재요청 시 If-None-Match로 조건부 요청 (304이면 저장된 본문 재사용)
+  ETag 항목은 프로세스 메모리(L1)에 두지 않고 공유 캐시(L2, 압축)에만 저장
+"""
+
+import os
+import time
+from datetime import datetime
+from threading import Lock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.api_key_manager import api_key_manager
+from src.utils.cache import cache, read_through
+from src.utils.single_flight import single_flight, make_flight_key
+from src.utils.youtube_quota import quota_scheduler, get_quota_cost, PACIFIC_TZ
+
+YOUTUBE_API_BASE_URL = 'https://www.googleapis.com/youtube/v3'
+
+# 기본 타임아웃 (초)
+DEFAULT_TIMEOUT = 10
+
+# 서킷 브레이커가 열린 뒤 공유 상태를 다시 확인하는 주기 (초)
+BREAKER_RECHECK_INTERVAL = 60
+
+# 키 격리 사유별 격리 시간 (초) - quotaExceeded는 다음 할당량 초기화 시각까지
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+RATE_LIMIT_QUARANTINE = 60
+INVALID_KEY_REASONS = {'keyInvalid', 'keyExpired', 'accessNotConfigured', 'ipRefererBlocked'}
+INVALID_KEY_QUARANTINE = 3600
+
+# 리소스별 캐시 신선 기간 (초)
+CACHE_TTL_CHANNELS = 3600        # 채널 정보
+CACHE_TTL_SEARCH = 1800          # 검색 결과
+CACHE_TTL_VIDEO_STATS = 900      # 영상 통계
+CACHE_TTL_MOST_POPULAR = 1800    # 인기 급상승 (chart=mostPopular)
+CACHE_TTL_PLAYLIST_ITEMS = 600   # 업로드 목록
+# 만료 후 백그라운드 갱신 동안 기존 값을 반환할 수 있는 유예 기간 (초)
+CACHE_STALE_TTL = 3600
+# 조건부 요청용 ETag + 본문 보관 기간 (초) - 가장 오래 남는 읽기 관통 항목(채널 정보 신선 기간 + 유예 기간)과 같게
+ETAG_TTL = CACHE_TTL_CHANNELS + CACHE_STALE_TTL
+# playlistItems.list / videos.list 한 번에 조회 가능한 최대 개수
+MAX_PAGE_SIZE = 50
+
+
+def _read_etag(etag_key):
+    """저장된 ETag와 본문 (공유 캐시만 조회)"""
+    try:
+        return cache.l2.get(etag_key)
+    except Exception as e:
+        print(f"ETag cache read failed: {e}")
+        return None
+
+
+def _write_etag(etag_key, entry):
+    """ETag와 본문 저장 (공유 캐시에만 저장하여 L1 메모리를 중복 사용하지 않음)"""
+    try:
+        cache.l2.set(etag_key, entry, ttl=ETAG_TTL)
+    except Exception as e:
+        print(f"ETag cache write failed: {e}")
+
+
+def _videos_ttl(params):
+    """videos.list는 인기 차트와 영상 통계의 캐시 기간이 다름"""
+    return CACHE_TTL_MOST_POPULAR if params.get('chart') else CACHE_TTL_VIDEO_STATS
+
+
+class YouTubeClient:
+    """YouTube Data API 클라이언트 (프로세스별 커넥션 풀)"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_size=20):
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._session = None
+        self._session_pid = None
+        self._lock = Lock()
+        # 모든 키가 격리된 경우 이 시각까지 즉시 실패
+        self._breaker_open_until = 0
+        self._breaker_retry_at = 0
+
+    def _get_session(self):
+        """
+        현재 프로세스의 세션 반환
+
+        gunicorn이 fork한 워커에서 부모의 소켓을 공유하지 않도록
+        PID가 바뀌면 세션을 새로 만듭니다.
+        """
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._lock:
+                if self._session is None or self._session_pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    self._session = session
+                    self._session_pid = pid
+        return self._session
+
+    def has_keys(self):
+        """사용 가능한 YouTube API 키가 설정되어 있는지 확인"""
+        return bool(api_key_manager.youtube_keys)
+
+    def breaker_state(self):
+        """서킷 브레이커 상태 (이 워커 기준)"""
+        return {
+            'open': self._breaker_open_until > time.time(),
+            'retry_at': self._breaker_retry_at or None
+        }
+
+    def request(self, resource, params, timeout=None):
+        """
+        YouTube API 요청을 보내고 할당량 초과 시 키를 자동으로 로테이션합니다.
+
+        Args:
+            resource: API 리소스명 (예: 'channels', 'search')
+            params: 쿼리 파라미터 (key는 자동으로 추가)
+            timeout: 요청 타임아웃 (초), None이면 기본값
+
+        Returns:
+            tuple: (data, error)
+        """
+        # 같은 리소스/파라미터의 동시 호출은 하나로 병합
+        return single_flight.do(
+            make_flight_key(resource, params),
+            lambda: self._request(resource, params, timeout),
+            name='youtube'
+        )
+
+    def _request(self, resource, params, timeout=None):
+        """키 로테이션을 포함한 실제 업스트림 요청"""
+        # 시도 횟수는 보유한 키의 개수만큼으로 제한
+        max_retries = len(api_key_manager.youtube_keys)
+        if max_retries == 0:
+            return None, "No YouTube API keys are available."
+
+        # 서킷 브레이커: 모든 키가 격리된 동안에는 라운드 트립 없이 즉시 실패
+        if self._breaker_open_until > time.time():
+            return None, _quota_error(self._breaker_retry_at)
+
+        url = f'{YOUTUBE_API_BASE_URL}/{resource}'
+        session = self._get_session()
+        cost = get_quota_cost(resource)
+
+        etag_key = cache._generate_key('yt_etag', {'resource': resource, 'params': params})
+        stored = _read_etag(etag_key)
+
+        for i in range(max_retries):
+            # 남은 할당량이 가장 많은 키 선택 (호출 비용만큼 차감)
+            api_key = api_key_manager.get_next_youtube_key(cost=cost)
+            if not api_key:
+                break
+
+            request_params = dict(params)
+            request_params['key'] = api_key
+
+            # 이전 응답의 ETag가 있으면 조건부 요청
+            headers = {'If-None-Match': stored['etag']} if stored else None
+
+            try:
+                response = session.get(url, params=request_params, headers=headers,
+                                       timeout=timeout or self.timeout)
+            except requests.exceptions.RequestException as e:
+                print(f"API request error: {e}")
+                # 네트워크 오류 시에도 키 로테이션 시도
+                continue
+
+            # 변경 없음: 저장된 본문을 재사용하고 보관 기간 연장
+            if response.status_code == 304 and stored:
+                _write_etag(etag_key, stored)
+                return stored['data'], None
+
+            if response.status_code != 200:
+                reason = _error_reason(response)
+                message = _error_message(response)
+
+                # 할당량 초과: 다음 초기화 시각까지 격리
+                if reason == 'quotaExceeded':
+                    print(f"- Quota exceeded for key ending in ...{api_key[-4:]}. Rotating... ({i + 1}/{max_retries}) ")
+                    quota_scheduler.mark_exhausted(api_key, message)
+                    continue  # 다음 키로 재시도
+
+                # 속도 제한 / 잘못된 키: 일정 시간 격리
+                if reason in RATE_LIMIT_REASONS:
+                    quota_scheduler.quarantine(api_key, time.time() + RATE_LIMIT_QUARANTINE, reason, message)
+                    continue
+                if reason in INVALID_KEY_REASONS:
+                    quota_scheduler.quarantine(api_key, time.time() + INVALID_KEY_QUARANTINE, reason, message)
+                    continue
+
+                return None, f"YouTube API error {response.status_code}: {message}"
+
+            try:
+                data = response.json()  # 성공
+            except ValueError:
+                return None, "Invalid JSON response from YouTube API."
+
+            etag = response.headers.get('ETag') or data.get('etag')
+            if etag:
+                _write_etag(etag_key, {'etag': etag, 'data': data})
+            return data, None
+
+        # 모든 키가 격리/소진 상태이면 서킷 브레이커 열기
+        retry_at = quota_scheduler.next_available_at(api_key_manager.youtube_keys)
+        if retry_at:
+            self._breaker_retry_at = retry_at
+            self._breaker_open_until = min(retry_at, time.time() + BREAKER_RECHECK_INTERVAL)
+            return None, _quota_error(retry_at)
+
+        return None, "YouTube API request failed with every available key."
+
+    @read_through('yt_channels', ttl=CACHE_TTL_CHANNELS, stale_ttl=CACHE_STALE_TTL)
+    def channels(self, **params):
+        """channels.list 호출"""
+        return self.request('channels', params)
+
+    @read_through('yt_search', ttl=CACHE_TTL_SEARCH, stale_ttl=CACHE_STALE_TTL)
+    def search(self, **params):
+        """search.list 호출"""
+        return self.request('search', params)
+
+    @read_through('yt_videos', ttl=_videos_ttl, stale_ttl=CACHE_STALE_TTL)
+    def videos(self, **params):
+        """videos.list 호출"""
+        return self.request('videos', params)
+
+    @read_through('yt_playlist_items', ttl=CACHE_TTL_PLAYLIST_ITEMS, stale_ttl=CACHE_STALE_TTL)
+    def playlist_items(self, **params):
+        """playlistItems.list 호출"""
+        return self.request('playlistItems', params)
+
+    def iter_playlist_items(self, playlist_id, max_items=MAX_PAGE_SIZE, part='snippet'):
+        """
+        재생목록 항목을 페이지를 넘기며 순회 (최대 max_items개)
+
+        페이지는 조회 깊이와 상관없이 항상 50개 단위로 요청하므로
+        깊이가 다른 호출끼리도 같은 페이지 캐시(yt_playlist_items)를 공유.
+
+        Yields:
+            tuple: (item, None) - 페이지 조회 실패 시 (None, error)를 마지막으로 반환
+        """
+        remaining = max_items
+        page_token = None
+        while remaining > 0:
+            params = {'part': part, 'playlistId': playlist_id, 'maxResults': MAX_PAGE_SIZE}
+            if page_token:
+                params['pageToken'] = page_token
+            data, error = self.playlist_items(**params)
+            if error:
+                yield None, error
+                return
+
+            for item in (data or {}).get('items', [])[:remaining]:
+                yield item, None
+                remaining -= 1
+
+            page_token = (data or {}).get('nextPageToken')
+            if not page_token:
+                return
+
+    def list_playlist_video_ids(self, playlist_id, max_items=MAX_PAGE_SIZE):
+        """
+        재생목록의 영상 ID 목록 (재생목록 순서, 업로드 재생목록이면 최신순)
+
+        Returns:
+            tuple: (video_ids, error) - 중간 페이지에서 실패하면 그때까지의 ID는 버림
+        """
+        video_ids = []
+        for item, error in self.iter_playlist_items(playlist_id, max_items=max_items):
+            if error:
+                return None, error
+            video_ids.append(item['snippet']['resourceId']['videoId'])
+        return video_ids, None
+
+
+def _quota_error(retry_at):
+    """모든 키 소진 시 오류 메시지"""
+    retry_text = datetime.fromtimestamp(retry_at, PACIFIC_TZ).strftime('%Y-%m-%d %H:%M %Z')
+    return f"QUOTA_EXCEEDED: 모든 YouTube API 키의 할당량이 초과되었습니다. ({retry_text} 이후 재시도 가능)"
+
+
+def _error_reason(response):
+    """YouTube API 오류 응답에서 reason 코드 추출 (예: 'quotaExceeded')"""
+    try:
+        errors = response.json().get('error', {}).get('errors', [])
+        return errors[0].get('reason') if errors else None
+    except (ValueError, AttributeError):
+        return None
+
+
+def _error_message(response):
+    """YouTube API 오류 응답에서 메시지 추출"""
+    try:
+        return response.json().get('error', {}).get('message', response.reason)
+    except ValueError:
+        return response.reason
+
+
+# 전역 클라이언트 인스턴스
+youtube_client = YouTubeClient()
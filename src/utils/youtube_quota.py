@@ -0,0 +1,272 @@
+"""
+YouTube API 할당량(quota) 스케줄러
+- API 메서드별 실제 단위 비용을 차감 (search.list = 100, channels.list = 1 ...)
+- 남은 할당량이 가장 많은 키를 선택
+- 사용량을 SQLite에 저장하여 모든 gunicorn 워커가 같은 값을 공유
+- 태평양 시간 자정(YouTube 할당량 초기화 시점)에 카운터 초기화
+- 소진/오류 키는 해제 시각이 정해진 격리(quarantine) 상태로 관리
+"""
+
+import os
+import sqlite3
+import hashlib
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+# YouTube Data API 메서드별 할당량 비용 (단위)
+QUOTA_COSTS = {
+    'search': 100,
+    'channels': 1,
+    'videos': 1,
+    'playlistItems': 1,
+}
+
+# 키당 일일 할당량 (기본 10,000 단위)
+DEFAULT_DAILY_QUOTA = int(os.getenv('YOUTUBE_DAILY_QUOTA', '10000'))
+
+PACIFIC_TZ = ZoneInfo('America/Los_Angeles')
+
+
+def get_quota_cost(resource):
+    """API 리소스 호출 1회의 할당량 비용"""
+    return QUOTA_COSTS.get(resource, 1)
+
+
+def current_quota_day():
+    """현재 할당량 기준일 (태평양 시간 날짜)"""
+    return datetime.now(PACIFIC_TZ).strftime('%Y-%m-%d')
+
+
+def next_quota_reset():
+    """다음 할당량 초기화 시각 (태평양 시간 자정, epoch 초)"""
+    now = datetime.now(PACIFIC_TZ)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return tomorrow.timestamp()
+
+
+def key_fingerprint(api_key):
+    """API 키 원문 대신 저장할 식별자"""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class QuotaScheduler:
+    """워커 간 공유되는 YouTube API 키 할당량 스케줄러"""
+
+    def __init__(self, db_path='data/youtube_quota.db', daily_quota=DEFAULT_DAILY_QUOTA):
+        self.db_path = db_path
+        self.daily_quota = daily_quota
+        self._init_database()
+
+    def _connect(self):
+        """자동 커밋 모드 연결 (트랜잭션은 직접 BEGIN으로 관리)"""
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def _init_database(self):
+        """데이터베이스 초기화"""
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS key_usage (
+                    key_hash TEXT NOT NULL,
+                    quota_day TEXT NOT NULL,
+                    units INTEGER NOT NULL DEFAULT 0,
+                    last_used REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (key_hash, quota_day)
+                )
+            ''')
+
+            # 키 격리 상태 테이블
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS key_state (
+                    key_hash TEXT PRIMARY KEY,
+                    quarantined_until REAL NOT NULL DEFAULT 0,
+                    reason TEXT,
+                    last_error TEXT,
+                    updated_at REAL NOT NULL DEFAULT 0
+                )
+            ''')
+        finally:
+            conn.close()
+
+    def acquire(self, api_keys, cost=1):
+        """
+        남은 할당량이 가장 많은 키를 선택하고 비용만큼 차감
+
+        Args:
+            api_keys: 후보 API 키 리스트
+            cost: 이번 호출의 할당량 비용
+
+        Returns:
+            str: 선택된 API 키 (모든 키의 잔여 할당량이 부족하면 None)
+        """
+        if not api_keys:
+            return None
+
+        day = current_quota_day()
+        fingerprints = {key_fingerprint(key): key for key in api_keys}
+
+        conn = self._connect()
+        try:
+            # 여러 워커가 동시에 같은 키를 고르지 않도록 쓰기 잠금 후 조회
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('DELETE FROM key_usage WHERE quota_day < ?', (day,))
+            rows = conn.execute(
+                'SELECT key_hash, units, last_used FROM key_usage WHERE quota_day = ?',
+                (day,)
+            ).fetchall()
+            usage = {row[0]: (row[1], row[2]) for row in rows}
+            quarantined = {
+                row[0] for row in conn.execute(
+                    'SELECT key_hash FROM key_state WHERE quarantined_until > ?',
+                    (time.time(),)
+                )
+            }
+
+            best_hash = None
+            best_rank = None
+            for fp in fingerprints:
+                if fp in quarantined:
+                    continue
+                units, last_used = usage.get(fp, (0, 0))
+                remaining = self.daily_quota - units
+                if remaining < cost:
+                    continue
+                # 잔여 할당량이 같으면 가장 오래 쉰 키 우선
+                rank = (remaining, -last_used)
+                if best_rank is None or rank > best_rank:
+                    best_hash, best_rank = fp, rank
+
+            if best_hash is None:
+                conn.execute('COMMIT')
+                return None
+
+            conn.execute('''
+                INSERT INTO key_usage (key_hash, quota_day, units, last_used)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(key_hash, quota_day) DO UPDATE SET
+                    units = units + excluded.units,
+                    last_used = excluded.last_used
+            ''', (best_hash, day, cost, time.time()))
+            conn.execute('COMMIT')
+            return fingerprints[best_hash]
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def mark_exhausted(self, api_key, error=None):
+        """quotaExceeded 응답을 받은 키를 다음 초기화 시각까지 격리"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+                INSERT INTO key_usage (key_hash, quota_day, units, last_used)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(key_hash, quota_day) DO UPDATE SET
+                    units = excluded.units,
+                    last_used = excluded.last_used
+            ''', (key_fingerprint(api_key), current_quota_day(), self.daily_quota, time.time()))
+        finally:
+            conn.close()
+        self.quarantine(api_key, next_quota_reset(), 'quotaExceeded', error)
+
+    def quarantine(self, api_key, until, reason, error=None):
+        """
+        키를 지정한 시각까지 격리 (선택 대상에서 제외)
+
+        Args:
+            api_key: 격리할 API 키
+            until: 격리 해제 시각 (epoch 초)
+            reason: 격리 사유 (예: 'quotaExceeded', 'keyInvalid')
+            error: 마지막 오류 메시지
+        """
+        print(f"🚫 Quarantining YouTube API key ...{api_key[-4:]} until "
+              f"{datetime.fromtimestamp(until, PACIFIC_TZ).isoformat()} ({reason})")
+        conn = self._connect()
+        try:
+            conn.execute('''
+                INSERT INTO key_state (key_hash, quarantined_until, reason, last_error, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(key_hash) DO UPDATE SET
+                    quarantined_until = excluded.quarantined_until,
+                    reason = excluded.reason,
+                    last_error = excluded.last_error,
+                    updated_at = excluded.updated_at
+            ''', (key_fingerprint(api_key), until, reason, error, time.time()))
+        finally:
+            conn.close()
+
+    def next_available_at(self, api_keys):
+        """
+        사용 가능한 키가 다시 생기는 시각
+
+        Returns:
+            float: 모든 키가 격리/소진 상태이면 가장 빠른 해제 시각, 아니면 None
+        """
+        now = time.time()
+        reset_at = next_quota_reset()
+        earliest = None
+        for key in self.get_key_health(api_keys):
+            if key['status'] == 'ok':
+                return None
+            available_at = key['quarantined_until'] if key['status'] == 'quarantined' else reset_at
+            if available_at <= now:
+                return None
+            if earliest is None or available_at < earliest:
+                earliest = available_at
+        return earliest
+
+    def get_key_health(self, api_keys):
+        """키별 오늘 사용량 및 격리 상태 조회"""
+        day = current_quota_day()
+        now = time.time()
+        conn = self._connect()
+        try:
+            usage = dict(conn.execute(
+                'SELECT key_hash, units FROM key_usage WHERE quota_day = ?',
+                (day,)
+            ).fetchall())
+            states = {
+                row[0]: row[1:] for row in conn.execute(
+                    'SELECT key_hash, quarantined_until, reason, last_error, updated_at FROM key_state'
+                )
+            }
+        finally:
+            conn.close()
+
+        result = []
+        for key in api_keys:
+            fp = key_fingerprint(key)
+            used = usage.get(fp, 0)
+            remaining = max(self.daily_quota - used, 0)
+            quarantined_until, reason, last_error, updated_at = states.get(fp, (0, None, None, None))
+
+            if quarantined_until > now:
+                status = 'quarantined'
+            elif remaining <= 0:
+                status = 'exhausted'
+            else:
+                status = 'ok'
+
+            result.append({
+                'key': f"...{key[-4:]}",
+                'status': status,
+                'used': used,
+                'remaining': remaining,
+                'daily_quota': self.daily_quota,
+                'quarantined_until': quarantined_until if status == 'quarantined' else None,
+                'reason': reason,
+                'last_error': last_error,
+                'last_error_at': updated_at
+            })
+        return result
+
+
+# 전역 스케줄러 인스턴스
+quota_scheduler = QuotaScheduler()
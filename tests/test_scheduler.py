@@ -0,0 +1,112 @@
+"""
+스케줄러 테스트 - cron 필드 파싱, 다음 실행 시각 계산, 리더 리스 인계
+(python -m pytest 로 저장소 루트에서 실행)
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.utils.scheduler import LEASE_TTL, CronSchedule, Scheduler, _parse_cron_field
+
+
+def _ts(*args):
+    """서버 로컬 시간 기준 unix time"""
+    return datetime(*args).timestamp()
+
+
+@pytest.mark.parametrize('field, low, high, expected', [
+    ('*', 0, 5, {0, 1, 2, 3, 4, 5}),
+    ('*/15', 0, 59, {0, 15, 30, 45}),
+    ('7', 0, 59, {7}),
+    ('1-5', 1, 31, {1, 2, 3, 4, 5}),
+    ('1-9/4', 1, 31, {1, 5, 9}),
+    ('5/20', 0, 59, {5, 25, 45}),
+    ('1,3,10-12', 1, 12, {1, 3, 10, 11, 12}),
+])
+def test_parse_cron_field(field, low, high, expected):
+    assert _parse_cron_field(field, low, high) == expected
+
+
+@pytest.mark.parametrize('field, low, high', [
+    ('60', 0, 59),
+    ('0', 1, 31),
+    ('5-3', 0, 59),
+    ('*/0', 0, 59),
+    ('1-13', 1, 12),
+])
+def test_parse_cron_field_rejects_invalid(field, low, high):
+    with pytest.raises(ValueError):
+        _parse_cron_field(field, low, high)
+
+
+def test_cron_requires_five_fields():
+    with pytest.raises(ValueError):
+        CronSchedule('*/5 * * *')
+
+
+def test_cron_sunday_as_seven():
+    assert CronSchedule('0 0 * * 7').weekdays == {0}
+
+
+def test_next_after_same_hour():
+    schedule = CronSchedule('*/10 * * * *')
+    assert schedule.next_after(_ts(2026, 3, 10, 12, 3, 27)) == _ts(2026, 3, 10, 12, 10)
+
+
+def test_next_after_skips_current_minute():
+    schedule = CronSchedule('*/10 * * * *')
+    assert schedule.next_after(_ts(2026, 3, 10, 12, 10)) == _ts(2026, 3, 10, 12, 20)
+
+
+def test_next_after_day_rollover():
+    schedule = CronSchedule('30 4 * * *')
+    assert schedule.next_after(_ts(2026, 3, 10, 5, 0)) == _ts(2026, 3, 11, 4, 30)
+
+
+def test_next_after_month_rollover():
+    schedule = CronSchedule('0 0 1 * *')
+    assert schedule.next_after(_ts(2026, 1, 31, 23, 59)) == _ts(2026, 2, 1, 0, 0)
+
+
+def test_next_after_day_or_weekday():
+    # 일과 요일이 모두 지정되면 둘 중 먼저 오는 날 (2026-03-10은 화요일, 3-13은 금요일)
+    schedule = CronSchedule('0 9 20 * 5')
+    assert schedule.next_after(_ts(2026, 3, 10, 10, 0)) == _ts(2026, 3, 13, 9, 0)
+
+
+def _scheduler(db_path, owner_id):
+    scheduler = Scheduler(db_path=str(db_path))
+    scheduler.owner_id = owner_id
+    return scheduler
+
+
+def _try_lead(scheduler, now):
+    conn = scheduler._connect()
+    try:
+        return scheduler._try_lead(conn, now)
+    finally:
+        conn.close()
+
+
+def test_lease_held_by_one_owner(tmp_path):
+    db_path = tmp_path / 'scheduler.db'
+    first, second = _scheduler(db_path, 'host:1'), _scheduler(db_path, 'host:2')
+    now = 1000.0
+
+    assert _try_lead(first, now)
+    assert not _try_lead(second, now + 1)
+    # 리더는 리스를 갱신할 수 있음
+    assert _try_lead(first, now + LEASE_TTL - 1)
+    assert not _try_lead(second, now + LEASE_TTL + 1)
+
+
+def test_lease_taken_over_after_expiry(tmp_path):
+    db_path = tmp_path / 'scheduler.db'
+    first, second = _scheduler(db_path, 'host:1'), _scheduler(db_path, 'host:2')
+    now = 1000.0
+
+    assert _try_lead(first, now)
+    assert _try_lead(second, now + LEASE_TTL + 1)
+    # 이전 리더는 새 리스가 유효한 동안 되찾지 못함
+    assert not _try_lead(first, now + LEASE_TTL + 2)